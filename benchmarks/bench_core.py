@@ -0,0 +1,229 @@
+"""
+核心热点路径基准测试
+单独测量 HttpClient、BaseAPI、BaseTest、AssertHelper、YamlLoader 的热点函数，
+并对本地模拟报表服务端到端调用 ReportAPI.report_order_listPage，对比顺序、多线程和 asyncio 三种执行方式
+
+完全离线运行，结果以JSON写入报告目录，便于在不同提交之间对比
+
+用法:
+    python -m benchmarks.bench_core
+    python -m benchmarks.bench_core --repeat 7 --requests 500 --workers 8 --output reports/bench_core.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+import requests
+from bizs.apis.report_api import ReportAPI
+from bizs.mock.report_server import ReportMockServer
+from core.assert_helper import assert_helper
+from core.base.base_api import BaseAPI
+from core.base.http_client import http_client
+from core.test_helper import BaseTest
+from core.utils.logger import logger
+from core.utils.stats import summarize
+from core.utils.yaml_loader import YamlLoader
+
+
+LIST_PAGE_PARAMS = {
+    "pageNum": 1,
+    "pageSize": 50,
+    "startDate": "2025-11-01",
+    "endDate": "2025-11-29",
+    "orderStatus": [1, 2],
+    "sortRule": {"field": "createTime", "order": "desc"},
+}
+
+
+def _bench(name: str, func: Callable[[], Any], number: int, repeat: int) -> Dict[str, Any]:
+    """
+    重复执行函数并统计单次调用耗时
+
+    Args:
+        name: 基准名称
+        func: 无参函数
+        number: 每轮调用次数
+        repeat: 轮数
+
+    Returns:
+        {"name", "number", "repeat", "us_per_op": {count, mean, p50, p95, p99, max}, "best_us"}
+    """
+    func()  # 预热
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    stats = summarize(rounds)
+    result = {"name": name, "number": number, "repeat": repeat, "us_per_op": stats, "best_us": min(rounds)}
+    print(f"  {stats['p50']:12.2f} us/op (best {min(rounds):10.2f})  {name}")
+    return result
+
+
+def _make_response(body: bytes) -> requests.Response:
+    """构造一个已读取完响应体的 Response（不经过网络）"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response._content_consumed = True
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+def run_micro(body: bytes, number: int, repeat: int) -> List[Dict[str, Any]]:
+    """
+    热点函数的单独基准
+
+    Args:
+        body: 用作响应体的JSON
+        number: 每轮调用次数
+        repeat: 轮数
+
+    Returns:
+        基准结果列表
+    """
+    print("热点函数:")
+    api = BaseAPI()
+    response_data = json.loads(body)
+    expected = json.loads(body)
+    data_file = "report_cases.yaml"
+    YamlLoader.load_test_data(data_file)
+
+    cases = [
+        ("HttpClient._get_headers", lambda: http_client._get_headers({"X-Trace": "bench"})),
+        ("HttpClient._build_url", lambda: http_client._build_url("/api/report/order/listPage")),
+        ("BaseAPI._handle_response", lambda: api._handle_response(_make_response(body))),
+        ("BaseTest.extract_value（嵌套路径）",
+         lambda: BaseTest.extract_value(response_data, "data.listData[0].orderId")),
+        ("BaseTest.extract_value（路径不存在）",
+         lambda: BaseTest.extract_value(response_data, "data.missing[3].id")),
+        ("AssertHelper.assert_equal（标量）", lambda: assert_helper.assert_equal("200", "200")),
+        ("AssertHelper.assert_equal（整个响应）", lambda: assert_helper.assert_equal(response_data, expected)),
+        ("AssertHelper.assert_in", lambda: assert_helper.assert_in("listData", response_data["data"])),
+        ("YamlLoader.load_test_data（缓存命中，深拷贝）", lambda: YamlLoader.load_test_data(data_file)),
+        ("YamlLoader.load_test_data（缓存命中，零拷贝）", lambda: YamlLoader.load_test_data(data_file, shared=True)),
+        ("YamlLoader.get_case_data（深拷贝）",
+         lambda: YamlLoader.get_case_data(data_file, "history_order_list")),
+    ]
+    return [_bench(name, func, number, repeat) for name, func in cases]
+
+
+def _latency_result(name: str, latencies: List[float], wall: float) -> Dict[str, Any]:
+    """汇总一次端到端运行"""
+    stats = summarize(latencies)
+    throughput = len(latencies) / wall if wall else 0.0
+    print(f"  {throughput:10.1f} req/s  p50 {stats['p50']:7.2f} ms  p95 {stats['p95']:7.2f} ms  {name}")
+    return {"name": name, "requests": len(latencies), "wall_s": wall,
+            "throughput_rps": throughput, "latency_ms": stats}
+
+
+def _timed_call(api: ReportAPI) -> float:
+    """调用一次接口并返回耗时（毫秒）"""
+    start = time.perf_counter()
+    api.report_order_listPage(params=LIST_PAGE_PARAMS)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_end_to_end(requests_count: int, workers: int) -> List[Dict[str, Any]]:
+    """
+    端到端调用 ReportAPI.report_order_listPage
+
+    Args:
+        requests_count: 每种方式的请求次数
+        workers: 多线程和 asyncio 方式的并发数
+
+    Returns:
+        基准结果列表
+    """
+    print("端到端 ReportAPI.report_order_listPage:")
+    api = ReportAPI(account_name="default")
+    for _ in range(min(20, requests_count)):  # 预热连接池
+        _timed_call(api)
+    results = []
+
+    start = time.perf_counter()
+    latencies = [_timed_call(api) for _ in range(requests_count)]
+    results.append(_latency_result("顺序执行", latencies, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(lambda _: _timed_call(api), range(requests_count)))
+    results.append(_latency_result(f"多线程（{workers} 线程）", latencies, time.perf_counter() - start))
+
+    async def _run_async() -> List[float]:
+        # 客户端是同步的：asyncio 方式把调用交给默认线程池，由信号量限制并发
+        semaphore = asyncio.Semaphore(workers)
+
+        async def _one() -> float:
+            async with semaphore:
+                return await asyncio.to_thread(_timed_call, api)
+
+        return await asyncio.gather(*(_one() for _ in range(requests_count)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(_run_async())
+    results.append(_latency_result(f"asyncio（并发 {workers}）", latencies, time.perf_counter() - start))
+    return results
+
+
+def _git_commit() -> str:
+    """当前提交号（非 git 环境时返回空字符串）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="核心热点路径基准测试")
+    parser.add_argument("--number", type=int, default=2000, help="热点函数每轮调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="热点函数轮数")
+    parser.add_argument("--requests", type=int, default=300, help="端到端每种方式的请求次数")
+    parser.add_argument("--workers", type=int, default=8, help="端到端并发数")
+    parser.add_argument("--size", type=int, default=10000, help="模拟服务的合成订单数量")
+    parser.add_argument("--log-level", default="WARNING", help="基准期间的日志级别（默认屏蔽INFO日志）")
+    parser.add_argument("--skip-e2e", action="store_true", help="只运行热点函数基准")
+    parser.add_argument("--output", default=None, help="结果JSON路径，默认 reports/bench_core.json")
+    args = parser.parse_args(argv)
+
+    logger.setLevel(getattr(logging, args.log_level.upper()))
+    output = args.output or os.path.join("reports", "bench_core.json")
+
+    server = ReportMockServer(size=args.size)
+    with server as base_url:
+        http_client.base_url = base_url
+        results = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": vars(args),
+            },
+            "micro": run_micro(server.render_list_page(LIST_PAGE_PARAMS), args.number, args.repeat),
+            "end_to_end": [] if args.skip_e2e else run_end_to_end(args.requests, args.workers),
+        }
+
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
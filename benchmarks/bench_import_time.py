@@ -0,0 +1,130 @@
+"""
+导入耗时基准测试
+基于 python -X importtime 统计导入框架模块的耗时，并检查是否超出预算
+
+用法:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --budget-ms 80 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 框架自身的顶层包（只统计这些包的 self 耗时，第三方库不计入预算）
+PROJECT_PACKAGES = ("core", "bizs", "tests")
+
+# 模拟 pytest 收集阶段会导入的模块
+DEFAULT_IMPORTS = [
+    "core.utils.config_loader",
+    "core.utils.logger",
+    "core.base.http_client",
+    "core.assert_helper",
+    "core.test_helper",
+    "bizs.apis.report_api",
+    "tests.conftest",
+]
+
+# 导入完成后检查全局单例是否仍未初始化
+LAZY_CHECK = """
+from core.utils.config_loader import config
+from core.utils.account_loader import account_loader
+from core.utils.logger import logger
+from core.base.session_manager import session_manager
+from core.base.http_client import http_client
+built = [name for name, obj in (
+    ("config", config), ("account_loader", account_loader), ("logger", logger),
+    ("session_manager", session_manager), ("http_client", http_client),
+) if obj.is_initialized()]
+print(",".join(built))
+"""
+
+
+def _run_importtime(modules: List[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    在子进程中导入模块并解析 -X importtime 输出
+
+    Args:
+        modules: 要导入的模块列表
+
+    Returns:
+        {模块名: (self耗时us, 累计耗时us)}
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        timings[name] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def _check_lazy() -> List[str]:
+    """返回导入后已被初始化的单例名称列表（期望为空）"""
+    result = subprocess.run(
+        [sys.executable, "-c", LAZY_CHECK],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    output = result.stdout.strip()
+    return output.split(",") if output else []
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="框架模块导入耗时基准")
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="框架自身模块 self 耗时总和的预算（毫秒，取中位数）")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    parser.add_argument("--top", type=int, default=10, help="打印最慢的N个框架模块")
+    args = parser.parse_args(argv)
+
+    project_totals = []
+    overall_totals = []
+    last = {}
+    for _ in range(args.repeat):
+        last = _run_importtime(DEFAULT_IMPORTS)
+        own = [t for name, t in last.items() if name.split(".")[0] in PROJECT_PACKAGES]
+        project_totals.append(sum(s for s, _ in own) / 1000)
+        overall_totals.append(sum(s for s, _ in last.values()) / 1000)
+
+    project_ms = statistics.median(project_totals)
+    overall_ms = statistics.median(overall_totals)
+    print(f"框架模块导入耗时（self，中位数）: {project_ms:.1f} ms  预算: {args.budget_ms:.1f} ms")
+    print(f"全部模块导入耗时（含第三方库，中位数）: {overall_ms:.1f} ms")
+
+    slowest = sorted(
+        ((name, t) for name, t in last.items() if name.split(".")[0] in PROJECT_PACKAGES),
+        key=lambda item: item[1][0], reverse=True
+    )[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:8.2f} ms  (累计 {cumulative_us / 1000:8.2f} ms)  {name}")
+
+    exit_code = 0
+    built = _check_lazy()
+    if built:
+        print(f"✗ 导入阶段已初始化的单例: {', '.join(built)}")
+        exit_code = 1
+    else:
+        print("✓ 导入阶段未初始化任何全局单例")
+
+    if project_ms > args.budget_ms:
+        print(f"✗ 导入耗时超出预算: {project_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+YamlLoader 基准测试
+在 50k 用例的数据文件上对比纯 Python 解析、C 加速解析、编译缓存和进程级缓存的耗时
+
+用法:
+    python -m benchmarks.bench_yaml_loader
+    python -m benchmarks.bench_yaml_loader --cases 50000 --lookups 1000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import yaml
+from core.utils.yaml_loader import YamlLoader
+
+
+def _generate_cases(path: str, count: int):
+    """生成包含 count 个用例的数据驱动YAML文件"""
+    cases = {}
+    for i in range(count):
+        cases[f"case_{i:06d}"] = {
+            "pageNum": i % 20 + 1,
+            "pageSize": 50,
+            "startDate": "2025-11-01",
+            "endDate": "2025-11-29",
+            "orderStatus": [i % 5, (i + 1) % 5],
+            "sortRule": {"field": "createTime", "order": "desc" if i % 2 else "asc"},
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump({"history_order_list": cases}, f, allow_unicode=True,
+                  Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def _timed(func, *args, **kwargs):
+    """执行函数并返回 (结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="YamlLoader 基准测试")
+    parser.add_argument("--cases", type=int, default=50000, help="用例数量")
+    parser.add_argument("--lookups", type=int, default=1000, help="按用例名查找的次数")
+    parser.add_argument("--skip-pure", action="store_true", help="跳过纯 Python 解析（较慢）")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_yaml_")
+    data_path = os.path.join(work_dir, "bench_cases.yaml")
+    try:
+        _generate_cases(data_path, args.cases)
+        size_mb = os.path.getsize(data_path) / 1024 / 1024
+        print(f"数据文件: {args.cases} 个用例, {size_mb:.1f} MB")
+
+        results = []
+        if not args.skip_pure:
+            with open(data_path, 'r', encoding='utf-8') as f:
+                _, seconds = _timed(yaml.load, f, Loader=yaml.SafeLoader)
+            results.append(("纯 Python SafeLoader 解析", seconds))
+
+        if hasattr(yaml, "CSafeLoader"):
+            with open(data_path, 'r', encoding='utf-8') as f:
+                _, seconds = _timed(yaml.load, f, Loader=yaml.CSafeLoader)
+            results.append(("C 加速 CSafeLoader 解析", seconds))
+
+        # 编译缓存：首次加载会解析并写入缓存文件
+        YamlLoader.clear_cache()
+        _, seconds = _timed(YamlLoader.load, data_path, compiled=True)
+        results.append(("YamlLoader 冷加载（解析 + 写编译缓存）", seconds))
+
+        # 模拟新进程：清空进程级缓存后从编译缓存文件加载
+        YamlLoader.clear_cache()
+        _, seconds = _timed(YamlLoader.load, data_path, compiled=True)
+        results.append(("YamlLoader 从编译缓存加载", seconds))
+
+        # 进程级缓存：按用例名多次查找
+        names = [f"case_{i * 7919 % args.cases:06d}" for i in range(args.lookups)]
+        start = time.perf_counter()
+        for name in names:
+            YamlLoader.load(data_path, shared=True)["history_order_list"][name]
+        seconds = (time.perf_counter() - start) / args.lookups
+        results.append((f"进程级缓存命中（零拷贝，单次查找，共 {args.lookups} 次）", seconds))
+
+        for label, seconds in results:
+            print(f"  {seconds * 1000:10.3f} ms  {label}")
+        print(f"缓存统计: {YamlLoader.get_cache_stats()}")
+    finally:
+        YamlLoader.clear_cache()
+        compiled_path = YamlLoader._get_compiled_path(data_path)
+        if os.path.exists(compiled_path):
+            os.remove(compiled_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,11 @@
 报表API
 封装报表相关接口，包括历史订单等功能
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from core.base.base_api import BaseAPI
 from core.base.session_manager import session_manager
 from core.utils.logger import logger
+from core.utils.pagination import iter_pages
 
 
 class ReportAPI(BaseAPI):
@@ -19,6 +20,15 @@ class ReportAPI(BaseAPI):
     DEFAULT_PAGE_NUM = 1
     DEFAULT_PAGE_SIZE = 50
     
+    # 响应结构定义文件（bizs/data 下，按端点路径组织）
+    # SCHEMA_FILE 只包含接口文档约定的字段；MOCK_SCHEMA_FILE 额外约束本地模拟服务的行字段
+    SCHEMA_FILE = "schemas/report.yaml"
+    MOCK_SCHEMA_FILE = "schemas/report_mock.yaml"
+    
+    # 本地模拟服务订单行的字段名（行不变量检查使用），取自模拟服务生成的数据，未经实际接口核对：
+    # 实际接口的行字段不在接口文档约定中（见 SCHEMA_FILE），行不变量只在模拟服务下检查
+    MOCK_ORDER_ROW_FIELDS = {"date_field": "createTime", "status_field": "orderStatus", "id_field": "orderId"}
+    
     def __init__(self, account_name: str = "default"):
         """
         初始化报表API
@@ -135,4 +145,24 @@ class ReportAPI(BaseAPI):
         
         # 返回响应数据字典供测试用例进行业务逻辑断言
         return response_data
-
+    
+    def iter_order_list_pages(
+        self,
+        params: Dict[str, Any],
+        page_size: int = None
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]], Optional[int]]]:
+        """
+        从第1页开始逐页获取历史订单列表，直到取完 totalCount 条或遇到空页
+        
+        Args:
+            params: 查询参数（pageNum、pageSize 由本方法控制）
+            page_size: 每页大小，默认使用 params 中的 pageSize 或 DEFAULT_PAGE_SIZE
+            
+        Yields:
+            (页码, 该页订单列表, totalCount)
+        """
+        page_size = page_size or params.get("pageSize") or self.DEFAULT_PAGE_SIZE
+        return iter_pages(
+            lambda page_num, size: self.report_order_listPage(dict(params, pageNum=page_num, pageSize=size)),
+            page_size
+        )
@@ -0,0 +1 @@
+# mock包初始化文件
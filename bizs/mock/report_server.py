@@ -0,0 +1,354 @@
+"""
+报表后端本地模拟服务
+在合成数据集上实现 /api/report/order/listPage（分页、totalCount、日期筛选、订单状态筛选、排序），
+支持延迟和错误注入，用于离线的功能测试和性能实验
+
+用法:
+    python -m bizs.mock.report_server --port 8800 --size 100000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from core.utils.config_loader import config
+
+
+LIST_PAGE_PATH = "/api/report/order/listPage"
+
+# 订单状态取值
+ORDER_STATUSES = (0, 1, 2, 3, 4, 5)
+
+# 支持排序的字段
+SORT_FIELDS = ("createTime", "amount", "orderId")
+
+# 单页最大条数
+MAX_PAGE_SIZE = 1000
+
+# 请求级别的注入（优先于服务配置）
+LATENCY_HEADER = "X-Mock-Latency-Ms"
+ERROR_HEADER = "X-Mock-Error-Status"
+
+
+def generate_orders(size: int, seed: int = 42, start_date: str = "2025-01-01", days: int = 365) -> List[Dict[str, Any]]:
+    """
+    生成按 createTime 升序排列的合成订单数据
+
+    Args:
+        size: 订单数量
+        seed: 随机种子（相同参数生成相同数据）
+        start_date: 第一天，格式：YYYY-MM-DD
+        days: 覆盖的天数
+
+    Returns:
+        订单列表
+    """
+    rng = random.Random(seed)
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    span = days * 86400
+    offsets = sorted(rng.randrange(span) for _ in range(size))
+    orders = []
+    for i, offset in enumerate(offsets):
+        orders.append({
+            "orderId": f"ORD{seed % 100:02d}{i:010d}",
+            "orderStatus": rng.choice(ORDER_STATUSES),
+            "createTime": (start + timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S"),
+            "amount": round(rng.uniform(5, 500), 2),
+            "shopName": f"门店{rng.randrange(50):02d}",
+        })
+    return orders
+
+
+class ReportMockServer:
+    """
+    报表后端模拟服务类
+
+    数据集按 createTime 升序生成，日期筛选用二分查找定位区间；
+    其他排序字段的排列在首次使用时计算并缓存；每条订单预先编码为JSON，响应时直接拼接
+
+    Example:
+        >>> with ReportMockServer(size=1000) as base_url:
+        ...     http_client.base_url = base_url
+    """
+
+    def __init__(self, size: int = 10000, seed: int = 42, start_date: str = "2025-01-01", days: int = 365,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0, error_status: int = 500,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟服务
+
+        Args:
+            size: 合成订单数量
+            seed: 随机种子
+            start_date: 数据集第一天，格式：YYYY-MM-DD
+            days: 数据集覆盖的天数
+            latency_ms: 每次请求的固定延迟（毫秒）
+            jitter_ms: 额外的随机延迟上限（毫秒）
+            error_rate: 随机返回错误的比例（0-1）
+            error_status: 注入错误时返回的HTTP状态码
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+        """
+        self.orders = generate_orders(size, seed, start_date, days)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+        self._times = [order["createTime"] for order in self.orders]
+        self._statuses = bytes(order["orderStatus"] for order in self.orders)
+        self._encoded = [json.dumps(order, ensure_ascii=False).encode("utf-8") for order in self.orders]
+        self._sorted: Dict[str, List[int]] = {}
+        self._sort_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def from_config(cls, **overrides) -> "ReportMockServer":
+        """
+        按 config.yaml 的 mock_server 配置创建模拟服务
+
+        Args:
+            **overrides: 覆盖配置的构造参数（值为None时忽略）
+
+        Returns:
+            模拟服务实例（未启动）
+        """
+        options = dict(
+            size=config.get('mock_server.dataset_size', 10000),
+            seed=config.get('mock_server.seed', 42),
+            start_date=config.get('mock_server.start_date', "2025-01-01"),
+            days=config.get('mock_server.days', 365),
+            latency_ms=config.get('mock_server.latency_ms', 0),
+            jitter_ms=config.get('mock_server.jitter_ms', 0),
+            error_rate=config.get('mock_server.error_rate', 0.0),
+            error_status=config.get('mock_server.error_status', 500),
+            host=config.get('mock_server.host', "127.0.0.1"),
+            port=config.get('mock_server.port', 0),
+        )
+        options.update((key, value) for key, value in overrides.items() if value is not None)
+        return cls(**options)
+
+    # ===== 查询 =====
+
+    def _sorted_indexes(self, field: str) -> List[int]:
+        """按字段升序的订单下标（createTime 以外的字段首次使用时计算）"""
+        indexes = self._sorted.get(field)
+        if indexes is None:
+            with self._sort_lock:
+                indexes = self._sorted.get(field)
+                if indexes is None:
+                    indexes = sorted(range(len(self.orders)), key=lambda i: (self.orders[i][field], i))
+                    self._sorted[field] = indexes
+        return indexes
+
+    def query(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any], List[int]]:
+        """
+        执行一次列表查询
+
+        Args:
+            params: 请求体，包含 pageNum, pageSize, startDate, endDate, orderStatus, sortRule
+
+        Returns:
+            (业务状态码, data 中除 listData 以外的字段或错误信息, 当前页的订单下标)
+        """
+        try:
+            page_num = int(params.get("pageNum", 1))
+            page_size = int(params.get("pageSize", 50))
+        except (TypeError, ValueError):
+            return 400, {"message": "pageNum/pageSize 必须为整数"}, []
+        if page_num < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            return 400, {"message": f"pageNum 必须 >= 1，pageSize 必须在 1-{MAX_PAGE_SIZE} 之间"}, []
+
+        # 空字段、空排序方向和空状态列表与真实后端一致：表示使用默认值、不筛选
+        sort_rule = params.get("sortRule") or {}
+        if not isinstance(sort_rule, dict):
+            return 400, {"message": "sortRule 必须为对象"}, []
+        field = sort_rule.get("field") or "createTime"
+        descending = str(sort_rule.get("order") or "desc").lower() == "desc"
+        if field not in SORT_FIELDS:
+            return 400, {"message": f"不支持的排序字段: {field}"}, []
+
+        # 日期区间（闭区间）对应的 createTime 下标范围
+        start_date, end_date = params.get("startDate"), params.get("endDate")
+        lo = bisect_left(self._times, f"{start_date} 00:00:00") if start_date else 0
+        hi = bisect_right(self._times, f"{end_date} 23:59:59") if end_date else len(self._times)
+        hi = max(lo, hi)
+
+        statuses = params.get("orderStatus")
+        try:
+            if statuses and not isinstance(statuses, list):
+                raise TypeError
+            status_set = {int(s) for s in statuses} if statuses else None
+        except (TypeError, ValueError):
+            return 400, {"message": "orderStatus 必须为整数列表"}, []
+
+        offset = (page_num - 1) * page_size
+        if field == "createTime":
+            candidates = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            if status_set is None:
+                total = hi - lo
+                page = list(candidates[offset:offset + page_size])
+                return 200, {"totalCount": total, "pageNum": page_num, "pageSize": page_size}, page
+        else:
+            ordered = self._sorted_indexes(field)
+            candidates = (i for i in (reversed(ordered) if descending else ordered) if lo <= i < hi)
+
+        total = 0
+        page = []
+        statuses_by_index = self._statuses
+        for i in candidates:
+            if status_set is not None and statuses_by_index[i] not in status_set:
+                continue
+            if offset <= total < offset + page_size:
+                page.append(i)
+            total += 1
+        return 200, {"totalCount": total, "pageNum": page_num, "pageSize": page_size}, page
+
+    def render_list_page(self, params: Dict[str, Any]) -> bytes:
+        """
+        生成 listPage 响应体
+
+        Args:
+            params: 请求体
+
+        Returns:
+            UTF-8 编码的JSON响应体
+        """
+        code, data, page = self.query(params)
+        if code != 200:
+            return json.dumps({"code": str(code), "message": data["message"], "data": None},
+                              ensure_ascii=False).encode("utf-8")
+        head = json.dumps({"code": "200", "message": "success", "data": data}, ensure_ascii=False)
+        # 在 data 对象末尾拼接预先编码好的 listData
+        rows = b",".join(self._encoded[i] for i in page)
+        return head[:-2].encode("utf-8") + b',"listData":[' + rows + b"]}}"
+
+    # ===== 注入 =====
+
+    def _injected_delay(self, headers) -> float:
+        """本次请求的注入延迟（秒）"""
+        latency = headers.get(LATENCY_HEADER)
+        latency_ms = float(latency) if latency is not None else self.latency_ms
+        if self.jitter_ms:
+            latency_ms += self._rng.uniform(0, self.jitter_ms)
+        return latency_ms / 1000
+
+    def _injected_error(self, headers) -> Optional[int]:
+        """本次请求注入的错误状态码，不注入时返回None"""
+        status = headers.get(ERROR_HEADER)
+        if status is not None:
+            return int(status)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    # ===== 服务 =====
+
+    @property
+    def base_url(self) -> str:
+        """服务的基础URL（启动后可用）"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        在后台线程启动服务
+
+        Returns:
+            服务的基础URL
+        """
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头和响应体分两次写出，不关闭 Nagle 算法会遇到约40ms的延迟确认
+            disable_nagle_algorithm = True
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._count_lock:
+                    server.request_count += 1
+                if self.path.split("?")[0] != LIST_PAGE_PATH:
+                    self._send(404, b'{"code":"404","message":"not found","data":null}')
+                    return
+                delay = server._injected_delay(self.headers)
+                if delay > 0:
+                    time.sleep(delay)
+                error_status = server._injected_error(self.headers)
+                if error_status is not None:
+                    body = json.dumps({"code": str(error_status), "message": "mock injected error", "data": None})
+                    self._send(error_status, body.encode("utf-8"))
+                    return
+                try:
+                    params = json.loads(raw) if raw else {}
+                except ValueError:
+                    self._send(400, b'{"code":"400","message":"invalid json","data":null}')
+                    return
+                self._send(200, server.render_list_page(params))
+
+            def do_GET(self):
+                self._send(405, b'{"code":"405","message":"method not allowed","data":null}')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever, name="report-mock-server", daemon=True)
+        thread.start()
+        return self.base_url
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main(argv=None) -> int:
+    """独立运行模拟服务（参数默认取 config.yaml 的 mock_server 配置）"""
+    parser = argparse.ArgumentParser(description="报表后端本地模拟服务")
+    parser.add_argument("--port", type=int, default=None, help="监听端口")
+    parser.add_argument("--size", type=int, default=None, help="合成订单数量")
+    parser.add_argument("--latency-ms", type=float, default=None, help="固定延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=None, help="随机错误比例")
+    args = parser.parse_args(argv)
+
+    server = ReportMockServer.from_config(
+        port=args.port if args.port is not None else (config.get('mock_server.port', 0) or 8800),
+        size=args.size, latency_ms=args.latency_ms, error_rate=args.error_rate
+    )
+    print(f"模拟服务已启动: {server.start()}{LIST_PAGE_PATH}（{len(server.orders)} 条订单，Ctrl+C 退出）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,8 +2,55 @@
 断言助手
 提供各种断言方法用于测试验证
 """
-from typing import Any, Dict, List, Optional
+import logging
+import reprlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.utils.config_loader import config
 from core.utils.logger import logger
+from core.utils.row_invariants import RowInvariants
+from core.utils.schema_validator import get_validator
+from core.utils.snapshot import snapshot_store
+from core.utils.stats import percentile, summarize
+
+
+# 未缓存解析结果的标记
+_MISSING = object()
+
+# 断言消息和通过日志中使用的截断 repr（大容器只显示开头部分）
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxdict = 10
+_repr.maxlist = 10
+_repr.maxtuple = 10
+_repr.maxset = 10
+_repr.maxother = 200
+
+
+def short_repr(value: Any) -> str:
+    """
+    生成截断后的值表示（字符串原样显示，其他类型使用 repr），
+    长度上限为 assertion.max_repr_chars，截断只遍历显示的部分
+
+    Args:
+        value: 任意值
+
+    Returns:
+        截断后的字符串
+    """
+    limit = config.get('assertion.max_repr_chars', 200)
+    if isinstance(value, str):
+        return value if len(value) <= limit else f"{value[:limit]}...（共 {len(value)} 字符）"
+    _repr.maxstring = limit
+    text = _repr.repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _log_pass(template: str, *values: Any):
+    """输出断言通过日志（INFO 未启用时不格式化任何值）"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(template.format(*(short_repr(value) for value in values)))
 
 
 class AssertHelper:
@@ -21,7 +68,7 @@ class AssertHelper:
         actual_code = response.status_code
         assert actual_code == expected_code, \
             f"状态码断言失败: 期望 {expected_code}, 实际 {actual_code}"
-        logger.info(f"✓ 状态码断言通过: {actual_code}")
+        _log_pass("✓ 状态码断言通过: {}", actual_code)
     
     @staticmethod
     def assert_equal(actual: Any, expected: Any, message: str = ""):
@@ -34,8 +81,8 @@ class AssertHelper:
             message: 错误消息
         """
         assert actual == expected, \
-            f"相等断言失败: 期望 {expected}, 实际 {actual}. {message}"
-        logger.info(f"✓ 相等断言通过: {actual} == {expected}")
+            f"相等断言失败: 期望 {short_repr(expected)}, 实际 {short_repr(actual)}. {message}"
+        _log_pass("✓ 相等断言通过: {} == {}", actual, expected)
     
     @staticmethod
     def assert_not_equal(actual: Any, expected: Any, message: str = ""):
@@ -48,8 +95,8 @@ class AssertHelper:
             message: 错误消息
         """
         assert actual != expected, \
-            f"不相等断言失败: 实际值 {actual} 不应该等于 {expected}. {message}"
-        logger.info(f"✓ 不相等断言通过: {actual} != {expected}")
+            f"不相等断言失败: 实际值 {short_repr(actual)} 不应该等于 {short_repr(expected)}. {message}"
+        _log_pass("✓ 不相等断言通过: {} != {}", actual, expected)
     
     @staticmethod
     def assert_in(item: Any, container: Any, message: str = ""):
@@ -62,8 +109,8 @@ class AssertHelper:
             message: 错误消息
         """
         assert item in container, \
-            f"包含断言失败: {item} 不在 {container} 中. {message}"
-        logger.info(f"✓ 包含断言通过: {item} 在容器中")
+            f"包含断言失败: {short_repr(item)} 不在 {short_repr(container)} 中. {message}"
+        _log_pass("✓ 包含断言通过: {} 在容器中", item)
     
     @staticmethod
     def assert_not_in(item: Any, container: Any, message: str = ""):
@@ -76,8 +123,8 @@ class AssertHelper:
             message: 错误消息
         """
         assert item not in container, \
-            f"不包含断言失败: {item} 不应该在 {container} 中. {message}"
-        logger.info(f"✓ 不包含断言通过: {item} 不在容器中")
+            f"不包含断言失败: {short_repr(item)} 不应该在 {short_repr(container)} 中. {message}"
+        _log_pass("✓ 不包含断言通过: {} 不在容器中", item)
     
     @staticmethod
     def assert_true(condition: bool, message: str = ""):
@@ -115,7 +162,7 @@ class AssertHelper:
             message: 错误消息
         """
         assert value is None, \
-            f"None断言失败: 值 {value} 不是None. {message}"
+            f"None断言失败: 值 {short_repr(value)} 不是None. {message}"
         logger.info(f"✓ None断言通过")
     
     @staticmethod
@@ -131,6 +178,46 @@ class AssertHelper:
             f"非None断言失败: 值是None. {message}"
         logger.info(f"✓ 非None断言通过")
     
+    @staticmethod
+    def get_json(response) -> Any:
+        """
+        获取响应的JSON数据（解析结果缓存在响应对象上，多次断言只解析一次）
+        
+        Args:
+            response: requests.Response对象
+            
+        Returns:
+            解析后的JSON数据
+        """
+        parsed = getattr(response, '_parsed_json', _MISSING)
+        if parsed is _MISSING:
+            try:
+                parsed = response.json()
+            except ValueError:
+                raise AssertionError(f"响应不是有效的JSON格式: {short_repr(response.text)}")
+            response._parsed_json = parsed
+        return parsed
+    
+    @staticmethod
+    def soft(response=None, data: Any = _MISSING) -> "SoftAssert":
+        """
+        创建批量（软）断言：依次执行所有检查，结束时一次性报告全部失败
+        
+        Args:
+            response: requests.Response对象（JSON只解析一次）
+            data: 直接断言的数据（如 BaseAPI 返回的字典），与 response 二选一
+            
+        Returns:
+            SoftAssert 实例，可作为上下文管理器使用
+            
+        Example:
+            >>> with assert_helper.soft(response) as check:
+            ...     check.status_code(200)
+            ...     check.code("200")
+            ...     check.contains("data")
+        """
+        return SoftAssert(response, data)
+    
     @staticmethod
     def assert_response_json(response, expected: Dict[str, Any], 
                             check_keys: Optional[List[str]] = None):
@@ -142,10 +229,7 @@ class AssertHelper:
             expected: 期望的JSON数据（部分匹配）
             check_keys: 需要检查的键列表，如果为None则检查expected中的所有键
         """
-        try:
-            actual = response.json()
-        except ValueError:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text}")
+        actual = AssertHelper.get_json(response)
         
         if check_keys is None:
             check_keys = expected.keys()
@@ -172,10 +256,7 @@ class AssertHelper:
             key: 要检查的键
             value: 期望的值（可选）
         """
-        try:
-            actual = response.json()
-        except ValueError:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text}")
+        actual = AssertHelper.get_json(response)
         
         assert key in actual, f"响应中缺少键: {key}"
         
@@ -193,10 +274,7 @@ class AssertHelper:
             response: requests.Response对象
             expected_code: 期望的业务状态码
         """
-        try:
-            actual = response.json()
-        except ValueError:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text}")
+        actual = AssertHelper.get_json(response)
         
         assert 'code' in actual, "响应中缺少 'code' 字段"
         AssertHelper.assert_equal(
@@ -216,10 +294,7 @@ class AssertHelper:
             expected_message: 期望的消息（或消息的一部分）
             exact_match: 是否精确匹配
         """
-        try:
-            actual = response.json()
-        except ValueError:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text}")
+        actual = AssertHelper.get_json(response)
         
         assert 'message' in actual, "响应中缺少 'message' 字段"
         
@@ -235,6 +310,288 @@ class AssertHelper:
                 actual['message'], 
                 "消息不包含期望的内容"
             )
+    
+    @staticmethod
+    def assert_response_time(response, max_ms: float, message: str = ""):
+        """
+        断言单次请求耗时
+        
+        Args:
+            response: requests.Response对象（启用耗时分解时使用 response.timing.total_ms，
+                      否则使用 response.elapsed）
+            max_ms: 允许的最大耗时（毫秒）
+            message: 错误消息
+        """
+        timing = getattr(response, 'timing', None)
+        elapsed_ms = timing.total_ms if timing is not None else response.elapsed.total_seconds() * 1000
+        assert elapsed_ms <= max_ms, \
+            f"耗时断言失败: 期望 <= {max_ms} ms, 实际 {elapsed_ms:.1f} ms. {message}"
+        logger.info(f"✓ 耗时断言通过: {elapsed_ms:.1f} ms <= {max_ms} ms")
+    
+    @staticmethod
+    def measure_latency(func: Callable[[], Any], warmup: int = 0,
+                        repeat: int = 1) -> Tuple[Any, List[float]]:
+        """
+        重复执行函数并测量每次的请求耗时
+        
+        每次执行的耗时为该次执行中当前线程发出的所有请求的 total_ms 之和
+        （不含断言、日志等客户端开销）；未启用耗时分解时退化为函数的执行耗时
+        
+        Args:
+            func: 无参函数，通常是一次接口调用
+            warmup: 预热次数（不计入结果）
+            repeat: 计入结果的执行次数
+            
+        Returns:
+            (最后一次执行的返回值, 每次执行的耗时列表（毫秒）)
+        """
+        from core.base.request_timing import timing_collector
+        thread_id = threading.get_ident()
+        current: List[float] = []
+        
+        def hook(timing):
+            if threading.get_ident() == thread_id:
+                current.append(timing.total_ms)
+        
+        timing_collector.add_hook(hook)
+        try:
+            for _ in range(warmup):
+                func()
+            result = None
+            latencies = []
+            for _ in range(max(repeat, 1)):
+                current.clear()
+                start = time.perf_counter()
+                result = func()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                latencies.append(sum(current) if current else elapsed_ms)
+        finally:
+            timing_collector.remove_hook(hook)
+        return result, latencies
+    
+    @staticmethod
+    def assert_latency_budget(func: Callable[[], Any], budget: Optional[Dict[str, Any]] = None,
+                              message: str = "") -> Any:
+        """
+        按用例的性能预算执行接口调用并断言耗时
+        
+        预算通常与用例数据一起声明在 bizs/data/*.yaml 的 perf_budget 中：
+            max_latency_ms: 允许的最大耗时（毫秒），重复执行时与分位数比较
+            percentile: 重复执行时比较的分位点，默认 perf_budget.percentile（95）
+            warmup: 预热次数，默认 perf_budget.warmup
+            repeat: 重复次数，默认 perf_budget.repeat
+        
+        Args:
+            func: 无参函数，通常是一次接口调用
+            budget: 性能预算，为None或 perf_budget.enabled 为 false 时只执行一次、不断言
+            message: 错误消息
+            
+        Returns:
+            最后一次执行的返回值
+        """
+        if not budget or not config.get('perf_budget.enabled', True):
+            return func()
+        
+        q = budget.get('percentile', config.get('perf_budget.percentile', 95))
+        result, latencies = AssertHelper.measure_latency(
+            func,
+            warmup=budget.get('warmup', config.get('perf_budget.warmup', 0)),
+            repeat=budget.get('repeat', config.get('perf_budget.repeat', 1))
+        )
+        max_ms = budget.get('max_latency_ms')
+        if max_ms is None:
+            return result
+        
+        # 单个样本时分位数就是该样本本身
+        actual_ms = percentile(sorted(latencies), q)
+        stats = summarize(latencies)
+        assert actual_ms <= max_ms, \
+            f"耗时预算断言失败: p{q} 期望 <= {max_ms} ms, 实际 {actual_ms:.1f} ms " \
+            f"(样本 {stats['count']} 个, p50 {stats['p50']} ms, max {stats['max']} ms). {message}"
+        logger.info(f"✓ 耗时预算断言通过: p{q} {actual_ms:.1f} ms <= {max_ms} ms（样本 {len(latencies)} 个）")
+        return result
+
+    @staticmethod
+    def assert_schema(data: Any, name: str, file_name: str, message: str = ""):
+        """
+        断言数据符合 schema（校验器编译后缓存，一次遍历收集所有违规项）
+
+        Args:
+            data: 响应数据（或 Response 对象）
+            name: schema 名称，通常是端点，如 "/api/report/order/listPage"
+            file_name: bizs/data 下的 schema 文件，如 "schemas/report.yaml"
+            message: 错误消息
+        """
+        if hasattr(data, "status_code"):
+            data = AssertHelper.get_json(data)
+        errors = get_validator(name, file_name).validate(data)
+        limit = config.get('assertion.max_schema_errors', 20)
+        assert not errors, \
+            f"结构断言失败: {name} 共 {len(errors)} 处违规\n  " + "\n  ".join(errors[:limit]) + \
+            (f"\n  ...（其余 {len(errors) - limit} 处省略）" if len(errors) > limit else "") + \
+            (f"\n{message}" if message else "")
+        logger.info(f"✓ 结构断言通过: {name}")
+
+    @staticmethod
+    def assert_snapshot(data: Any, name: str, ignore: Optional[List[str]] = None):
+        """
+        断言数据与 golden 快照一致（规范化后先比较哈希，不一致时给出按路径定位的差异）
+        
+        Args:
+            data: 响应数据（或 Response 对象）
+            name: 快照名称，如 "report/history_order_list/指定时间筛选"
+            ignore: 额外忽略的路径，如 ["data.listData[*].createTime"]；
+                    任意层级都忽略的字段名见 snapshot.ignore_keys
+        """
+        if hasattr(data, "status_code"):
+            data = AssertHelper.get_json(data)
+        snapshot_store.assert_match(name, data, ignore)
+
+    @staticmethod
+    def assert_invariants(invariants: RowInvariants, message: str = ""):
+        """
+        断言行不变量检查没有违规（只输出一行汇总，而不是每行一条断言日志）
+        
+        Args:
+            invariants: 已对完整列表或所有分页调用过 check() 的 RowInvariants
+            message: 错误消息
+        """
+        assert not invariants.violations, \
+            f"列表条件断言失败: {invariants.describe()}" + (f"\n{message}" if message else "")
+        logger.info(f"✓ 列表条件断言通过: {invariants.describe()}")
+
+
+class SoftAssert:
+    """
+    批量（软）断言类
+    
+    每项检查失败时只记录失败信息，不立即抛出；退出上下文或调用 assert_all() 时
+    一次性报告所有失败。通过的检查不输出日志，结束时只输出一行汇总
+    """
+    
+    def __init__(self, response=None, data: Any = _MISSING):
+        """
+        初始化批量断言
+        
+        Args:
+            response: requests.Response对象
+            data: 直接断言的数据，与 response 二选一
+        """
+        self.response = response
+        self._data = data
+        self.checks = 0
+        self.failures: List[str] = []
+    
+    @property
+    def data(self) -> Any:
+        """断言的数据（来自 response 时只解析一次）"""
+        if self._data is _MISSING:
+            self._data = AssertHelper.get_json(self.response)
+        return self._data
+    
+    def check(self, condition: bool, message: Callable[[], str]) -> bool:
+        """
+        记录一项检查
+        
+        Args:
+            condition: 检查结果
+            message: 生成失败信息的函数（只在失败时调用）
+            
+        Returns:
+            检查结果
+        """
+        self.checks += 1
+        if not condition:
+            self.failures.append(message())
+        return condition
+    
+    def equal(self, actual: Any, expected: Any, message: str = "") -> bool:
+        """检查相等"""
+        return self.check(actual == expected, lambda: f"相等断言失败: 期望 {short_repr(expected)}, "
+                                                      f"实际 {short_repr(actual)}. {message}")
+    
+    def not_equal(self, actual: Any, expected: Any, message: str = "") -> bool:
+        """检查不相等"""
+        return self.check(actual != expected, lambda: f"不相等断言失败: 实际值 {short_repr(actual)} "
+                                                      f"不应该等于 {short_repr(expected)}. {message}")
+    
+    def is_in(self, item: Any, container: Any, message: str = "") -> bool:
+        """检查包含"""
+        return self.check(item in container, lambda: f"包含断言失败: {short_repr(item)} "
+                                                     f"不在 {short_repr(container)} 中. {message}")
+    
+    def not_in(self, item: Any, container: Any, message: str = "") -> bool:
+        """检查不包含"""
+        return self.check(item not in container, lambda: f"不包含断言失败: {short_repr(item)} "
+                                                         f"不应该在 {short_repr(container)} 中. {message}")
+    
+    def true(self, condition: bool, message: str = "") -> bool:
+        """检查为真"""
+        return self.check(condition is True, lambda: f"真值断言失败: 条件为False. {message}")
+    
+    def false(self, condition: bool, message: str = "") -> bool:
+        """检查为假"""
+        return self.check(condition is False, lambda: f"假值断言失败: 条件为True. {message}")
+    
+    def is_none(self, value: Any, message: str = "") -> bool:
+        """检查为None"""
+        return self.check(value is None, lambda: f"None断言失败: 值 {short_repr(value)} 不是None. {message}")
+    
+    def is_not_none(self, value: Any, message: str = "") -> bool:
+        """检查不为None"""
+        return self.check(value is not None, lambda: f"非None断言失败: 值是None. {message}")
+    
+    def status_code(self, expected_code: int) -> bool:
+        """检查HTTP状态码"""
+        actual_code = self.response.status_code
+        return self.check(actual_code == expected_code,
+                          lambda: f"状态码断言失败: 期望 {expected_code}, 实际 {actual_code}")
+    
+    def contains(self, key: str, value: Any = _MISSING) -> bool:
+        """检查数据包含指定键（可选：值也匹配）"""
+        if not self.check(key in self.data, lambda: f"响应中缺少键: {key}"):
+            return False
+        if value is _MISSING:
+            return True
+        return self.equal(self.data[key], value, f"键 '{key}' 的值不匹配")
+    
+    def json(self, expected: Dict[str, Any], check_keys: Optional[List[str]] = None) -> bool:
+        """检查数据与期望部分匹配（同 assert_response_json）"""
+        passed = True
+        for key in (expected.keys() if check_keys is None else check_keys):
+            if key in expected:
+                passed = self.contains(key, expected[key]) and passed
+            else:
+                passed = self.contains(key) and passed
+        return passed
+    
+    def code(self, expected_code: Any) -> bool:
+        """检查业务状态码"""
+        return self.contains('code', expected_code)
+    
+    def message(self, expected_message: str, exact_match: bool = False) -> bool:
+        """检查 message 字段"""
+        if not self.contains('message'):
+            return False
+        if exact_match:
+            return self.equal(self.data['message'], expected_message, "消息不匹配")
+        return self.is_in(expected_message, self.data['message'], "消息不包含期望的内容")
+    
+    def assert_all(self):
+        """报告所有失败（存在失败时抛出 AssertionError）"""
+        if self.failures:
+            details = "\n".join(f"  {i}. {failure}" for i, failure in enumerate(self.failures, 1))
+            raise AssertionError(f"批量断言失败: {len(self.failures)}/{self.checks} 项未通过\n{details}")
+        logger.info(f"✓ 批量断言通过: 共 {self.checks} 项")
+    
+    def __enter__(self) -> "SoftAssert":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # 代码块内抛出了其他异常时不覆盖它
+        if exc_type is None:
+            self.assert_all()
+        return False
 
 
 # 全局断言助手实例
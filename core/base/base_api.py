@@ -2,9 +2,12 @@
 API基类
 所有API类的基类，提供通用功能
 """
+import time
 import requests
 from typing import Dict, Any, Optional
 from core.base.http_client import http_client
+from core.base.request_timing import timing_collector
+from core.utils.memory import memory_tracker
 from core.utils.logger import logger
 
 
@@ -29,7 +32,20 @@ class BaseAPI:
         """
         try:
             response.raise_for_status()
-            return response.json()
+            timing = getattr(response, 'timing', None)
+            if timing is None:
+                result = response.json()
+            else:
+                # 记录JSON解析耗时
+                start = time.perf_counter()
+                result = response.json()
+                timing_collector.record_json_decode(timing, (time.perf_counter() - start) * 1000)
+            # 缓存解析结果，断言时不再重复解析
+            response._parsed_json = result
+            # 记录解析后对象的内存大小
+            if memory_tracker.enabled:
+                memory_tracker.record_decoded(result)
+            return result
         except requests.exceptions.HTTPError as e:
             self.logger.error(f"HTTP错误: {e}, 响应内容: {response.text}")
             raise
@@ -2,11 +2,22 @@
 HTTP客户端
 提供通用的HTTP请求封装
 """
+import logging
+import time
 import requests
 from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
 from core.utils.config_loader import config
 from core.utils.logger import logger
 from core.base.session_manager import session_manager
+from core.base.rate_limiter import rate_limiter
+from core.utils.lazy_proxy import LazyProxy
+from core.utils.request_log import request_log
+from core.utils.metrics import metrics
+from core.utils.memory import memory_tracker
+from core.base.request_timing import (
+    RequestTiming, TimingHTTPAdapter, set_current_timing, timing_collector
+)
 
 
 class HttpClient:
@@ -18,6 +29,13 @@ class HttpClient:
         self.timeout = config.get('base.timeout', 30)
         self.verify_ssl = config.get('base.verify_ssl', True)
         self.session = requests.Session()
+        
+        # 请求耗时分解（连接池等待、建连/TLS、首字节、下载）
+        self.timing_enabled = config.get('timing.enabled', True)
+        if self.timing_enabled:
+            adapter = TimingHTTPAdapter()
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
     
     def _get_headers(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """
@@ -66,22 +84,26 @@ class HttpClient:
         return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
     
     def _log_request(self, method: str, url: str, **kwargs):
-        """记录请求日志"""
+        """记录请求日志（请求体、参数、请求头只在DEBUG级别时才格式化）"""
+        if not request_log.text_log:
+            return
         logger.info(f"[请求] {method.upper()} {url}")
-        if 'json' in kwargs:
-            logger.debug(f"[请求体] {kwargs['json']}")
-        if 'params' in kwargs:
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        if kwargs.get('json') is not None:
+            logger.debug(f"[请求体] {request_log.truncate(kwargs['json'])}")
+        if kwargs.get('params'):
             logger.debug(f"[请求参数] {kwargs['params']}")
-        if 'headers' in kwargs:
-            logger.debug(f"[请求头] {kwargs['headers']}")
+        if kwargs.get('headers'):
+            logger.debug(f"[请求头] {request_log.redact_headers(kwargs['headers'])}")
     
     def _log_response(self, response: requests.Response):
-        """记录响应日志"""
+        """记录响应日志（响应体只在DEBUG级别时才输出，且按配置截断）"""
+        if not request_log.text_log:
+            return
         logger.info(f"[响应] 状态码: {response.status_code}")
-        try:
-            logger.debug(f"[响应体] {response.json()}")
-        except:
-            logger.debug(f"[响应体] {response.text[:500]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[响应体] {request_log.truncate(response.text)}")
     
     def request(
         self,
@@ -124,6 +146,16 @@ class HttpClient:
         # 记录请求日志
         self._log_request(method, url, params=params, json=json, data=data, headers=request_headers)
         
+        # 客户端限速（按主机、账号、端点的令牌桶，等待时间不计入请求耗时）
+        buckets = rate_limiter.acquire(urlsplit(url).netloc, session_manager.get_account(), endpoint) \
+            if rate_limiter.enabled else []
+        
+        # 非流式请求时先只读取响应头，单独计时响应体的下载
+        stream = kwargs.pop('stream', False)
+        timing = RequestTiming(method, endpoint) if self.timing_enabled else None
+        set_current_timing(timing)
+        
+        start = time.perf_counter()
         try:
             response = self.session.request(
                 method=method.upper(),
@@ -134,17 +166,58 @@ class HttpClient:
                 headers=request_headers,
                 timeout=self.timeout,
                 verify=self.verify_ssl,
+                stream=stream or timing is not None,
                 **kwargs
             )
-            
-            # 记录响应日志
-            self._log_response(response)
-            
-            return response
-            
+            if timing is not None and not stream:
+                download_start = time.perf_counter()
+                response.content
+                timing.download_ms = (time.perf_counter() - download_start) * 1000
         except requests.exceptions.RequestException as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000
             logger.error(f"请求失败: {e}")
+            account = session_manager.get_account()
+            request_log.record(
+                method, endpoint, elapsed_ms,
+                account=account, request_headers=request_headers,
+                request_body=json if json is not None else data, error=str(e)
+            )
+            metrics.observe_request(method, endpoint, account, elapsed_ms, error=type(e).__name__)
+            if timing is not None:
+                timing.total_ms = elapsed_ms
+                timing.error = str(e)
+                timing_collector.emit(timing)
             raise
+        finally:
+            # 任何异常（包括非 requests 异常）都要清除，避免后续请求的连接钩子写入本次记录
+            set_current_timing(None)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rate_limiter.observe(buckets, response.status_code, response.headers.get('Retry-After'))
+        
+        if timing is not None:
+            timing.status = response.status_code
+            timing.total_ms = elapsed_ms
+            response.timing = timing
+            timing_collector.emit(timing)
+        
+        # 记录响应体大小（流式请求的响应体由调用方读取，不统计）
+        if memory_tracker.enabled and not stream:
+            memory_tracker.record_response(len(response.content))
+        
+        # 记录响应日志和指标
+        self._log_response(response)
+        account = session_manager.get_account()
+        request_log.record(
+            method, endpoint, elapsed_ms,
+            account=account, request_headers=request_headers,
+            request_body=json if json is not None else data, response=response
+        )
+        metrics.observe_request(
+            method, endpoint, account, elapsed_ms, status=response.status_code,
+            reused=timing.reused if timing is not None else None
+        )
+        
+        return response
     
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, 
             headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
@@ -175,6 +248,6 @@ class HttpClient:
         return self.request('PATCH', endpoint, json=json, data=data, headers=headers, **kwargs)
 
 
-# 全局HTTP客户端实例
-http_client = HttpClient()
+# 全局HTTP客户端实例（延迟初始化，首次请求时才创建 requests.Session）
+http_client = LazyProxy(HttpClient)
 
@@ -0,0 +1,265 @@
+"""
+客户端限速
+按主机、账号和端点三个维度的令牌桶控制请求速率（一次请求需要同时从各维度的桶取得令牌），
+并根据响应自适应调整速率（AIMD）：
+- 收到限流响应（默认 429/503）时按比例降低速率（乘性减），带 Retry-After 时在指定时间内暂停该桶
+- 持续没有限流响应时每隔固定时间增加固定速率（加性增），最高恢复到配置的速率
+
+并行模式下每个 worker 进程各自限速，split_across_workers 开启时配置的速率按 worker 数量均分
+"""
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.utils.config_loader import config, WORKER_COUNT_ENV
+from core.utils.lazy_proxy import LazyProxy
+from core.utils.logger import logger
+
+
+# 限速维度
+SCOPES = ("host", "account", "endpoint")
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期
+        now: 当前时间戳（解析 HTTP 日期时使用），默认 time.time()
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """
+    自适应令牌桶（线程安全）
+
+    令牌不足时预占未来的令牌并返回需要等待的时间，调用方在锁外等待，
+    同一个桶上的并发请求按到达顺序依次间隔 1/rate 秒放行
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, min_rate: float = 0.5,
+                 decrease_factor: float = 0.5, increase_step: float = 1.0, increase_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化令牌桶
+
+        Args:
+            name: 名称（如 "host:api.example.com"），用于日志
+            rate: 配置的速率（每秒请求数），也是自适应调整的上限
+            burst: 突发容量（桶中最多积累的令牌数）
+            min_rate: 自适应调整的下限
+            decrease_factor: 限流时速率乘以该系数
+            increase_step: 每个调整周期增加的速率
+            increase_interval: 加性增的调整周期（秒）
+            clock: 单调时钟（测试时可替换）
+        """
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.increase_interval = increase_interval
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._last_adjust = self._updated
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        # 统计
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """
+        取得一个令牌
+
+        Returns:
+            需要等待的秒数（0 表示可以立即发送）
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            wait = max(wait, self._blocked_until - now)
+            self.waited += wait
+            return wait
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """
+        收到限流响应：降低速率，有 Retry-After 时暂停到指定时间
+
+        降速后一个发送间隔内的多个限流响应（降速前已经在途的请求）只降低一次速率
+        """
+        with self._lock:
+            now = self._clock()
+            self.throttled += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            # 降速后一个发送间隔内返回的限流响应来自降速前发出的请求
+            if now - self._last_decrease < 1 / self.rate:
+                return
+            self._refill(now)
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_adjust = self._last_decrease = now
+        logger.warning(f"限速 {self.name}: 收到限流响应，速率 {old_rate:.2f} -> {self.rate:.2f} 次/秒"
+                       + (f"，暂停 {retry_after:.1f} 秒" if retry_after else ""))
+
+    def on_success(self):
+        """收到正常响应：距上次调整超过一个周期时增加速率"""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            now = self._clock()
+            if now - self._last_adjust < self.increase_interval:
+                return
+            self._refill(now)
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._last_adjust = now
+
+
+class RateLimiter:
+    """
+    限速器：管理各维度的令牌桶
+
+    Example:
+        >>> buckets = rate_limiter.acquire("api.example.com", "default", "/api/report/order/listPage")
+        >>> response = session.request(...)
+        >>> rate_limiter.observe(buckets, response.status_code, response.headers.get("Retry-After"))
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化限速器
+
+        Args:
+            settings: 限速配置，默认 config.yaml 的 rate_limit
+            clock: 单调时钟（测试时可替换）
+            sleep: 等待函数（测试时可替换）
+        """
+        settings = settings if settings is not None else config.get('rate_limit', {}) or {}
+        self.enabled = settings.get('enabled', False)
+        self.defaults = {scope: settings.get(scope) or {} for scope in SCOPES}
+        self.overrides = {scope: (settings.get('overrides') or {}).get(scope) or {} for scope in SCOPES}
+        adaptive = settings.get('adaptive') or {}
+        self.adaptive = adaptive.get('enabled', True)
+        self.throttle_statuses = set(adaptive.get('status_codes', [429, 503]))
+        self.max_retry_after = adaptive.get('max_retry_after_s', 60)
+        self._bucket_args = {
+            "min_rate": adaptive.get('min_rate', 0.5),
+            "decrease_factor": adaptive.get('decrease_factor', 0.5),
+            "increase_step": adaptive.get('increase_step', 1.0),
+            "increase_interval": adaptive.get('increase_interval_s', 1.0),
+        }
+        # 并行模式下按 worker 数量均分速率
+        self.rate_divisor = 1
+        if settings.get('split_across_workers', True):
+            self.rate_divisor = max(1, int(os.environ.get(WORKER_COUNT_ENV, 1) or 1))
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[Tuple[str, str], Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, scope: str, key: str) -> Optional[TokenBucket]:
+        """获取（首次使用时创建）某个维度的令牌桶，未配置限速时返回 None"""
+        bucket_key = (scope, key)
+        if bucket_key not in self._buckets:
+            with self._lock:
+                if bucket_key not in self._buckets:
+                    limit = self.overrides[scope].get(key) or self.defaults[scope]
+                    rate = (limit.get('rate') or 0) / self.rate_divisor
+                    self._buckets[bucket_key] = TokenBucket(
+                        f"{scope}:{key}", rate, limit.get('burst', 1), clock=self._clock, **self._bucket_args
+                    ) if rate > 0 else None
+        return self._buckets[bucket_key]
+
+    def acquire(self, host: str, account: str, endpoint: str) -> List[TokenBucket]:
+        """
+        请求发送前取得各维度的令牌（必要时等待）
+
+        Args:
+            host: 主机（含端口）
+            account: 账号名
+            endpoint: 端点路径
+
+        Returns:
+            本次请求使用的令牌桶（传给 observe）
+        """
+        if not self.enabled:
+            return []
+        buckets = [bucket for bucket in (self._bucket("host", host), self._bucket("account", account),
+                                         self._bucket("endpoint", endpoint)) if bucket is not None]
+        wait = max((bucket.reserve() for bucket in buckets), default=0.0)
+        if wait > 0:
+            self._sleep(wait)
+        return buckets
+
+    def observe(self, buckets: List[TokenBucket], status: int, retry_after: Optional[str] = None):
+        """
+        根据响应调整速率
+
+        Args:
+            buckets: acquire 返回的令牌桶
+            status: 响应状态码
+            retry_after: Retry-After 响应头
+        """
+        if not buckets or not self.adaptive:
+            return
+        if status in self.throttle_statuses:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                delay = min(delay, self.max_retry_after)
+            for bucket in buckets:
+                bucket.on_throttle(delay)
+        else:
+            for bucket in buckets:
+                bucket.on_success()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        各令牌桶的当前状态
+
+        Returns:
+            {桶名称: {rate, max_rate, throttled, waited_s}}
+        """
+        return {
+            bucket.name: {"rate": round(bucket.rate, 3), "max_rate": bucket.max_rate,
+                          "throttled": bucket.throttled, "waited_s": round(bucket.waited, 3)}
+            for bucket in list(self._buckets.values()) if bucket is not None
+        }
+
+    def log_summary(self):
+        """输出各令牌桶的限流次数、等待时间和当前速率"""
+        for name, stats in self.summary().items():
+            logger.info(f"限速 {name}: 当前 {stats['rate']}/{stats['max_rate']} 次/秒，"
+                        f"限流 {stats['throttled']} 次，累计等待 {stats['waited_s']} 秒")
+
+
+# 全局限速器实例（延迟初始化）
+rate_limiter = LazyProxy(RateLimiter)
@@ -0,0 +1,307 @@
+"""
+请求耗时分解
+为每次请求记录连接池等待、建连/TLS、首字节、下载和JSON解析耗时，
+并提供钩子API和按端点汇总的统计
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from core.utils.lazy_proxy import LazyProxy
+from core.utils.stats import summarize
+
+
+# 当前线程正在执行的请求的耗时记录（由 HttpClient 设置，urllib3 钩子写入）
+_local = threading.local()
+
+# 参与汇总的耗时阶段
+TIMING_PHASES = ("pool_wait_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms",
+                 "json_decode_ms", "total_ms")
+
+
+class RequestTiming:
+    """
+    单次请求的耗时分解（单位：毫秒）
+
+    - pool_wait_ms: 从连接池获取连接的等待时间
+    - connect_ms: 建立TCP连接的时间（包含DNS解析），复用连接时为0
+    - tls_ms: TLS握手时间，复用连接或HTTP请求时为0
+    - reused: 是否复用了连接池中的已有连接
+    - ttfb_ms: 请求发送完成到收到响应头的时间（服务端处理 + 首字节）
+    - download_ms: 读取响应体的时间
+    - json_decode_ms: 解析响应JSON的时间（由 BaseAPI 解析时填写）
+    - total_ms: 请求总耗时
+    """
+
+    __slots__ = ("method", "endpoint", "status", "pool_wait_ms", "connect_ms", "tls_ms",
+                 "reused", "ttfb_ms", "download_ms", "json_decode_ms", "total_ms", "error")
+
+    def __init__(self, method: str, endpoint: str):
+        """
+        初始化耗时记录
+
+        Args:
+            method: HTTP方法
+            endpoint: 端点模板
+        """
+        self.method = method.upper()
+        self.endpoint = endpoint
+        self.status: Optional[int] = None
+        self.pool_wait_ms = 0.0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.reused = True
+        self.ttfb_ms = 0.0
+        self.download_ms = 0.0
+        self.json_decode_ms: Optional[float] = None
+        self.total_ms = 0.0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"<RequestTiming {self.method} {self.endpoint} status={self.status} "
+                f"total={self.total_ms:.1f}ms ttfb={self.ttfb_ms:.1f}ms reused={self.reused}>")
+
+
+def set_current_timing(timing: Optional[RequestTiming]):
+    """设置当前线程正在执行的请求的耗时记录"""
+    _local.timing = timing
+
+
+def get_current_timing() -> Optional[RequestTiming]:
+    """获取当前线程正在执行的请求的耗时记录"""
+    return getattr(_local, "timing", None)
+
+
+# ===== urllib3 钩子：连接、TLS、首字节 =====
+
+class _TimedConnectionMixin:
+    """记录建连和首字节耗时的连接混入类"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        # 本连接的 TCP 建连耗时（connect 中用于计算 TLS 握手耗时）
+        self._new_conn_ms = elapsed_ms
+        timing = get_current_timing()
+        if timing is not None:
+            timing.connect_ms += elapsed_ms
+        return sock
+
+    def connect(self):
+        self._new_conn_ms = 0.0
+        start = time.perf_counter()
+        super().connect()
+        timing = get_current_timing()
+        if timing is not None:
+            timing.reused = False
+            # 本连接 connect 总耗时减去本连接 TCP 建连耗时即为 TLS 握手（HTTP 连接为0），
+            # 重试时新建的多个连接累加，与 connect_ms 一致
+            timing.tls_ms += max((time.perf_counter() - start) * 1000 - self._new_conn_ms, 0.0)
+
+    def getresponse(self):
+        start = time.perf_counter()
+        response = super().getresponse()
+        timing = get_current_timing()
+        if timing is not None:
+            timing.ttfb_ms = (time.perf_counter() - start) * 1000
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    """记录耗时的HTTP连接"""
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    """记录耗时的HTTPS连接"""
+
+
+class _TimedPoolMixin:
+    """记录连接池等待耗时的连接池混入类"""
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        timing = get_current_timing()
+        if timing is not None:
+            timing.pool_wait_ms = (time.perf_counter() - start) * 1000
+        return conn
+
+
+class TimedHTTPConnectionPool(_TimedPoolMixin, HTTPConnectionPool):
+    """记录耗时的HTTP连接池"""
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(_TimedPoolMixin, HTTPSConnectionPool):
+    """记录耗时的HTTPS连接池"""
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """使用带耗时记录的连接池的 requests 适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+# ===== 汇总与钩子 =====
+
+class TimingCollector:
+    """
+    请求耗时收集器
+
+    按端点（方法 + 端点模板）汇总各阶段耗时，并把每条耗时记录分发给注册的钩子
+    """
+
+    def __init__(self):
+        """初始化耗时收集器"""
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[RequestTiming], None]] = []
+        # {端点: {阶段: array('d')}}
+        self._samples: Dict[str, Dict[str, array]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def add_hook(self, hook: Callable[[RequestTiming], None]):
+        """
+        注册耗时钩子，每次请求完成后以 RequestTiming 为参数调用
+
+        Args:
+            hook: 钩子函数
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RequestTiming], None]):
+        """
+        移除耗时钩子
+
+        Args:
+            hook: 钩子函数
+        """
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def emit(self, timing: RequestTiming):
+        """
+        记录一次请求的耗时并调用钩子
+
+        Args:
+            timing: 耗时记录
+        """
+        key = f"{timing.method} {timing.endpoint}"
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = {phase: array('d') for phase in TIMING_PHASES}
+                self._counts[key] = {"requests": 0, "reused": 0, "errors": 0}
+            counts = self._counts[key]
+            counts["requests"] += 1
+            if timing.error is not None:
+                counts["errors"] += 1
+            else:
+                if timing.reused:
+                    counts["reused"] += 1
+                for phase in TIMING_PHASES:
+                    value = getattr(timing, phase)
+                    if value is not None:
+                        samples[phase].append(value)
+        for hook in list(self._hooks):
+            hook(timing)
+
+    def record_json_decode(self, timing: RequestTiming, elapsed_ms: float):
+        """
+        记录响应JSON解析耗时（解析发生在请求完成之后）
+
+        Args:
+            timing: 该请求的耗时记录
+            elapsed_ms: 解析耗时（毫秒）
+        """
+        timing.json_decode_ms = elapsed_ms
+        key = f"{timing.method} {timing.endpoint}"
+        with self._lock:
+            if key in self._samples:
+                self._samples[key]["json_decode_ms"].append(elapsed_ms)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按端点汇总各阶段耗时
+
+        Returns:
+            {端点: {"requests": n, "reused": n, "errors": n, 阶段: {count, mean, p50, p95, p99, max}}}
+        """
+        with self._lock:
+            result = {}
+            for key, samples in self._samples.items():
+                entry: Dict[str, Any] = dict(self._counts[key])
+                for phase, values in samples.items():
+                    entry[phase] = summarize(values)
+                result[key] = entry
+            return result
+
+    def samples(self, phase: str = "total_ms") -> Dict[str, List[float]]:
+        """
+        获取各端点某个阶段的原始耗时样本
+
+        Args:
+            phase: 耗时阶段，见 TIMING_PHASES
+
+        Returns:
+            {端点: [耗时（毫秒）...]}
+        """
+        with self._lock:
+            return {key: list(samples[phase]) for key, samples in self._samples.items() if samples[phase]}
+
+    def log_summary(self):
+        """把汇总结果输出到日志"""
+        from core.utils.logger import logger
+        summary = self.summary()
+        if not summary:
+            return
+        logger.info("请求耗时汇总（毫秒，p50 / p95）:")
+        for key, entry in summary.items():
+            logger.info(
+                f"  {key}: 请求 {entry['requests']} 次, 复用连接 {entry['reused']} 次, 失败 {entry['errors']} 次 | "
+                + ", ".join(
+                    f"{phase[:-3]} {entry[phase]['p50']:.1f}/{entry[phase]['p95']:.1f}"
+                    for phase in TIMING_PHASES if entry[phase]["count"]
+                )
+            )
+
+    def write_summary(self, file_path: str):
+        """
+        把汇总结果写入JSON文件
+
+        Args:
+            file_path: 文件路径
+        """
+        summary = self.summary()
+        if not summary:
+            return
+        file_dir = os.path.dirname(file_path)
+        if file_dir and not os.path.exists(file_dir):
+            os.makedirs(file_dir, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        """清空已收集的数据（保留钩子）"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+# 全局耗时收集器实例（延迟初始化）
+timing_collector = LazyProxy(TimingCollector)
@@ -8,6 +8,7 @@ from typing import Optional, Dict
 from core.utils.config_loader import config
 from core.utils.logger import logger
 from core.utils.account_loader import account_loader
+from core.utils.lazy_proxy import LazyProxy
 
 
 class SessionManager:
@@ -177,6 +178,6 @@ class SessionManager:
             logger.error(f"清除Token文件失败: {e}")
 
 
-# 全局会话管理器实例
-session_manager = SessionManager()
+# 全局会话管理器实例（延迟初始化）
+session_manager = LazyProxy(SessionManager)
 
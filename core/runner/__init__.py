@@ -0,0 +1 @@
+# runner包初始化文件
@@ -0,0 +1,33 @@
+"""
+用例耗时收集插件
+记录每个用例 setup + call + teardown 的总耗时，供性能历史和分片调度使用
+"""
+from typing import Dict
+
+
+class DurationPlugin:
+    """
+    用例耗时收集 pytest 插件
+
+    Example:
+        >>> plugin = DurationPlugin()
+        >>> pytest.main(args, plugins=[plugin])
+        >>> plugin.durations
+        {'tests/test_report.py::TestReport::test_xxx': 123.4}
+    """
+
+    def __init__(self):
+        """初始化耗时收集插件"""
+        # {用例 nodeid: 耗时（毫秒）}
+        self.durations: Dict[str, float] = {}
+        self._skipped = set()
+
+    def pytest_runtest_logreport(self, report):
+        """累计用例各阶段的耗时（跳过的用例不记录）"""
+        if report.skipped:
+            self._skipped.add(report.nodeid)
+            self.durations.pop(report.nodeid, None)
+            return
+        if report.nodeid in self._skipped:
+            return
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration * 1000
@@ -0,0 +1,272 @@
+"""
+增量执行插件
+为每个用例计算指纹（测试模块源码、conftest、传递导入的项目模块、引用的用例数据和相关配置），
+与上次运行保存的指纹和结果比较，只执行指纹变化或上次失败的用例；可选失败用例优先执行
+
+模块级 CaseSource 参数化的用例（参数 case_index）只对自己那一条用例数据计算指纹，
+修改 JSONL 中的一条用例只会重新执行对应的那一个用例
+"""
+import ast
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set
+from core.utils.case_source import CaseSource
+from core.utils.config_loader import config
+from core.utils.logger import logger
+
+
+# 用例结果
+OUTCOME_PASSED = "passed"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"
+
+# 识别为用例数据引用的字符串字面量后缀
+_DATA_SUFFIXES = (".yaml", ".yml", ".jsonl", ".ndjson", ".json")
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class Fingerprinter:
+    """
+    用例指纹计算类（文件哈希和模块依赖按文件缓存，一次会话中每个文件只读取一次）
+    """
+
+    def __init__(self, root: str = _PROJECT_ROOT, config_keys: Optional[Iterable[str]] = None,
+                 data_dirs: Optional[Iterable[str]] = None, extra: str = ""):
+        """
+        初始化
+
+        Args:
+            root: 项目根目录（只跟踪该目录下的模块和数据文件）
+            config_keys: 参与指纹的配置段，默认 incremental.config_keys
+            data_dirs: 用例数据目录（相对项目根目录），默认 incremental.data_dirs
+            extra: 其他影响结果的内容（如命令行选项）
+        """
+        self.root = root
+        dirs = data_dirs if data_dirs is not None else config.get('incremental.data_dirs', ['bizs/data'])
+        self.data_dirs = [os.path.join(os.path.normpath(os.path.join(root, path)), "") for path in dirs]
+        self.packages = {name for name in os.listdir(root)
+                         if os.path.isfile(os.path.join(root, name, "__init__.py"))}
+        keys = config_keys if config_keys is not None else config.get('incremental.config_keys', [])
+        config_part = json.dumps({key: config.get(key) for key in keys}, sort_keys=True, ensure_ascii=False,
+                                 default=str)
+        self.base = _hash_bytes(f"{config_part}|{extra}".encode("utf-8"))
+        self._file_hashes: Dict[str, str] = {}
+        self._module_info: Dict[str, tuple] = {}
+        self._closures: Dict[str, Set[str]] = {}
+
+    def file_hash(self, path: str) -> str:
+        """文件内容哈希（文件不存在时为空字符串）"""
+        if path not in self._file_hashes:
+            try:
+                with open(path, "rb") as f:
+                    self._file_hashes[path] = _hash_bytes(f.read())
+            except OSError:
+                self._file_hashes[path] = ""
+        return self._file_hashes[path]
+
+    def _resolve_module(self, name: str) -> Optional[str]:
+        """项目内模块名 -> 文件路径"""
+        if name.split(".", 1)[0] not in self.packages:
+            return None
+        base = os.path.join(self.root, *name.split("."))
+        for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def _resolve_data(self, literal: str) -> Optional[str]:
+        """用例数据文件引用 -> 文件路径（相对项目根目录或数据目录，只接受数据目录下的文件）"""
+        if not literal.endswith(_DATA_SUFFIXES) or "\n" in literal:
+            return None
+        candidates = [os.path.join(self.root, literal)] + [os.path.join(path, literal) for path in self.data_dirs]
+        for candidate in map(os.path.normpath, candidates):
+            if os.path.isfile(candidate) and any(candidate.startswith(path) for path in self.data_dirs):
+                return candidate
+        return None
+
+    def module_info(self, path: str) -> tuple:
+        """
+        解析模块的直接依赖
+
+        Returns:
+            (导入的项目模块文件集合, 引用的数据文件集合)
+        """
+        if path not in self._module_info:
+            imports, data_files = set(), set()
+            try:
+                with open(path, "rb") as f:
+                    tree = ast.parse(f.read(), filename=path)
+            except (OSError, SyntaxError):
+                tree = None
+            for node in ast.walk(tree) if tree is not None else ():
+                names = []
+                if isinstance(node, ast.Import):
+                    names = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                    # from a.b import c：c 可能是子模块
+                    names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+                elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    data_file = self._resolve_data(node.value)
+                    if data_file:
+                        data_files.add(data_file)
+                for name in names:
+                    module_path = self._resolve_module(name)
+                    if module_path:
+                        imports.add(module_path)
+            self._module_info[path] = (imports, data_files)
+        return self._module_info[path]
+
+    def closure(self, path: str) -> Set[str]:
+        """模块及其传递导入的项目模块文件"""
+        if path not in self._closures:
+            seen = {path}
+            stack = [path]
+            while stack:
+                for dependency in self.module_info(stack.pop())[0]:
+                    if dependency not in seen:
+                        seen.add(dependency)
+                        stack.append(dependency)
+            self._closures[path] = seen
+        return self._closures[path]
+
+    def fingerprint(self, item) -> str:
+        """
+        计算用例指纹
+
+        Args:
+            item: pytest 用例
+
+        Returns:
+            指纹（十六进制字符串）
+        """
+        module_path = str(item.path)
+        sources = set(self.closure(module_path))
+        # 用例所在目录及上级目录的 conftest.py
+        directory = os.path.dirname(module_path)
+        while directory.startswith(self.root):
+            conftest = os.path.join(directory, "conftest.py")
+            if os.path.isfile(conftest):
+                sources |= self.closure(conftest)
+            if directory == self.root:
+                break
+            directory = os.path.dirname(directory)
+
+        data_files = set()
+        for source in sources:
+            data_files |= self.module_info(source)[1]
+
+        # 模块级 CaseSource 的数据文件按条目跟踪：参数化用例只使用自己那一条数据，其他用例不依赖该文件
+        entries = []
+        params = getattr(getattr(item, "callspec", None), "params", {})
+        for value in vars(getattr(item, "module", None) or object()).values():
+            if not isinstance(value, CaseSource):
+                continue
+            data_files.discard(os.path.abspath(value.file_path))
+            if "case_index" in params:
+                try:
+                    entries.append(json.dumps(value[params["case_index"]], sort_keys=True,
+                                              ensure_ascii=False, default=str))
+                except IndexError:
+                    entries.append("")
+
+        parts = [self.base, item.nodeid]
+        parts += [f"{os.path.relpath(path, self.root)}:{self.file_hash(path)}" for path in sorted(sources)]
+        parts += [f"{os.path.relpath(path, self.root)}:{self.file_hash(path)}" for path in sorted(data_files)]
+        parts += entries
+        return _hash_bytes("\n".join(parts).encode("utf-8"))
+
+
+class IncrementalPlugin:
+    """
+    增量执行 pytest 插件
+
+    Example:
+        >>> plugin = IncrementalPlugin(failed_first=True)
+        >>> pytest.main(args, plugins=[plugin])
+    """
+
+    def __init__(self, state_file: Optional[str] = None, failed_first: bool = False,
+                 skip_unchanged: bool = True, fingerprinter: Optional[Fingerprinter] = None):
+        """
+        初始化
+
+        Args:
+            state_file: 上次运行的指纹和结果文件，默认 incremental.state_file
+            failed_first: 是否让上次失败的用例先执行
+            skip_unchanged: 是否跳过未变化且上次通过的用例（False 时只调整顺序）
+            fingerprinter: 指纹计算器，默认在收集完成时创建
+        """
+        self.state_file = state_file or config.get('incremental.state_file', '.cache/incremental/state.json')
+        self.failed_first = failed_first
+        self.skip_unchanged = skip_unchanged
+        self.fingerprinter = fingerprinter
+        self.state: Dict[str, Dict[str, Any]] = self._load_state()
+        self._fingerprints: Dict[str, str] = {}
+        self._outcomes: Dict[str, str] = {}
+        self.deselected: List[str] = []
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """读取上次运行的状态"""
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"增量执行状态文件无法读取，将执行全部用例: {self.state_file}")
+            return {}
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        """只保留指纹变化、上次失败或没有记录的用例"""
+        if self.fingerprinter is None:
+            self.fingerprinter = Fingerprinter(extra=" ".join(sorted(
+                f"{name}={value}" for name, value in vars(config.option).items()
+                if name in ("mock_server", "snapshot_update")
+            )))
+        selected, deselected = [], []
+        for item in items:
+            fingerprint = self.fingerprinter.fingerprint(item)
+            self._fingerprints[item.nodeid] = fingerprint
+            previous = self.state.get(item.nodeid)
+            if (self.skip_unchanged and previous and previous.get("fingerprint") == fingerprint
+                    and previous.get("outcome") != OUTCOME_FAILED):
+                deselected.append(item)
+            else:
+                selected.append(item)
+
+        if self.failed_first:
+            # 稳定排序：上次失败的用例在前，其余保持收集顺序
+            selected.sort(key=lambda item: (self.state.get(item.nodeid) or {}).get("outcome") != OUTCOME_FAILED)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            self.deselected = [item.nodeid for item in deselected]
+        items[:] = selected
+        logger.info(f"增量执行：{len(selected)} 个用例需要执行，{len(deselected)} 个用例未变化已跳过")
+
+    def pytest_runtest_logreport(self, report):
+        """记录用例结果（任一阶段失败即为失败）"""
+        if report.failed:
+            self._outcomes[report.nodeid] = OUTCOME_FAILED
+        elif self._outcomes.get(report.nodeid) != OUTCOME_FAILED:
+            if report.skipped:
+                self._outcomes[report.nodeid] = OUTCOME_SKIPPED
+            elif report.when == "call":
+                self._outcomes[report.nodeid] = OUTCOME_PASSED
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        """保存本次执行的用例指纹和结果（未执行的用例保留上次记录）"""
+        for nodeid, outcome in self._outcomes.items():
+            fingerprint = self._fingerprints.get(nodeid)
+            if fingerprint is not None:
+                self.state[nodeid] = {"fingerprint": fingerprint, "outcome": outcome}
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=0, sort_keys=True)
@@ -0,0 +1,422 @@
+"""
+多进程并行执行
+收集用例后分配给 N 个 worker 子进程（python -m pytest），每个 worker 是独立进程，
+拥有自己的 HttpClient 会话、Token 和日志文件（见 ConfigLoader 的 worker 路径隔离），
+全部结束后把各 worker 的 JUnit XML、HTML 报告、JSONL 结果和指标合并为一份
+"""
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Sequence, Tuple
+import pytest
+from core.utils.config_loader import config, worker_path, WORKER_ENV, WORKER_COUNT_ENV
+from core.utils.logger import logger
+
+
+# pytest 退出码
+EXIT_OK = 0
+EXIT_TESTS_FAILED = 1
+EXIT_NO_TESTS = 5
+
+# pytest-html 的结果名称 -> 摘要中的分类
+_HTML_RESULTS = {
+    "Passed": "passed", "Failed": "failed", "Skipped": "skipped", "XFailed": "xfailed",
+    "XPassed": "xpassed", "Error": "error", "Rerun": "rerun", "Retried": "retried",
+}
+
+
+class _CollectPlugin:
+    """只收集用例 nodeid 的 pytest 插件"""
+
+    def __init__(self):
+        self.nodeids: List[str] = []
+
+    def pytest_collection_finish(self, session):
+        # nodeid 相对于 rootdir，转为绝对路径后 worker 不依赖 rootdir 的判定
+        rootdir = str(session.config.rootpath)
+        self.nodeids = [os.path.join(rootdir, item.nodeid) for item in session.items]
+
+
+def collect_nodeids(pytest_args: Sequence[str]) -> List[str]:
+    """
+    在当前进程中收集用例（不执行）
+
+    Args:
+        pytest_args: 测试路径和选择参数（如 -k、-m）
+
+    Returns:
+        用例 nodeid 列表（按收集顺序，文件部分为绝对路径）
+    """
+    plugin = _CollectPlugin()
+    exit_code = pytest.main([*pytest_args, "--collect-only", "-q", "-p", "no:cacheprovider"], plugins=[plugin])
+    if exit_code not in (EXIT_OK, EXIT_NO_TESTS):
+        raise RuntimeError(f"收集用例失败，退出码: {exit_code}")
+    return plugin.nodeids
+
+
+def distribute(nodeids: Sequence[str], workers: int) -> List[List[str]]:
+    """
+    把用例分配给 worker：同一测试类/模块的用例尽量分在一起（减少 class/module 级 fixture 的重复执行），
+    按用例数量贪心地分给当前最少的 worker
+
+    Args:
+        nodeids: 用例 nodeid 列表
+        workers: worker 数量
+
+    Returns:
+        每个 worker 的用例列表（不含空 worker）
+    """
+    groups: Dict[str, List[str]] = {}
+    for nodeid in nodeids:
+        # 去掉参数化部分和方法名，按 文件::类 分组
+        scope = nodeid.split("[", 1)[0].rsplit("::", 1)[0]
+        groups.setdefault(scope, []).append(nodeid)
+
+    # 分组数量不足 worker 数时拆开，保证每个 worker 都有用例
+    if len(groups) < workers:
+        groups = {nodeid: [nodeid] for nodeid in nodeids}
+
+    buckets: List[List[str]] = [[] for _ in range(workers)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(buckets, key=len).extend(group)
+    return [bucket for bucket in buckets if bucket]
+
+
+def combine_exit_codes(exit_codes: Sequence[int]) -> int:
+    """
+    合并各 worker 的退出码：有失败用例时为1，其他错误取第一个，全部没有用例时为5
+
+    Args:
+        exit_codes: 各 worker 的退出码
+
+    Returns:
+        合并后的退出码
+    """
+    if EXIT_TESTS_FAILED in exit_codes:
+        return EXIT_TESTS_FAILED
+    for code in exit_codes:
+        if code not in (EXIT_OK, EXIT_NO_TESTS):
+            return code
+    if exit_codes and all(code == EXIT_NO_TESTS for code in exit_codes):
+        return EXIT_NO_TESTS
+    return EXIT_OK
+
+
+def merge_junit(files: Sequence[str], output: str) -> Dict[str, float]:
+    """
+    合并 JUnit XML 报告为一个 testsuite
+
+    Args:
+        files: 各 worker 的 report.xml
+        output: 合并后的文件路径
+
+    Returns:
+        合并后的统计 {tests, failures, errors, skipped, time}
+    """
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+    merged = ET.Element("testsuite", name="pytest")
+    for file_path in files:
+        if not os.path.exists(file_path):
+            continue
+        root = ET.parse(file_path).getroot()
+        suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+        for suite in suites:
+            for key in ("tests", "failures", "errors", "skipped"):
+                totals[key] += int(suite.get(key, 0))
+            # 并行执行时总耗时取各 worker 的最大值
+            totals["time"] = max(totals["time"], float(suite.get("time", 0)))
+            if merged.get("timestamp") is None and suite.get("timestamp"):
+                merged.set("timestamp", suite.get("timestamp"))
+                merged.set("hostname", suite.get("hostname", ""))
+            for child in suite:
+                merged.append(child)
+    for key, value in totals.items():
+        merged.set(key, f"{value:.3f}" if key == "time" else str(value))
+    document = ET.Element("testsuites", name="pytest tests")
+    document.append(merged)
+    ET.ElementTree(document).write(output, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def _format_duration(seconds: float) -> str:
+    """与 pytest-html 一致的耗时格式"""
+    if seconds < 1:
+        return f"{round(seconds * 1000)} ms"
+    return time.strftime("%H:%M:%S", time.gmtime(seconds))
+
+
+def merge_html(files: Sequence[str], output: str, elapsed: float) -> bool:
+    """
+    合并 pytest-html（4.x）的独立HTML报告：以第一份报告为模板，合并嵌入的用例数据并更新摘要
+
+    Args:
+        files: 各 worker 的 report.html
+        output: 合并后的文件路径
+        elapsed: 并行执行的总耗时（秒）
+
+    Returns:
+        是否合并成功（没有可用的报告或格式无法识别时返回False）
+    """
+    blob_pattern = re.compile(r'(<div id="data-container" data-jsonblob=")([^"]*)(")')
+    template = None
+    merged: Optional[dict] = None
+    for file_path in files:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        match = blob_pattern.search(content)
+        if match is None:
+            logger.warning(f"无法识别的HTML报告格式，跳过合并: {file_path}")
+            continue
+        data = json.loads(html.unescape(match.group(2)))
+        if merged is None:
+            template, merged = content, data
+        else:
+            merged["tests"].update(data.get("tests", {}))
+    if merged is None:
+        return False
+
+    merged["title"] = os.path.basename(output)
+    counts = dict.fromkeys(_HTML_RESULTS.values(), 0)
+    for entries in merged["tests"].values():
+        for entry in entries:
+            category = _HTML_RESULTS.get(entry.get("result"))
+            if category:
+                counts[category] += 1
+
+    content = blob_pattern.sub(
+        lambda match: match.group(1) + html.escape(json.dumps(merged), quote=True) + match.group(3),
+        template, count=1
+    )
+    content = re.sub(r'<p class="run-count">.*?</p>',
+                     f'<p class="run-count">{len(merged["tests"])} tests took {_format_duration(elapsed)}.</p>',
+                     content, count=1)
+    for category, count in counts.items():
+        content = re.sub(rf'(<span class="{category}">)\d+', rf'\g<1>{count}', content, count=1)
+        content = re.sub(rf'(data-test-result="{category}") ?(disabled)?>',
+                         rf'\1 {"" if count else "disabled"}>', content, count=1)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def merge_jsonl(files: Sequence[str], output: str):
+    """
+    按顺序拼接各 worker 的 JSONL 结果文件（逐块复制，不解析内容）
+
+    Args:
+        files: 各 worker 的 results.jsonl
+        output: 合并后的文件路径
+    """
+    with open(output, "wb") as out:
+        for file_path in files:
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+
+def merge_metrics(files: Dict[str, str], output: str) -> int:
+    """
+    合并各 worker 导出的 OpenMetrics 文本：每个样本加上 worker 标签，同名指标的样本归入同一组
+
+    Args:
+        files: {worker 标识: 指标文件}
+        output: 合并后的文件路径
+
+    Returns:
+        合并的样本数
+    """
+    # {指标名: (TYPE/HELP 行, 样本行)}，保持首次出现的顺序
+    families: Dict[str, Tuple[List[str], List[str]]] = {}
+    for worker_id, file_path in files.items():
+        if not os.path.exists(file_path):
+            continue
+        family = None
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line or line == "# EOF":
+                    continue
+                if line.startswith("# "):
+                    name = line.split(" ", 3)[2]
+                    family = families.setdefault(name, ([], []))
+                    if line not in family[0]:
+                        family[0].append(line)
+                    continue
+                if family is None:
+                    continue
+                label = f'worker="{worker_id}"'
+                name, brace, rest = line.partition("{")
+                if brace:
+                    sample = f"{name}{{{label},{rest}" if not rest.startswith("}") else f"{name}{{{label}{rest}"
+                else:
+                    name, _, value = line.partition(" ")
+                    sample = f"{name}{{{label}}} {value}"
+                family[1].append(sample)
+
+    lines = [line for headers, samples in families.values() for line in headers + samples]
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines + ["# EOF"]) + "\n")
+    return sum(len(samples) for _, samples in families.values())
+
+
+def run_workers(groups: Sequence[Sequence[str]], pytest_args: Sequence[str], report_dir: str,
+                html_report: bool = True, result_stream: bool = False) -> List[int]:
+    """
+    启动 worker 子进程并等待全部结束
+
+    每个 worker 的用例列表、JUnit XML、HTML 报告、JSONL 结果和控制台输出保存在 reports/workers/w<序号>/ 下，
+    子进程通过环境变量 API_TEST_WORKER 获得独立的日志文件和 Token 文件，API_TEST_WORKER_COUNT 为 worker 总数
+
+    Args:
+        groups: 每个 worker 的用例列表
+        pytest_args: 传给每个 worker 的 pytest 参数（不含测试路径和报告参数）
+        report_dir: 报告目录
+        html_report: 是否生成 HTML 报告
+        result_stream: 是否生成 JSONL 流式结果
+
+    Returns:
+        各 worker 的退出码
+    """
+    processes = []
+    for index, nodeids in enumerate(groups, start=1):
+        worker_id = f"w{index}"
+        worker_dir = os.path.join(report_dir, "workers", worker_id)
+        os.makedirs(worker_dir, exist_ok=True)
+        # 用例列表通过 @文件 传入，避免命令行过长
+        nodeid_file = os.path.join(worker_dir, "nodeids.txt")
+        with open(nodeid_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(nodeids) + "\n")
+
+        command = [sys.executable, "-m", "pytest", f"@{nodeid_file}", *pytest_args,
+                   f"--junitxml={os.path.join(worker_dir, 'report.xml')}"]
+        if html_report:
+            command += [f"--html={os.path.join(worker_dir, 'report.html')}", "--self-contained-html"]
+        if result_stream:
+            command.append(f"--results-jsonl={os.path.join(worker_dir, 'results.jsonl')}")
+        env = dict(os.environ, **{WORKER_ENV: worker_id, WORKER_COUNT_ENV: str(len(groups))})
+        output = open(os.path.join(worker_dir, "output.log"), "w", encoding="utf-8")
+        processes.append((worker_id, subprocess.Popen(command, env=env, stdout=output, stderr=subprocess.STDOUT),
+                          output, len(nodeids)))
+        logger.info(f"worker {worker_id} 已启动：{len(nodeids)} 个用例")
+
+    exit_codes = []
+    for worker_id, process, output, count in processes:
+        exit_code = process.wait()
+        output.close()
+        exit_codes.append(exit_code)
+        logger.info(f"worker {worker_id} 已结束：{count} 个用例，退出码 {exit_code}")
+    return exit_codes
+
+
+def run_parallel(test_paths: Sequence[str], pytest_args: Sequence[str], report_dir: str,
+                 workers: int, html_report: bool = True,
+                 result_stream: bool = False) -> Tuple[int, Dict[str, float]]:
+    """
+    并行执行用例并合并报告为 report_dir/report.xml、report_dir/report.html 和 report_dir/results.jsonl
+
+    Args:
+        test_paths: 测试路径和选择参数
+        pytest_args: 传给每个 worker 的其他 pytest 参数
+        report_dir: 报告目录
+        workers: worker 数量
+        html_report: 是否生成 HTML 报告（未安装 pytest-html 时不生成）
+        result_stream: 是否生成 JSONL 流式结果
+
+    Returns:
+        (合并后的退出码, {用例 nodeid: 耗时（毫秒）})
+    """
+    nodeids = collect_nodeids(test_paths)
+    if not nodeids:
+        logger.warning("没有收集到用例")
+        return EXIT_NO_TESTS, {}
+    groups = distribute(nodeids, workers)
+    logger.info(f"并行执行：{len(nodeids)} 个用例分配给 {len(groups)} 个 worker")
+
+    html_report = html_report and _has_pytest_html()
+    start = time.perf_counter()
+    exit_codes = run_workers(groups, pytest_args, report_dir, html_report, result_stream)
+    elapsed = time.perf_counter() - start
+
+    worker_dirs = [os.path.join(report_dir, "workers", f"w{index}") for index in range(1, len(groups) + 1)]
+    junit_file = os.path.join(report_dir, "report.xml")
+    totals = merge_junit([os.path.join(path, "report.xml") for path in worker_dirs], junit_file)
+    if html_report:
+        merge_html([os.path.join(path, "report.html") for path in worker_dirs],
+                   os.path.join(report_dir, "report.html"), elapsed)
+    if config.get('metrics.enabled', False):
+        # 各 worker 在会话结束时把指标写到隔离后的 metrics.file_path
+        metrics_file = config.get('metrics.file_path', 'reports/metrics.txt')
+        merge_metrics({f"w{index}": worker_path(metrics_file, f"w{index}") for index in range(1, len(groups) + 1)},
+                      metrics_file)
+    if result_stream:
+        merge_jsonl([os.path.join(path, "results.jsonl") for path in worker_dirs],
+                    os.path.join(report_dir, "results.jsonl"))
+    logger.info(
+        f"并行执行完成：{totals['tests']} 个用例，失败 {totals['failures']}，错误 {totals['errors']}，"
+        f"跳过 {totals['skipped']}，耗时 {elapsed:.1f} s"
+    )
+    return combine_exit_codes(exit_codes), junit_durations(junit_file, nodeids)
+
+
+def _junit_key(nodeid: str) -> Tuple[str, str]:
+    """
+    nodeid 对应的 JUnit (classname, name)，模块部分使用完整路径，
+    如 /root/tests/test_a.py::TestA::test_x -> (root.tests.test_a.TestA, test_x)
+    """
+    path, *names = nodeid.split("::")
+    module = os.path.splitext(os.path.abspath(path))[0].strip(os.sep).replace(os.sep, ".")
+    return ".".join([module, *names[:-1]]), names[-1] if names else ""
+
+
+def junit_durations(file_path: str, nodeids: Sequence[str]) -> Dict[str, float]:
+    """
+    从 JUnit XML 中读取用例耗时（并行模式下供性能历史使用）
+
+    JUnit 的 classname 相对于 worker 的 rootdir，按"完整路径以 classname 结尾"还原为 nodeid
+
+    Args:
+        file_path: report.xml 路径
+        nodeids: 收集到的用例（文件部分为绝对路径）
+
+    Returns:
+        {用例 nodeid（文件部分相对当前目录）: 耗时（毫秒）}，跳过的用例不记录
+    """
+    if not os.path.exists(file_path):
+        return {}
+    candidates: Dict[str, List[Tuple[str, str]]] = {}
+    for nodeid in nodeids:
+        classname, name = _junit_key(nodeid)
+        path, _, rest = nodeid.partition("::")
+        candidates.setdefault(name, []).append(
+            (classname, f"{os.path.relpath(path).replace(os.sep, '/')}::{rest}")
+        )
+    durations = {}
+    for case in ET.parse(file_path).getroot().iter("testcase"):
+        if case.find("skipped") is not None:
+            continue
+        classname = case.get("classname", "")
+        for full_classname, nodeid in candidates.get(case.get("name"), []):
+            if full_classname == classname or full_classname.endswith("." + classname):
+                durations[nodeid] = float(case.get("time", 0)) * 1000
+                break
+    return durations
+
+
+def _has_pytest_html() -> bool:
+    """是否安装了 pytest-html"""
+    try:
+        import pytest_html  # noqa: F401
+        return True
+    except ImportError:
+        return False
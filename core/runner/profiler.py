@@ -0,0 +1,302 @@
+"""
+性能剖析插件
+run.py --profile cpu|mem 时加载，把CPU耗时和内存分配归因到每个测试用例和 core/ 下的框架模块
+
+- cpu: 后台线程定时采样主线程调用栈（采样式剖析，包含网络等待时间）
+- mem: 使用 tracemalloc 记录每个用例的内存峰值和净增内存，以及整个会话保留的分配来源
+
+输出（写入报告目录）：
+- profile_<mode>.collapsed: 折叠栈格式，可直接用 flamegraph.pl / speedscope 生成火焰图
+- profile_<mode>_summary.txt: Top-N 汇总
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+import pytest
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 项目自身代码所在目录
+PROJECT_DIRS = ("core/", "bizs/", "tests/")
+FRAMEWORK_DIR = "core/"
+
+
+def _short_path(filename: str) -> str:
+    """
+    缩短文件路径：项目内文件使用相对路径，第三方库从包名开始
+
+    Args:
+        filename: 代码对象的文件名
+
+    Returns:
+        缩短后的路径
+    """
+    if filename.startswith(PROJECT_ROOT):
+        return os.path.relpath(filename, PROJECT_ROOT).replace(os.sep, "/")
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        index = filename.rfind(marker)
+        if index != -1:
+            rest = filename[index + len(marker):]
+            return rest.split(os.sep, 1)[1] if marker.startswith("lib") and os.sep in rest else rest
+    return os.path.basename(filename)
+
+
+class ProfilerPlugin:
+    """
+    性能剖析 pytest 插件
+
+    Example:
+        >>> pytest.main(args, plugins=[ProfilerPlugin("cpu", "reports")])
+    """
+
+    def __init__(self, mode: str, output_dir: str, interval: float = 0.005, top_n: int = 20,
+                 memory_frames: int = 10):
+        """
+        初始化剖析插件
+
+        Args:
+            mode: cpu 或 mem
+            output_dir: 输出目录
+            interval: cpu 模式的采样间隔（秒）
+            top_n: 汇总中每个列表显示的条数
+            memory_frames: mem 模式下 tracemalloc 保存的调用栈深度
+        """
+        if mode not in ("cpu", "mem"):
+            raise ValueError(f"不支持的剖析模式: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_n = top_n
+        self.memory_frames = memory_frames
+
+        self._current_test: Optional[str] = None
+        self._test_durations: Dict[str, float] = {}
+        self._test_start = 0.0
+
+        # cpu 模式
+        self._stacks: Counter = Counter()
+        # 计入样本的实际时间（秒）：等待间隔之外还有抓栈等开销，按实测时间折算每个样本代表的耗时
+        self._sampled_seconds = 0.0
+        self._labels: Dict[object, Tuple[str, str]] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._target_thread = threading.get_ident()
+
+        # mem 模式
+        self._snapshot_before: Optional[tracemalloc.Snapshot] = None
+        self._memory_before = 0
+        self._memory_stacks: Counter = Counter()
+        self._test_memory: Dict[str, Tuple[int, int]] = {}
+        self._module_retained: Counter = Counter()
+
+    # ===== pytest 钩子 =====
+
+    def pytest_sessionstart(self, session):
+        """会话开始时启动采样线程或 tracemalloc"""
+        if self.mode == "cpu":
+            self._target_thread = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        else:
+            tracemalloc.start(self.memory_frames)
+            self._snapshot_before = tracemalloc.take_snapshot()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        """标记当前正在执行的用例"""
+        self._begin_test(item.nodeid)
+        yield
+        self._end_test(item.nodeid)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        """会话结束时停止剖析并写出结果"""
+        if self.mode == "cpu":
+            self._stop.set()
+            if self._sampler is not None:
+                self._sampler.join()
+            self._write_cpu()
+        else:
+            self._collect_memory_stacks()
+            tracemalloc.stop()
+            self._write_mem()
+
+    # ===== 用例边界 =====
+
+    def _begin_test(self, nodeid: str):
+        """用例开始"""
+        if self.mode == "mem":
+            tracemalloc.reset_peak()
+            self._memory_before = tracemalloc.get_traced_memory()[0]
+        self._test_start = time.perf_counter()
+        self._current_test = nodeid
+
+    def _end_test(self, nodeid: str):
+        """用例结束"""
+        self._current_test = None
+        self._test_durations[nodeid] = time.perf_counter() - self._test_start
+        if self.mode == "mem":
+            current, peak = tracemalloc.get_traced_memory()
+            self._test_memory[nodeid] = (peak - self._memory_before, current - self._memory_before)
+
+    def _collect_memory_stacks(self):
+        """
+        对比会话开始和结束时的快照，按调用栈汇总保留下来的分配
+
+        快照只在会话首尾各取一次（逐用例取快照在大型套件上代价过高），
+        用例级别只记录峰值增量和净增内存
+        """
+        if self._snapshot_before is None:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.compare_to(self._snapshot_before, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            # tracemalloc 的调用栈从最外层到最内层排列，与折叠栈格式一致
+            frames = [self._label_frame(frame.filename, frame.lineno) for frame in stat.traceback]
+            self._memory_stacks[tuple(self._trim_stack(frames))] += stat.size_diff
+            for frame in reversed(stat.traceback):
+                path = _short_path(frame.filename)
+                if path.startswith(FRAMEWORK_DIR):
+                    self._module_retained[path] += stat.size_diff
+                    break
+        self._snapshot_before = None
+
+    # ===== cpu 采样 =====
+
+    def _label_code(self, code) -> Tuple[str, str]:
+        """生成代码对象的标签（带缓存）：(文件路径, 文件路径:函数名)"""
+        label = self._labels.get(code)
+        if label is None:
+            path = _short_path(code.co_filename)
+            label = self._labels[code] = (path, f"{path}:{code.co_name}")
+        return label
+
+    @staticmethod
+    def _label_frame(filename: str, lineno: int) -> str:
+        """生成 tracemalloc 帧的标签"""
+        return f"{_short_path(filename)}:{lineno}"
+
+    @staticmethod
+    def _trim_stack(frames: List[str]) -> List[str]:
+        """去掉调用栈开头 pytest/pluggy 的帧，从第一个项目代码帧开始"""
+        for index, frame in enumerate(frames):
+            if frame.startswith(PROJECT_DIRS):
+                return frames[index:]
+        return frames
+
+    def _sample_loop(self):
+        """采样线程：定时抓取主线程的调用栈"""
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            test = self._current_test
+            if test is None:
+                continue
+            self._sampled_seconds += elapsed
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                stack.append(self._label_code(frame.f_code)[1])
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(test,) + tuple(self._trim_stack(stack))] += 1
+
+    # ===== 输出 =====
+
+    def _open_output(self, name: str):
+        """打开输出文件"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        return open(os.path.join(self.output_dir, name), "w", encoding="utf-8")
+
+    @staticmethod
+    def _collapsed_line(stack: Tuple[str, ...], value: int) -> str:
+        """生成折叠栈格式的一行（帧之间用分号分隔，帧内的分号替换掉）"""
+        return ";".join(frame.replace(";", ",").replace(" ", "_") for frame in stack) + f" {value}\n"
+
+    def _write_cpu(self):
+        """写出 cpu 剖析结果（耗时为估计值：样本数 × 实测的平均采样间隔）"""
+        interval_ms = self.interval * 1000
+        total_samples = sum(self._stacks.values())
+        sample_ms = self._sampled_seconds * 1000 / total_samples if total_samples else interval_ms
+        per_test: Counter = Counter()
+        function_self: Counter = Counter()
+        module_self: Counter = Counter()
+        module_via: Counter = Counter()
+
+        with self._open_output("profile_cpu.collapsed") as f:
+            for stack, count in self._stacks.items():
+                f.write(self._collapsed_line(stack, count))
+                test, frames = stack[0], stack[1:]
+                per_test[test] += count
+                if not frames:
+                    continue
+                leaf = frames[-1]
+                function_self[leaf] += count
+                if leaf.startswith(FRAMEWORK_DIR):
+                    module_self[leaf.rsplit(":", 1)[0]] += count
+                # 最内层的项目代码帧在 core/ 中：说明这段时间花在框架调用的代码上（含网络等待）
+                for frame in reversed(frames):
+                    if frame.startswith(PROJECT_DIRS):
+                        if frame.startswith(FRAMEWORK_DIR):
+                            module_via[frame.rsplit(":", 1)[0]] += count
+                        break
+
+        def ms(samples: int) -> str:
+            return f"{samples * sample_ms:10.1f} ms"
+
+        def share(samples: int) -> str:
+            return f"{samples * 100 / total_samples:5.1f}%" if total_samples else "  0.0%"
+
+        lines = [
+            f"CPU 剖析汇总（采样间隔 {interval_ms:.1f} ms，实测平均间隔 {sample_ms:.2f} ms，共 {total_samples} 个样本）",
+            "以下耗时均为估计值：样本数 × 实测平均间隔",
+            "",
+            f"框架代码自身耗时（栈顶位于 {FRAMEWORK_DIR}）: {ms(sum(module_self.values())).strip()} "
+            f"({share(sum(module_self.values())).strip()})",
+            "",
+            f"Top {self.top_n} 用例（采样估计耗时 / 实际耗时）:",
+        ]
+        for test, count in per_test.most_common(self.top_n):
+            lines.append(f"  {ms(count)}  {self._test_durations.get(test, 0) * 1000:10.1f} ms  {test}")
+        lines += ["", f"Top {self.top_n} 函数（自身耗时）:"]
+        for frame, count in function_self.most_common(self.top_n):
+            lines.append(f"  {ms(count)}  {share(count)}  {frame}")
+        lines += ["", f"{FRAMEWORK_DIR} 模块自身耗时:"]
+        for module, count in module_self.most_common(self.top_n):
+            lines.append(f"  {ms(count)}  {share(count)}  {module}")
+        lines += ["", f"{FRAMEWORK_DIR} 模块耗时（含其调用的第三方库和网络等待）:"]
+        for module, count in module_via.most_common(self.top_n):
+            lines.append(f"  {ms(count)}  {share(count)}  {module}")
+
+        with self._open_output("profile_cpu_summary.txt") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _write_mem(self):
+        """写出 mem 剖析结果"""
+        with self._open_output("profile_mem.collapsed") as f:
+            for stack, size in self._memory_stacks.items():
+                f.write(self._collapsed_line(stack, size))
+
+        line_retained: Counter = Counter()
+        for stack, size in self._memory_stacks.items():
+            if stack:
+                line_retained[stack[-1]] += size
+
+        lines = ["内存剖析汇总（tracemalloc）", "", f"Top {self.top_n} 用例（峰值增量 / 用例结束时净增）:"]
+        by_peak = sorted(self._test_memory.items(), key=lambda item: item[1][0], reverse=True)
+        for test, (peak, retained) in by_peak[:self.top_n]:
+            lines.append(f"  {peak / 1024:10.1f} KB  {retained / 1024:10.1f} KB  {test}")
+        lines += ["", f"{FRAMEWORK_DIR} 模块在会话结束时仍保留的分配（最内层框架帧）:"]
+        for module, size in self._module_retained.most_common(self.top_n):
+            lines.append(f"  {size / 1024:10.1f} KB  {module}")
+        lines += ["", f"Top {self.top_n} 分配位置（会话结束时仍保留）:"]
+        for frame, size in line_retained.most_common(self.top_n):
+            lines.append(f"  {size / 1024:10.1f} KB  {frame}")
+
+        with self._open_output("profile_mem_summary.txt") as f:
+            f.write("\n".join(lines) + "\n")
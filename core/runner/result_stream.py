@@ -0,0 +1,258 @@
+"""
+流式用例结果报告
+每个用例结束时向 JSONL 文件追加一行结果记录（逐行写出，内存占用与用例数量无关，进程中断时已完成的结果仍然保留），
+之后可离线把 JSONL 渲染为 HTML 摘要：
+
+    python -m core.runner.result_stream reports/results.jsonl -o reports/results.html
+
+记录格式：
+    {"type": "session", "started": ..., "worker": ...}
+    {"type": "test", "nodeid": ..., "outcome": ..., "duration_ms": ..., "message": ..., "log": ...}
+    {"type": "summary", "exitstatus": ..., "duration_s": ..., "counts": {...}}
+"""
+import argparse
+import heapq
+import html
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, List, Optional
+from core.utils.config_loader import config, WORKER_ENV
+
+
+# 用例结果（与 pytest-html 的分类一致）
+OUTCOMES = ("passed", "failed", "error", "skipped", "xfailed", "xpassed")
+FAILED_OUTCOMES = ("failed", "error")
+
+
+def _truncate(text: str, limit: int) -> str:
+    """截断过长的文本（保留开头和结尾）"""
+    if limit and len(text) > limit:
+        half = limit // 2
+        return f"{text[:half]}\n... 省略 {len(text) - limit} 个字符 ...\n{text[-half:]}"
+    return text
+
+
+class ResultStreamPlugin:
+    """
+    流式结果报告 pytest 插件（通过 --results-jsonl 启用）
+
+    Example:
+        >>> plugin = ResultStreamPlugin("reports/results.jsonl")
+        >>> pytest.main(args, plugins=[plugin])
+    """
+
+    def __init__(self, file_path: str, max_text_chars: Optional[int] = None):
+        """
+        初始化
+
+        Args:
+            file_path: JSONL 结果文件
+            max_text_chars: 失败信息和日志的最大长度，默认 test.max_text_chars
+        """
+        self.file_path = file_path
+        self.max_text_chars = max_text_chars if max_text_chars is not None \
+            else config.get('test.max_text_chars', 4000)
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self._file: Optional[IO[str]] = None
+        self._start = 0.0
+        # 正在执行的用例（setup 到 teardown 之间）
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def _write(self, record: Dict[str, Any]):
+        if self._file is not None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def pytest_sessionstart(self, session):
+        """打开结果文件（行缓冲，每条记录写完即落盘）"""
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.file_path, "w", encoding="utf-8", buffering=1)
+        self._start = time.perf_counter()
+        self._write({"type": "session", "started": datetime.now().isoformat(timespec="seconds"),
+                     "worker": os.environ.get(WORKER_ENV, "")})
+
+    def pytest_runtest_logreport(self, report):
+        """累计各阶段结果，teardown 结束时写出一条记录"""
+        record = self._pending.setdefault(report.nodeid, {"type": "test", "nodeid": report.nodeid,
+                                                          "outcome": "passed", "duration_ms": 0.0})
+        record["duration_ms"] += report.duration * 1000
+        if report.when == "call" or (report.when == "setup" and not report.passed):
+            if hasattr(report, "wasxfail"):
+                record["outcome"] = "xfailed" if report.skipped else "xpassed"
+            elif report.failed:
+                record["outcome"] = "failed" if report.when == "call" else "error"
+            elif report.skipped:
+                record["outcome"] = "skipped"
+        elif report.failed:
+            # teardown 失败
+            record["outcome"] = "error"
+
+        if report.failed:
+            record["message"] = _truncate(str(report.longrepr), self.max_text_chars)
+            if report.caplog:
+                record["log"] = _truncate(report.caplog, self.max_text_chars)
+        elif report.skipped and isinstance(report.longrepr, tuple):
+            record["message"] = str(report.longrepr[2])
+
+        if report.when == "teardown":
+            del self._pending[report.nodeid]
+            record["duration_ms"] = round(record["duration_ms"], 3)
+            self.counts[record["outcome"]] += 1
+            self._write(record)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        """写出汇总记录并关闭文件"""
+        self._write({"type": "summary", "exitstatus": int(exitstatus),
+                     "duration_s": round(time.perf_counter() - self._start, 3), "counts": self.counts})
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_records(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取结果记录（跳过进程中断时写了一半的行）
+
+    Args:
+        file_path: JSONL 结果文件
+
+    Yields:
+        记录字典
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def summarize(file_paths: List[str], max_failures: Optional[int] = None,
+              slowest: Optional[int] = None) -> Dict[str, Any]:
+    """
+    流式汇总结果文件（只保留有限条失败记录和最慢用例，内存占用与用例数量无关）
+
+    Args:
+        file_paths: JSONL 结果文件（并行模式下各 worker 的文件）
+        max_failures: 保留的失败记录数，默认 test.html_max_failures
+        slowest: 保留的最慢用例数，默认 test.html_slowest
+
+    Returns:
+        汇总字典：counts, total, duration_ms, files, failures, omitted_failures, slowest, sessions, complete
+    """
+    max_failures = max_failures if max_failures is not None else config.get('test.html_max_failures', 200)
+    slowest = slowest if slowest is not None else config.get('test.html_slowest', 20)
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    files: Dict[str, Dict[str, int]] = {}
+    failures: List[Dict[str, Any]] = []
+    slow_heap: List[tuple] = []
+    summary = {"counts": counts, "total": 0, "duration_ms": 0.0, "files": files, "failures": failures,
+               "omitted_failures": 0, "sessions": 0, "finished_sessions": 0}
+    for file_path in file_paths:
+        for record in iter_records(file_path):
+            kind = record.get("type")
+            if kind == "session":
+                summary["sessions"] += 1
+            elif kind == "summary":
+                summary["finished_sessions"] += 1
+            elif kind == "test":
+                outcome = record.get("outcome", "passed")
+                counts[outcome] = counts.get(outcome, 0) + 1
+                summary["total"] += 1
+                duration = record.get("duration_ms", 0.0)
+                summary["duration_ms"] += duration
+                stats = files.setdefault(record["nodeid"].split("::")[0], {"total": 0, "failed": 0, "duration_ms": 0})
+                stats["total"] += 1
+                stats["duration_ms"] += duration
+                if outcome in FAILED_OUTCOMES:
+                    stats["failed"] += 1
+                    if len(failures) < max_failures:
+                        failures.append(record)
+                    else:
+                        summary["omitted_failures"] += 1
+                if slowest:
+                    entry = (duration, record["nodeid"])
+                    if len(slow_heap) < slowest:
+                        heapq.heappush(slow_heap, entry)
+                    elif entry > slow_heap[0]:
+                        heapq.heapreplace(slow_heap, entry)
+    summary["slowest"] = sorted(slow_heap, reverse=True)
+    # 每个会话都写出了汇总记录才算完整（否则进程中途退出）
+    summary["complete"] = summary["sessions"] > 0 and summary["finished_sessions"] == summary["sessions"]
+    return summary
+
+
+def render_html(file_paths: List[str], output: str, **kwargs) -> Dict[str, Any]:
+    """
+    把 JSONL 结果渲染为 HTML 摘要
+
+    Args:
+        file_paths: JSONL 结果文件
+        output: HTML 文件路径
+        **kwargs: 传给 summarize 的参数
+
+    Returns:
+        汇总字典（见 summarize）
+    """
+    summary = summarize(file_paths, **kwargs)
+    esc = html.escape
+    counts = " ".join(f'<span class="{outcome}">{count} {outcome}</span>'
+                      for outcome, count in summary["counts"].items())
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>测试结果摘要</title><style>",
+        "body{font-family:sans-serif;margin:20px}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}pre{white-space:pre-wrap;background:#f6f6f6}"
+        ".passed{color:green}.failed,.error{color:red}.skipped,.xfailed,.xpassed{color:#a60}",
+        "</style></head><body><h1>测试结果摘要</h1>",
+        f"<p>{summary['total']} 个用例，累计耗时 {summary['duration_ms'] / 1000:.1f} s</p><p>{counts}</p>",
+    ]
+    if not summary["complete"]:
+        parts.append('<p class="error">结果文件不完整：测试进程未正常结束，只包含已完成的用例</p>')
+
+    parts.append("<h2>按文件统计</h2><table><tr><th>文件</th><th>用例数</th><th>失败</th><th>耗时 (s)</th></tr>")
+    for path, stats in sorted(summary["files"].items()):
+        parts.append(f"<tr><td>{esc(path)}</td><td>{stats['total']}</td><td>{stats['failed']}</td>"
+                     f"<td>{stats['duration_ms'] / 1000:.2f}</td></tr>")
+    parts.append("</table>")
+
+    if summary["slowest"]:
+        parts.append("<h2>最慢用例</h2><table><tr><th>用例</th><th>耗时 (ms)</th></tr>")
+        for duration, nodeid in summary["slowest"]:
+            parts.append(f"<tr><td>{esc(nodeid)}</td><td>{duration:.1f}</td></tr>")
+        parts.append("</table>")
+
+    parts.append(f"<h2>失败用例（{summary['counts']['failed'] + summary['counts']['error']}）</h2>")
+    for record in summary["failures"]:
+        parts.append(f'<h3 class="{record["outcome"]}">{esc(record["nodeid"])}</h3>'
+                     f'<pre>{esc(record.get("message", ""))}</pre>')
+        if record.get("log"):
+            parts.append(f"<details><summary>日志</summary><pre>{esc(record['log'])}</pre></details>")
+    if summary["omitted_failures"]:
+        parts.append(f"<p>另有 {summary['omitted_failures']} 个失败用例未列出，详见结果文件</p>")
+    parts.append("</body></html>")
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return summary
+
+
+def main(argv=None) -> int:
+    """命令行入口：离线渲染 HTML 摘要"""
+    parser = argparse.ArgumentParser(description="把 JSONL 用例结果渲染为 HTML 摘要")
+    parser.add_argument("files", nargs="+", help="JSONL 结果文件")
+    parser.add_argument("-o", "--output", default="reports/results.html", help="HTML 文件路径")
+    args = parser.parse_args(argv)
+    summary = render_html(args.files, args.output)
+    print(f"{summary['total']} 个用例，失败 {summary['counts']['failed']}，错误 {summary['counts']['error']}: "
+          f"{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
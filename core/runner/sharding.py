@@ -0,0 +1,205 @@
+"""
+按耗时分片
+多台 CI 节点各自执行 run.py --shard i/N，各节点必须基于相同的输入计算分片，否则用例会重复执行或遗漏：
+
+- 指定了共用耗时文件（run.py --durations-file 或 sharding.durations_file）时，
+  用最长处理时间优先（LPT）装箱把用例分到 N 个分片，使各分片的预计耗时接近；
+  没有记录耗时的新用例按已知耗时的中位数估计
+- 没有共用耗时文件时按 nodeid 的哈希均分用例（只依赖 nodeid，各节点结果一致）
+
+各节点本地的性能历史只包含自己分片的用例，彼此不同，不用于分片。
+耗时文件的同步方式：每个节点运行后写出 reports/durations_shard_i_of_N.json（本分片用例的耗时），
+CI 收集各节点的文件后合并，作为下一次运行的共用耗时文件（提交到仓库或作为 CI 制品分发）:
+
+    python -m core.runner.sharding merge ci/durations.json reports/durations_shard_*.json
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+from core.utils.config_loader import config
+from core.utils.stats import percentile
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    解析分片参数
+
+    Args:
+        value: "i/N"，i 从 1 开始，如 "2/4"
+
+    Returns:
+        (i, N)
+
+    Raises:
+        ValueError: 格式错误或 i 不在 1..N 范围内
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"分片参数格式应为 i/N，如 2/4: {value}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"分片序号应在 1..{count} 范围内: {value}")
+    return index, count
+
+
+def relative_nodeid(nodeid: str) -> str:
+    """把文件部分为绝对路径的 nodeid 转为相对当前目录（与耗时文件中记录的 nodeid 一致）"""
+    path, separator, rest = nodeid.partition("::")
+    if os.path.isabs(path):
+        path = os.path.relpath(path).replace(os.sep, "/")
+    return path + separator + rest
+
+
+def load_durations(file_path: str) -> Dict[str, float]:
+    """
+    读取共用耗时文件
+
+    Args:
+        file_path: 耗时文件路径（JSON {用例 nodeid: 耗时（毫秒）}）
+
+    Returns:
+        {用例 nodeid: 耗时（毫秒）}
+
+    Raises:
+        FileNotFoundError: 文件不存在（各节点必须使用相同的耗时文件，不能各自回退）
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"分片耗时文件不存在: {file_path}（首次运行可不指定，按哈希均分用例）")
+    with open(file_path, "r", encoding="utf-8") as f:
+        return {nodeid: float(duration) for nodeid, duration in json.load(f).items()}
+
+
+def write_durations(file_path: str, durations: Dict[str, float]):
+    """
+    写出耗时文件（先写临时文件再原子替换）
+
+    Args:
+        file_path: 耗时文件路径
+        durations: {用例 nodeid: 耗时（毫秒）}
+    """
+    file_dir = os.path.dirname(file_path)
+    if file_dir:
+        os.makedirs(file_dir, exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({nodeid: round(duration, 3) for nodeid, duration in durations.items()},
+                  f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp_path, file_path)
+
+
+def merge_durations(output: str, inputs: Sequence[str]) -> Dict[str, float]:
+    """
+    合并各节点的耗时文件：以已有的输出文件为基础，后面的文件覆盖前面的同名用例
+
+    Args:
+        output: 共用耗时文件路径（已存在时保留本次没有执行的用例的耗时）
+        inputs: 各节点写出的耗时文件
+
+    Returns:
+        合并后的耗时
+    """
+    merged = load_durations(output) if os.path.exists(output) else {}
+    for file_path in inputs:
+        merged.update(load_durations(file_path))
+    write_durations(output, merged)
+    return merged
+
+
+def hash_shards(nodeids: Sequence[str], count: int) -> List[List[str]]:
+    """
+    按 nodeid 的哈希均分用例（没有共用耗时文件时使用）
+
+    按哈希排序后轮流分配，各分片用例数最多相差 1，结果只依赖 nodeid 集合
+
+    Args:
+        nodeids: 用例 nodeid 列表
+        count: 分片数量
+
+    Returns:
+        每个分片的用例列表（保持收集顺序）
+    """
+    order = {nodeid: position for position, nodeid in enumerate(nodeids)}
+    ranked = sorted(nodeids, key=lambda nodeid: (hashlib.sha1(nodeid.encode("utf-8")).hexdigest(), nodeid))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    for position, nodeid in enumerate(ranked):
+        shards[position % count].append(nodeid)
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
+
+
+def assign_shards(nodeids: Sequence[str], count: int, durations: Dict[str, float],
+                  default_ms: Optional[float] = None) -> Tuple[List[List[str]], List[float]]:
+    """
+    LPT 装箱：按预计耗时从长到短，依次放入当前总耗时最小的分片
+
+    Args:
+        nodeids: 用例 nodeid 列表
+        count: 分片数量
+        durations: 共用耗时 {nodeid: 毫秒}
+        default_ms: 没有记录耗时的用例的估计值，默认取已知耗时的中位数（都没有记录时为 sharding.default_duration_ms）
+
+    Returns:
+        (每个分片的用例列表（保持收集顺序）, 每个分片的预计耗时（毫秒）)
+    """
+    if default_ms is None:
+        known = sorted(durations[nodeid] for nodeid in nodeids if nodeid in durations)
+        default_ms = percentile(known, 50) if known else config.get('sharding.default_duration_ms', 1000)
+
+    order = {nodeid: position for position, nodeid in enumerate(nodeids)}
+    # 耗时相同时按 nodeid 排序，保证各节点计算结果一致
+    jobs = sorted(((durations.get(nodeid, default_ms), nodeid) for nodeid in nodeids),
+                  key=lambda job: (-job[0], job[1]))
+
+    # (总耗时, 分片序号) 小顶堆
+    heap = [(0.0, index) for index in range(count)]
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for duration, nodeid in jobs:
+        load, index = heapq.heappop(heap)
+        shards[index].append(nodeid)
+        loads[index] = load + duration
+        heapq.heappush(heap, (loads[index], index))
+    return [sorted(shard, key=order.__getitem__) for shard in shards], loads
+
+
+def select_shard(nodeids: Sequence[str], index: int, count: int,
+                 durations: Optional[Dict[str, float]] = None) -> Tuple[List[str], List[float]]:
+    """
+    选出第 index 个分片的用例
+
+    Args:
+        nodeids: 收集到的用例（文件部分可以是绝对路径）
+        index: 分片序号（从1开始）
+        count: 分片数量
+        durations: 共用耗时文件中的耗时，None 表示按 nodeid 哈希均分
+
+    Returns:
+        (该分片的用例 nodeid（与输入格式相同）, 每个分片的预计耗时（毫秒）)
+    """
+    by_relative = {relative_nodeid(nodeid): nodeid for nodeid in nodeids}
+    if durations is None:
+        shards = hash_shards(list(by_relative), count)
+        default_ms = config.get('sharding.default_duration_ms', 1000)
+        loads = [len(shard) * default_ms for shard in shards]
+    else:
+        shards, loads = assign_shards(list(by_relative), count, durations)
+    return [by_relative[nodeid] for nodeid in shards[index - 1]], loads
+
+
+def main(argv=None) -> int:
+    """命令行入口：合并各节点的耗时文件"""
+    parser = argparse.ArgumentParser(description="分片耗时文件工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="合并各节点写出的耗时文件，作为下一次运行的共用耗时文件")
+    merge_parser.add_argument("output", help="共用耗时文件（已存在时在其基础上更新）")
+    merge_parser.add_argument("inputs", nargs="+", help="各节点写出的 durations_shard_i_of_N.json")
+    args = parser.parse_args(argv)
+    merged = merge_durations(args.output, args.inputs)
+    print(f"已合并 {len(args.inputs)} 个文件，共 {len(merged)} 个用例的耗时: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
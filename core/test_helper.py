@@ -4,6 +4,9 @@
 """
 from core.utils.logger import logger
 from core.assert_helper import assert_helper
+from core.utils.json_path import compile_path
+from core.utils.row_invariants import RowInvariants
+from core.utils.pagination import PaginationChecker
 
 
 class BaseTest:
@@ -25,7 +28,7 @@ class BaseTest:
         assert_helper.assert_status_code(response, 200)
         
         # 响应数据断言
-        response_data = response.json()
+        response_data = assert_helper.get_json(response)
         assert_helper.assert_is_not_none(response_data, "响应数据不应为空")
         
         # 业务状态码断言
@@ -51,7 +54,7 @@ class BaseTest:
             响应数据字典
         """
         # HTTP 状态码可能是 200，但业务状态码表示失败
-        response_data = response.json()
+        response_data = assert_helper.get_json(response)
         assert_helper.assert_is_not_none(response_data, "响应数据不应为空")
         
         # 业务状态码断言
@@ -98,36 +101,88 @@ class BaseTest:
     @staticmethod
     def extract_value(response_data, path, default=None):
         """
-        从响应数据中提取值（支持嵌套路径）
+        从响应数据中提取值（支持嵌套路径、通配符、切片和过滤）
+        
+        路径编译后缓存，同一路径只解析一次；包含 [*]、切片或过滤条件的路径返回所有匹配值的列表
         
         Args:
             response_data: 响应数据字典
-            path: 路径，如 "data.user.name" 或 "data.list[0].id"
+            path: 路径，如 "data.user.name"、"data.list[0].id" 或 "data.listData[*].orderStatus"
             default: 默认值
             
         Returns:
-            提取的值，如果路径不存在返回 default
+            提取的值（多值路径为列表），如果路径不存在或没有匹配返回 default
             
         Examples:
             >>> extract_value({"data": {"user": {"name": "test"}}}, "data.user.name")
             'test'
             >>> extract_value({"data": {"list": [{"id": 1}]}}, "data.list[0].id")
             1
+            >>> extract_value({"data": {"list": [{"id": 1}, {"id": 2}]}}, "data.list[*].id")
+            [1, 2]
+        """
+        compiled = compile_path(path)
+        if compiled.is_multi:
+            return compiled.find(response_data) or default
+        return compiled.first(response_data, default)
+    
+    @staticmethod
+    def extract_values(response_data, path):
+        """
+        从响应数据中提取所有匹配值（一次遍历）
+        
+        Args:
+            response_data: 响应数据字典
+            path: 路径，如 "data.listData[*].orderStatus" 或 "data.listData[?(@.orderStatus == 2)].orderId"
+            
+        Returns:
+            匹配值列表，没有匹配时返回空列表
         """
-        try:
-            keys = path.split('.')
-            value = response_data
+        return compile_path(path).find(response_data)
+    
+    @staticmethod
+    def assert_rows_match_filter(response_data, params, data_key="listData", **fields):
+        """
+        断言列表中每一行都满足查询条件（一次遍历检查日期范围、订单状态和排序）
+        
+        分页/流式数据请直接使用 RowInvariants.from_params(params)，逐页调用 check()，
+        最后调用 assert_helper.assert_invariants()
+        
+        Args:
+            response_data: 响应数据字典
+            params: 请求参数，包含 startDate, endDate, orderStatus, sortRule（均可选）
+            data_key: 数据列表的键名，默认 "listData"
+            **fields: 行字段名 date_field, status_field, id_field（如 ReportAPI.MOCK_ORDER_ROW_FIELDS）
             
-            for key in keys:
-                # 处理数组索引，如 list[0]
-                if '[' in key and ']' in key:
-                    key_name, index = key.split('[')
-                    index = int(index.rstrip(']'))
-                    value = value[key_name][index]
-                else:
-                    value = value[key]
+        Returns:
+            违规汇总字典（rows, violations, by_rule, examples）
+        """
+        data = response_data.get("data") or {}
+        rows = data.get(data_key, []) if isinstance(data, dict) else data
+        invariants = RowInvariants.from_params(params, **fields)
+        invariants.check(rows or [])
+        assert_helper.assert_invariants(invariants)
+        return invariants.summary()
+    
+    @staticmethod
+    def assert_pagination_consistent(pages, page_size, id_field="orderId", use_bloom=None):
+        """
+        断言分页数据一致：跨页无重复、中间页无缺失、各页数量之和等于 totalCount
+        
+        Args:
+            pages: 逐页数据的可迭代对象，元素为 (页码, 行列表, totalCount)，
+                   如 ReportAPI.iter_order_list_pages() 的返回值
+            page_size: 请求的每页大小
+            id_field: 行的唯一标识字段
+            use_bloom: 是否使用布隆过滤器去重，默认 pagination.use_bloom
             
-            return value
-        except (KeyError, IndexError, TypeError):
-            return default
-
+        Returns:
+            检查结果字典（包含出问题的页码）
+        """
+        checker = PaginationChecker(id_field=id_field, use_bloom=use_bloom)
+        for page_num, rows, total_count in pages:
+            checker.feed(page_num, rows, page_size, total_count)
+        result = checker.result()
+        assert result["ok"], f"分页一致性断言失败: {checker.describe()}"
+        logger.info(f"✓ 分页一致性断言通过: {checker.describe()}")
+        return result
@@ -5,6 +5,7 @@
 import os
 import yaml
 from typing import Dict, Any, Optional
+from core.utils.lazy_proxy import LazyProxy
 
 
 class AccountLoader:
@@ -169,6 +170,6 @@ class AccountLoader:
         self._load_account_config()
 
 
-# 全局账号配置实例
-account_loader = AccountLoader()
+# 全局账号配置实例（延迟初始化，首次使用时才读取账号配置）
+account_loader = LazyProxy(AccountLoader)
 
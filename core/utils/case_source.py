@@ -0,0 +1,374 @@
+"""
+流式用例数据源
+用于按需读取超大的数据驱动用例文件（JSONL / 多文档YAML）
+
+首次使用时扫描一遍数据文件，生成持久化的字节偏移索引；之后按序号或用例ID
+直接定位到对应的行/文档读取，不需要把整个文件加载到内存中
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import yaml
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from core.utils.config_loader import config
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+# 索引文件头: 魔数、源文件大小、源文件修改时间、用例数量、ID区长度
+_INDEX_MAGIC = b"ACIDX001"
+_INDEX_HEADER = struct.Struct("<8sQqQQ")
+
+
+class CaseSource:
+    """
+    流式用例数据源类
+
+    支持的文件格式：
+    - .jsonl / .ndjson: 每行一个JSON对象，空行会被忽略
+    - .yaml / .yml: 以 --- 分隔的多文档YAML，每个文档一个用例
+
+    Example:
+        >>> source = CaseSource("bizs/data/report_cases.jsonl")
+        >>> indexes, ids = source.parametrize_args()
+        >>> @pytest.mark.parametrize("case_index", indexes, ids=ids)
+        ... def test_xxx(case_index):
+        ...     case_data = source[case_index]
+    """
+
+    def __init__(self, file_path: str, id_field: Optional[str] = "case_id",
+                 use_mmap: Optional[bool] = None):
+        """
+        初始化用例数据源（不会立即读取文件和配置，可在模块级创建）
+
+        Args:
+            file_path: 数据文件路径（相对路径从项目根目录开始）
+            id_field: 用例ID字段名，为None或用例中不存在该字段时使用序号作为ID
+            use_mmap: 是否以内存映射方式读取索引，None表示使用配置 test_data.index_mmap
+        """
+        project_root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(project_root, file_path)
+        self.file_path = file_path
+        self.id_field = id_field
+        self._use_mmap = use_mmap
+
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in ('.jsonl', '.ndjson'):
+            self._format = 'jsonl'
+        elif ext in ('.yaml', '.yml'):
+            self._format = 'yaml'
+        else:
+            raise ValueError(f"不支持的用例文件格式: {file_path}")
+
+        self._project_root = project_root
+        self._index_path: Optional[str] = None
+        self._offsets = None
+        self._ids_section: Tuple[int, int] = (0, 0)
+        self._ids: Optional[List[str]] = None
+        self._id_positions: Optional[Dict[str, int]] = None
+        self._index_file = None
+        self._index_mmap = None
+        self._data_file = None
+        self._lock = threading.Lock()
+
+    # ===== 索引管理 =====
+
+    @property
+    def index_path(self) -> str:
+        """索引文件路径（首次访问时按配置 test_data.index_dir 计算）"""
+        if self._index_path is None:
+            index_dir = config.get('test_data.index_dir', '.cache/case_index')
+            if not os.path.isabs(index_dir):
+                index_dir = os.path.join(self._project_root, index_dir)
+            digest = hashlib.sha1(f"{self.file_path}|{self.id_field}".encode('utf-8')).hexdigest()[:12]
+            self._index_path = os.path.join(index_dir, f"{os.path.basename(self.file_path)}.{digest}.idx")
+        return self._index_path
+
+    @index_path.setter
+    def index_path(self, value: str):
+        self._index_path = value
+
+    def _ensure_index(self):
+        """确保索引已加载（索引不存在或源文件已变化时重建）"""
+        if self._offsets is not None:
+            return
+        with self._lock:
+            if self._offsets is not None:
+                return
+            if not os.path.exists(self.file_path):
+                raise FileNotFoundError(f"用例文件不存在: {self.file_path}")
+            stat = os.stat(self.file_path)
+            if not self._open_index(stat):
+                self._build_index(stat)
+                if not self._open_index(stat):
+                    raise RuntimeError(f"用例索引生成失败: {self.index_path}")
+
+    def _open_index(self, stat: os.stat_result) -> bool:
+        """
+        打开已有的索引文件
+
+        Args:
+            stat: 源文件的 stat 结果
+
+        Returns:
+            True表示索引有效并已加载，False表示索引不存在或已过期
+        """
+        try:
+            index_file = open(self.index_path, 'rb')
+        except FileNotFoundError:
+            return False
+
+        header = index_file.read(_INDEX_HEADER.size)
+        if len(header) != _INDEX_HEADER.size:
+            index_file.close()
+            return False
+        magic, size, mtime_ns, count, ids_length = _INDEX_HEADER.unpack(header)
+        if magic != _INDEX_MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            index_file.close()
+            return False
+
+        offsets_length = (count + 1) * 8
+        if self._use_mmap is None:
+            self._use_mmap = config.get('test_data.index_mmap', True)
+        if self._use_mmap:
+            # 内存映射：偏移量数组按需分页读入，不占用进程堆内存
+            self._index_mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            start = _INDEX_HEADER.size
+            self._offsets = memoryview(self._index_mmap)[start:start + offsets_length].cast('Q')
+            self._index_file = index_file
+        else:
+            offsets = array('Q')
+            offsets.frombytes(index_file.read(offsets_length))
+            self._offsets = offsets
+            index_file.close()
+        self._ids_section = (_INDEX_HEADER.size + offsets_length, ids_length)
+        return True
+
+    def _build_index(self, stat: os.stat_result):
+        """
+        扫描数据文件生成索引
+
+        Args:
+            stat: 源文件的 stat 结果
+        """
+        from core.utils.logger import logger
+        logger.info(f"生成用例索引: {self.file_path}")
+
+        offsets = array('Q')
+        ids = []
+        for start, raw in self._scan_records():
+            position = len(offsets)
+            offsets.append(start)
+            ids.append(self._extract_id(raw, position))
+        offsets.append(stat.st_size)
+
+        ids_bytes = "\n".join(ids).encode('utf-8')
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(
+                _INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(ids), len(ids_bytes)
+            ))
+            f.write(offsets.tobytes())
+            f.write(ids_bytes)
+        os.replace(tmp_path, self.index_path)
+        logger.info(f"用例索引已生成，共 {len(ids)} 条用例: {self.index_path}")
+
+    def _scan_records(self) -> Iterator[Tuple[int, bytes]]:
+        """
+        逐行扫描数据文件，产出每条用例的起始偏移量和原始内容
+
+        Yields:
+            (起始偏移量, 原始字节内容)
+        """
+        with open(self.file_path, 'rb') as f:
+            offset = 0
+            if self._format == 'jsonl':
+                for line in f:
+                    if line.strip():
+                        yield offset, line
+                    offset += len(line)
+                return
+
+            # 多文档YAML：以行首的 --- 作为文档分隔
+            doc_start, doc_lines = 0, []
+            for line in f:
+                if line.startswith(b'---'):
+                    if any(l.strip() and not l.lstrip().startswith(b'#') for l in doc_lines):
+                        yield doc_start, b"".join(doc_lines)
+                    doc_start, doc_lines = offset, [line]
+                else:
+                    doc_lines.append(line)
+                offset += len(line)
+            if any(l.strip() and not l.lstrip().startswith(b'#') for l in doc_lines):
+                yield doc_start, b"".join(doc_lines)
+
+    def _extract_id(self, raw: bytes, position: int) -> str:
+        """从原始内容中提取用例ID，缺失时使用序号"""
+        if self.id_field:
+            record = self._decode(raw)
+            if isinstance(record, dict) and record.get(self.id_field) is not None:
+                return str(record[self.id_field]).replace("\n", " ")
+        return str(position)
+
+    def _decode(self, raw: bytes) -> Any:
+        """解析单条用例的原始内容"""
+        if self._format == 'jsonl':
+            return json.loads(raw)
+        return yaml.load(raw, Loader=_SafeLoader)
+
+    def _load_ids(self) -> List[str]:
+        """按需加载用例ID列表"""
+        if self._ids is None:
+            self._ensure_index()
+            start, length = self._ids_section
+            if self._index_mmap is not None:
+                ids_bytes = self._index_mmap[start:start + length]
+            else:
+                with open(self.index_path, 'rb') as f:
+                    f.seek(start)
+                    ids_bytes = f.read(length)
+            self._ids = ids_bytes.decode('utf-8').split("\n") if len(self) else []
+        return self._ids
+
+    # ===== 读取用例 =====
+
+    def __len__(self) -> int:
+        """用例数量"""
+        self._ensure_index()
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> Any:
+        """
+        按序号读取用例（只读取该用例对应的字节范围）
+
+        Args:
+            position: 用例序号，从0开始
+
+        Returns:
+            解析后的用例数据
+        """
+        count = len(self)
+        if position < 0:
+            position += count
+        if not 0 <= position < count:
+            raise IndexError(f"用例序号超出范围: {position}")
+
+        start, end = self._offsets[position], self._offsets[position + 1]
+        with self._lock:
+            if self._data_file is None:
+                self._data_file = open(self.file_path, 'rb')
+            self._data_file.seek(start)
+            raw = self._data_file.read(end - start)
+        return self._decode(raw)
+
+    def get(self, case_id: str, default: Any = None) -> Any:
+        """
+        按用例ID读取用例
+
+        Args:
+            case_id: 用例ID
+            default: 用例不存在时的返回值
+
+        Returns:
+            解析后的用例数据
+        """
+        if self._id_positions is None:
+            self._id_positions = {cid: i for i, cid in enumerate(self._load_ids())}
+        position = self._id_positions.get(str(case_id))
+        return default if position is None else self[position]
+
+    def case_ids(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """
+        获取用例ID列表
+
+        Args:
+            start: 起始序号
+            stop: 结束序号（不包含），None表示到末尾
+
+        Returns:
+            用例ID列表
+        """
+        return self._load_ids()[start:stop]
+
+    def iter_cases(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        顺序读取一段用例（从 start 对应的偏移量开始流式读取，不读取前面的内容）
+
+        Args:
+            start: 起始序号
+            stop: 结束序号（不包含），None表示到末尾
+
+        Yields:
+            (用例ID, 用例数据)
+        """
+        count = len(self)
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return
+        ids = self._load_ids()
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._offsets[start])
+            for position in range(start, stop):
+                length = self._offsets[position + 1] - self._offsets[position]
+                yield ids[position], self._decode(f.read(length))
+
+    def shard(self, shard_index: int, shard_count: int) -> range:
+        """
+        计算指定分片负责的用例序号范围（连续区间，便于顺序读取）
+
+        Args:
+            shard_index: 分片序号，从0开始
+            shard_count: 分片总数
+
+        Returns:
+            用例序号范围
+        """
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"分片参数错误: {shard_index}/{shard_count}")
+        count = len(self)
+        size, remainder = divmod(count, shard_count)
+        start = shard_index * size + min(shard_index, remainder)
+        stop = start + size + (1 if shard_index < remainder else 0)
+        return range(start, stop)
+
+    def parametrize_args(self, shard: Optional[Tuple[int, int]] = None) -> Tuple[List[int], List[str]]:
+        """
+        生成 pytest 参数化所需的参数（只包含序号和ID，用例内容在执行时才读取）
+
+        Args:
+            shard: 可选的分片 (shard_index, shard_count)
+
+        Returns:
+            (用例序号列表, 用例ID列表)
+        """
+        positions = self.shard(*shard) if shard else range(len(self))
+        ids = self._load_ids()
+        return list(positions), [ids[i] for i in positions]
+
+    def close(self):
+        """关闭打开的文件句柄和内存映射"""
+        with self._lock:
+            if self._data_file is not None:
+                self._data_file.close()
+                self._data_file = None
+            if self._index_mmap is not None:
+                self._offsets.release()
+                self._index_mmap.close()
+                self._index_mmap = None
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+            self._offsets = None
+            self._ids = None
+            self._id_positions = None
@@ -5,6 +5,27 @@
 import os
 import yaml
 from typing import Dict, Any
+from core.utils.lazy_proxy import LazyProxy
+
+
+# 并行执行时 worker 子进程的标识（由 core/runner/parallel.py 设置，如 "w1"）
+WORKER_ENV = "API_TEST_WORKER"
+# 并行执行时的 worker 总数（worker 子进程中用于均分限速等全局配额）
+WORKER_COUNT_ENV = "API_TEST_WORKER_COUNT"
+
+
+def worker_path(path: str, worker_id: str) -> str:
+    """
+    worker 子进程中隔离后的文件路径：<原目录>/<worker_id>/<文件名>
+    
+    Args:
+        path: 原文件路径
+        worker_id: worker 标识
+        
+    Returns:
+        隔离后的文件路径
+    """
+    return os.path.join(os.path.dirname(path), worker_id, os.path.basename(path))
 
 
 class ConfigLoader:
@@ -37,6 +58,27 @@ class ConfigLoader:
         
         with open(config_path, 'r', encoding='utf-8') as f:
             self._config = yaml.safe_load(f)
+        
+        worker_id = os.environ.get(WORKER_ENV)
+        if worker_id:
+            self._isolate_worker_paths(worker_id)
+    
+    def _isolate_worker_paths(self, worker_id: str):
+        """
+        worker 子进程中把日志、Token 等文件路径改到 <原目录>/<worker_id>/ 下，避免多个进程写同一个文件
+        
+        Args:
+            worker_id: worker 标识
+        """
+        for key_path in self.get('parallel.isolated_paths', []) or []:
+            value = self.get(key_path)
+            if not value:
+                continue
+            *parents, key = key_path.split('.')
+            section = self._config
+            for parent in parents:
+                section = section[parent]
+            section[key] = worker_path(value, worker_id)
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -73,6 +115,6 @@ class ConfigLoader:
         self._load_config()
 
 
-# 全局配置实例
-config = ConfigLoader()
+# 全局配置实例（延迟初始化，首次使用时才读取配置文件）
+config = LazyProxy(ConfigLoader)
 
@@ -0,0 +1,265 @@
+"""
+JSON 路径
+把 "data.listData[*].orderStatus" 这样的路径编译为步骤序列（编译结果 LRU 缓存），
+一次遍历取出所有匹配值
+
+支持的语法:
+    data.user.name              字典键
+    data.list[0] / list[-1]     列表下标
+    data.list[*] / data.*       列表所有元素 / 字典所有值
+    data.list[1:10:2]           切片
+    data.list[?(@.status == 1)] 过滤（比较运算符 == != < <= > >= in，字段可嵌套，如 @.shop.id）
+    data.list[?(@.remark)]      过滤：字段存在且为真
+    data["key.with.dot"]        带特殊字符的键
+"""
+import ast
+import json
+import operator
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+
+# 步骤类型
+_KEY = "key"
+_INDEX = "index"
+_WILDCARD = "wildcard"
+_SLICE = "slice"
+_FILTER = "filter"
+
+_MISSING = object()
+
+# 过滤表达式的比较运算符（同一位置先匹配较长的，避免 "<=" 被识别为 "<"）
+_OPERATORS = (
+    ("==", operator.eq), ("!=", operator.ne), ("<=", operator.le), (">=", operator.ge),
+    ("<", operator.lt), (">", operator.gt), (" in ", lambda value, options: value in options),
+)
+
+
+def _parse_literal(text: str) -> Any:
+    """解析过滤表达式右侧的字面量（JSON 字面量，或单引号字符串等 Python 字面量）"""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        raise ValueError(f"无效的过滤条件字面量: {text}")
+
+
+def _compile_filter(expression: str) -> Callable[[Any], bool]:
+    """编译过滤表达式，如 @.orderStatus == 1"""
+    expression = expression.strip()
+    if expression.startswith("(") and expression.endswith(")"):
+        expression = expression[1:-1].strip()
+    # 取最先出现的运算符（字面量中可能包含运算符字符）
+    position, symbol, compare = len(expression), None, None
+    for candidate, function in _OPERATORS:
+        index = expression.find(candidate)
+        if index != -1 and index < position:
+            position, symbol, compare = index, candidate, function
+    if symbol is None:
+        left, right = expression, None
+    else:
+        left, right = expression[:position], expression[position + len(symbol):]
+
+    left = left.strip()
+    if not left.startswith("@"):
+        raise ValueError(f"过滤条件必须以 @ 开头: {expression}")
+    field = compile_path(left[1:].lstrip(".")) if left != "@" else None
+    expected = _parse_literal(right) if compare is not None else None
+
+    def predicate(node: Any) -> bool:
+        value = node if field is None else field.first(node, _MISSING)
+        if value is _MISSING:
+            return False
+        if compare is None:
+            return bool(value)
+        try:
+            return compare(value, expected)
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _parse_bracket(content: str, path: str) -> Tuple[str, Any]:
+    """解析方括号内的内容"""
+    content = content.strip()
+    if content == "*":
+        return _WILDCARD, None
+    if content.startswith("?"):
+        return _FILTER, _compile_filter(content[1:])
+    if content[:1] in ("'", '"') and content[-1:] == content[:1]:
+        return _KEY, content[1:-1]
+    if ":" in content:
+        parts = content.split(":")
+        if len(parts) > 3:
+            raise ValueError(f"无效的切片: [{content}]（路径: {path}）")
+        try:
+            return _SLICE, slice(*(int(part) if part.strip() else None for part in parts))
+        except ValueError:
+            raise ValueError(f"无效的切片: [{content}]（路径: {path}）")
+    try:
+        return _INDEX, int(content)
+    except ValueError:
+        raise ValueError(f"无效的下标: [{content}]（路径: {path}）")
+
+
+def _find_closing(path: str, start: int) -> int:
+    """查找与 start 处 "[" 匹配的 "]"（跳过引号和嵌套方括号内的内容）"""
+    depth = 0
+    quote = None
+    for i in range(start, len(path)):
+        char = path[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"方括号未闭合: {path}")
+
+
+def _parse(path: str) -> Tuple[Tuple[str, Any], ...]:
+    """把路径解析为步骤序列"""
+    # 只去掉根节点 "$"（单独的 "$" 或其后紧跟 "." / "["），"$ref" 这类以 $ 开头的键名保持不变
+    if path == "$" or path.startswith(("$.", "$[")):
+        path = path[1:]
+    steps = []
+    i = 0
+    length = len(path)
+    while i < length:
+        char = path[i]
+        if char == ".":
+            i += 1
+        elif char == "[":
+            end = _find_closing(path, i)
+            steps.append(_parse_bracket(path[i + 1:end], path))
+            i = end + 1
+        else:
+            end = i
+            while end < length and path[end] not in ".[":
+                end += 1
+            key = path[i:end]
+            steps.append((_WILDCARD, None) if key == "*" else (_KEY, key))
+            i = end
+    return tuple(steps)
+
+
+class JsonPath:
+    """
+    编译后的 JSON 路径
+
+    通过 compile_path() 获取（带缓存），不要直接实例化
+
+    Example:
+        >>> compile_path("data.listData[*].orderStatus").find(response_data)
+        [1, 2, 2]
+    """
+
+    __slots__ = ("path", "steps", "is_multi")
+
+    def __init__(self, path: str):
+        """
+        编译路径
+
+        Args:
+            path: 路径字符串
+        """
+        self.path = path
+        self.steps = _parse(path)
+        # 是否可能返回多个值（包含通配符、切片或过滤）
+        self.is_multi = any(kind in (_WILDCARD, _SLICE, _FILTER) for kind, _ in self.steps)
+
+    def first(self, data: Any, default: Any = None) -> Any:
+        """
+        取第一个匹配值
+
+        单值路径按下标/键逐级访问（与 BaseTest.extract_value 原有行为一致），
+        访问失败（KeyError、IndexError、TypeError）时返回 default
+
+        Args:
+            data: JSON数据
+            default: 未匹配时的默认值
+
+        Returns:
+            匹配值或 default
+        """
+        if self.is_multi:
+            matches = self.find(data)
+            return matches[0] if matches else default
+        value = data
+        try:
+            for _, arg in self.steps:
+                value = value[arg]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return value
+
+    def find(self, data: Any) -> List[Any]:
+        """
+        取所有匹配值（一次遍历，逐步展开）
+
+        Args:
+            data: JSON数据
+
+        Returns:
+            匹配值列表（不存在的键和越界下标直接跳过）
+        """
+        nodes = [data]
+        for kind, arg in self.steps:
+            if kind == _KEY:
+                nodes = [node[arg] for node in nodes if isinstance(node, dict) and arg in node]
+            elif kind == _WILDCARD:
+                expanded = []
+                for node in nodes:
+                    if isinstance(node, list):
+                        expanded.extend(node)
+                    elif isinstance(node, dict):
+                        expanded.extend(node.values())
+                nodes = expanded
+            elif kind == _INDEX:
+                nodes = [node[arg] for node in nodes
+                         if isinstance(node, list) and -len(node) <= arg < len(node)]
+            elif kind == _SLICE:
+                expanded = []
+                for node in nodes:
+                    if isinstance(node, list):
+                        expanded.extend(node[arg])
+                nodes = expanded
+            else:
+                expanded = []
+                for node in nodes:
+                    items = node if isinstance(node, list) else node.values() if isinstance(node, dict) else ()
+                    expanded.extend(item for item in items if arg(item))
+                nodes = expanded
+            if not nodes:
+                break
+        return nodes
+
+    def __repr__(self) -> str:
+        return f"<JsonPath {self.path!r}>"
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> JsonPath:
+    """
+    编译路径（结果缓存，同一路径只解析一次）
+
+    Args:
+        path: 路径字符串，如 "data.listData[*].orderStatus"
+
+    Returns:
+        JsonPath 实例
+
+    Raises:
+        ValueError: 路径语法错误
+    """
+    return JsonPath(path)
@@ -0,0 +1,68 @@
+"""
+延迟初始化代理
+全局单例（config、logger、session_manager 等）在首次使用时才真正创建，
+避免导入模块时就读取 YAML、创建日志目录或打开网络会话
+"""
+import threading
+from typing import Any, Callable
+
+
+class LazyProxy:
+    """
+    延迟初始化代理类
+
+    对外表现与被代理的对象一致（属性访问、赋值都会转发），
+    但只有在第一次访问属性时才会调用工厂函数创建真实对象
+
+    Example:
+        >>> config = LazyProxy(ConfigLoader)
+        >>> config.get('base.base_url')  # 此时才会读取配置文件
+    """
+
+    __slots__ = ('_factory', '_instance', '_lock')
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        初始化代理
+
+        Args:
+            factory: 无参工厂函数，返回真实对象
+        """
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _get_instance(self) -> Any:
+        """获取真实对象（首次调用时创建，线程安全）"""
+        instance = object.__getattribute__(self, '_instance')
+        if instance is None:
+            with object.__getattribute__(self, '_lock'):
+                instance = object.__getattribute__(self, '_instance')
+                if instance is None:
+                    instance = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def is_initialized(self) -> bool:
+        """
+        检查真实对象是否已经创建
+
+        Returns:
+            True表示已创建，False表示尚未创建
+        """
+        return object.__getattribute__(self, '_instance') is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get_instance(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._get_instance(), name)
+
+    def __repr__(self) -> str:
+        if self.is_initialized():
+            return repr(self._get_instance())
+        factory = object.__getattribute__(self, '_factory')
+        return f"<LazyProxy 未初始化: {getattr(factory, '__qualname__', factory)}>"
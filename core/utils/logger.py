@@ -2,73 +2,293 @@
 日志工具
 提供统一的日志记录功能
 """
+import atexit
+import gzip
 import os
+import queue
+import shutil
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
+from collections import deque
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
 from core.utils.config_loader import config
+from core.utils.lazy_proxy import LazyProxy
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    有界队列日志处理器
+
+    业务线程只负责把日志记录放入队列，格式化、写文件和轮转由后台监听线程完成。
+    队列满时按策略处理：
+    - drop: 丢弃 WARNING 以下的日志（并计数），WARNING 及以上阻塞等待入队
+    - block: 所有日志阻塞等待入队（背压）
+    """
+
+    def __init__(self, log_queue: queue.Queue, full_policy: str = "drop"):
+        """
+        初始化有界队列日志处理器
+
+        Args:
+            log_queue: 有界队列
+            full_policy: 队列满时的策略，drop 或 block
+        """
+        super().__init__(log_queue)
+        self.full_policy = full_policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        入队前的处理
+
+        监听线程与业务线程在同一进程内，记录不需要序列化，
+        因此这里不做格式化，把格式化开销留给后台线程
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """将日志记录放入队列（队列满时按策略处理）"""
+        if self.full_policy == "block" or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    环形缓冲日志处理器
+
+    只把日志记录保存在内存中（不格式化、不写文件），
+    超出容量时丢弃最早的记录
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        初始化环形缓冲日志处理器
+
+        Args:
+            capacity: 最多保留的日志条数
+        """
+        super().__init__()
+        self.buffer = deque(maxlen=capacity)
+        self.total = 0
+
+    def emit(self, record: logging.LogRecord):
+        """保存日志记录"""
+        self.buffer.append(record)
+        self.total += 1
+
+
+def _gzip_namer(name: str) -> str:
+    """轮转文件命名：追加 .gz 后缀"""
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    """轮转时将日志文件压缩为 gzip"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
 
 
 class Logger:
     """日志工具类"""
-    
+
     _loggers = {}
-    
+    # 异步队列模式下的 (logger, 队列处理器, 后台监听器)
+    _queues: List[Tuple[logging.Logger, "BoundedQueueHandler", QueueListener]] = []
+    # 按用例缓冲日志时的 {logger名称: (缓冲处理器, 被替换下来的handler列表)}
+    _buffers: Dict[str, Tuple[RingBufferHandler, List[logging.Handler]]] = {}
+
     @staticmethod
     def get_logger(name: str = "api_test") -> logging.Logger:
         """
         获取日志记录器（单例模式）
-        
+
         Args:
             name: 日志记录器名称
-            
+
         Returns:
             logging.Logger实例
         """
         if name not in Logger._loggers:
             logger = logging.getLogger(name)
             logger.setLevel(getattr(logging, config.get('logging.level', 'INFO')))
-            
+
             # 避免重复添加handler
             if logger.handlers:
                 return logger
-            
-            # 日志格式
-            formatter = logging.Formatter(
-                config.get('logging.format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            )
-            
-            # 控制台输出
-            if config.get('logging.console', True):
-                console_handler = logging.StreamHandler(sys.stdout)  # 输出到 stdout 而不是 stderr
-                console_handler.setLevel(logging.DEBUG)
-                console_handler.setFormatter(formatter)
-                logger.addHandler(console_handler)
-            
-            # 文件输出
-            log_file = config.get('logging.file_path', 'logs/api_test.log')
-            if log_file:
-                # 确保日志目录存在
-                log_dir = os.path.dirname(log_file)
-                if log_dir and not os.path.exists(log_dir):
-                    os.makedirs(log_dir, exist_ok=True)
-                
-                # 使用RotatingFileHandler实现日志轮转
-                file_handler = RotatingFileHandler(
-                    log_file,
-                    maxBytes=10 * 1024 * 1024,  # 10MB
-                    backupCount=5,
-                    encoding='utf-8'
-                )
-                file_handler.setLevel(logging.DEBUG)
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-            
+
+            handlers = Logger._create_handlers()
+
+            if config.get('logging.queue.enabled', False):
+                # 异步队列模式：业务线程只入队，后台线程负责输出
+                Logger._start_queue(logger, handlers)
+            else:
+                for handler in handlers:
+                    logger.addHandler(handler)
+
             Logger._loggers[name] = logger
-        
+
         return Logger._loggers[name]
 
+    @staticmethod
+    def _create_handlers() -> List[logging.Handler]:
+        """
+        创建实际输出日志的handler（控制台、文件）
+
+        Returns:
+            handler列表
+        """
+        handlers = []
+
+        # 日志格式
+        formatter = logging.Formatter(
+            config.get('logging.format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        )
+
+        # 控制台输出
+        if config.get('logging.console', True):
+            console_handler = logging.StreamHandler(sys.stdout)  # 输出到 stdout 而不是 stderr
+            console_handler.setLevel(logging.DEBUG)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        # 文件输出
+        log_file = config.get('logging.file_path', 'logs/api_test.log')
+        if log_file:
+            # 确保日志目录存在
+            log_dir = os.path.dirname(log_file)
+            if log_dir and not os.path.exists(log_dir):
+                os.makedirs(log_dir, exist_ok=True)
+
+            # 使用RotatingFileHandler实现日志轮转
+            file_handler = RotatingFileHandler(
+                log_file,
+                maxBytes=10 * 1024 * 1024,  # 10MB
+                backupCount=5,
+                encoding='utf-8'
+            )
+            # 轮转后的文件压缩为 gzip
+            if config.get('logging.compress_rotated', False):
+                file_handler.namer = _gzip_namer
+                file_handler.rotator = _gzip_rotator
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        return handlers
+
+    @staticmethod
+    def _start_queue(logger: logging.Logger, handlers: List[logging.Handler]):
+        """
+        创建有界队列处理器挂到logger上，并启动后台监听线程
+
+        Args:
+            logger: 日志记录器
+            handlers: 实际输出日志的handler列表
+        """
+        log_queue = queue.Queue(maxsize=config.get('logging.queue.max_size', 10000))
+        queue_handler = BoundedQueueHandler(
+            log_queue, config.get('logging.queue.full_policy', 'drop')
+        )
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        logger.addHandler(queue_handler)
+
+        if not Logger._queues:
+            atexit.register(Logger.shutdown)
+        Logger._queues.append((logger, queue_handler, listener))
+
+    @staticmethod
+    def flush():
+        """
+        等待队列中的日志全部写出（异步队列模式下使用，如测试会话结束时）
+        """
+        for _, _, listener in Logger._queues:
+            listener.queue.join()
+            for handler in listener.handlers:
+                handler.flush()
+
+    @staticmethod
+    def shutdown():
+        """
+        停止后台监听线程
+
+        会先写出队列中剩余的日志，之后logger改回同步输出，
+        因此停止后继续记录日志也不会丢失
+        """
+        while Logger._queues:
+            logger, queue_handler, listener = Logger._queues.pop()
+            # 先等待队列清空，避免队列满时停止信号无法入队
+            listener.queue.join()
+            listener.stop()
+            logger.removeHandler(queue_handler)
+            for handler in listener.handlers:
+                logger.addHandler(handler)
+            if queue_handler.dropped:
+                logger.warning(f"日志队列已满，共丢弃 {queue_handler.dropped} 条日志")
+            for handler in listener.handlers:
+                handler.flush()
+
+    @staticmethod
+    def begin_test_buffer(name: str = "api_test"):
+        """
+        开始缓冲日志：之后的日志只保存在内存环形缓冲区中，不输出到控制台和文件
+
+        Args:
+            name: 日志记录器名称
+        """
+        if name in Logger._buffers:
+            return
+        logger = Logger.get_logger(name)
+        handlers = list(logger.handlers)
+        buffer_handler = RingBufferHandler(config.get('logging.buffer_per_test.capacity', 1000))
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(buffer_handler)
+        Logger._buffers[name] = (buffer_handler, handlers)
+
+    @staticmethod
+    def end_test_buffer(flush: bool, name: str = "api_test", min_level: Optional[int] = None) -> int:
+        """
+        结束缓冲日志，恢复原来的输出handler
+
+        Args:
+            flush: 是否把缓冲区中的日志全部输出（如用例失败时）
+            name: 日志记录器名称
+            min_level: 不全部输出时仍然输出的最低级别（如 logging.WARNING），None表示都不输出
+
+        Returns:
+            被省略（未输出）的日志条数
+        """
+        if name not in Logger._buffers:
+            return 0
+        buffer_handler, handlers = Logger._buffers.pop(name)
+        logger = Logger.get_logger(name)
+        logger.removeHandler(buffer_handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+
+        if flush:
+            dropped = buffer_handler.total - len(buffer_handler.buffer)
+            if dropped:
+                logger.warning(f"日志缓冲区已满，最早的 {dropped} 条日志已丢弃")
+            records = list(buffer_handler.buffer)
+        elif min_level is not None:
+            records = [record for record in buffer_handler.buffer if record.levelno >= min_level]
+        else:
+            records = []
+        for record in records:
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        return buffer_handler.total - len(records)
 
-# 全局日志实例
-logger = Logger.get_logger()
 
+# 全局日志实例（延迟初始化，首次记录日志时才创建目录和handler）
+logger = LazyProxy(Logger.get_logger)
@@ -0,0 +1,189 @@
+"""
+内存统计
+记录每个用例的内存峰值、保留内存和进程RSS变化，以及每个响应的响应体大小和解析后对象大小，
+超出内存预算的用例在报告中标记
+"""
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from core.utils.config_loader import config
+from core.utils.lazy_proxy import LazyProxy
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    计算对象及其引用的容器、字符串的总大小（字节，同一对象只计算一次）
+
+    Args:
+        obj: 通常是解析后的JSON（dict/list/str/数字）
+
+    Returns:
+        总字节数
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return total
+
+
+def current_rss() -> Optional[int]:
+    """当前进程的常驻内存（字节），不支持的平台返回None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class MemoryTracker:
+    """
+    内存统计类
+
+    用例级别的数据由 conftest.py 的 fixture 调用 begin_test/end_test 采集（基于 tracemalloc），
+    响应级别的数据由 HttpClient（响应体大小）和 BaseAPI（解析后对象大小）上报
+    """
+
+    def __init__(self):
+        """初始化内存统计"""
+        self.enabled = config.get('memory.enabled', False)
+        self.budget_bytes = int(config.get('memory.test_budget_mb', 0) * 1024 * 1024)
+        self.measure_decoded = config.get('memory.measure_decoded', True)
+        # {用例 nodeid: 统计}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[Dict[str, Any]] = None
+        self._traced_before = 0
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+
+    # ===== 用例 =====
+
+    def begin_test(self, nodeid: str):
+        """
+        用例开始：重置 tracemalloc 峰值并记录起点
+
+        Args:
+            nodeid: 用例 nodeid
+        """
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.get('memory.tracemalloc_frames', 1))
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._traced_before = tracemalloc.get_traced_memory()[0]
+        self._current = {
+            "nodeid": nodeid, "rss_before": current_rss(),
+            "responses": 0, "body_bytes": 0, "max_body_bytes": 0,
+            "decoded_bytes": 0, "max_decoded_bytes": 0,
+        }
+
+    def end_test(self) -> Optional[Dict[str, Any]]:
+        """
+        用例结束：计算峰值增量、保留内存和RSS变化
+
+        Returns:
+            用例的内存统计，未启用时返回None
+        """
+        current = self._current
+        if not self.enabled or current is None:
+            return None
+        traced, peak = tracemalloc.get_traced_memory()
+        rss_before = current.pop("rss_before")
+        rss_after = current_rss()
+        current["peak_bytes"] = peak - self._traced_before
+        current["retained_bytes"] = traced - self._traced_before
+        current["rss_delta_bytes"] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        current["over_budget"] = bool(self.budget_bytes) and current["peak_bytes"] > self.budget_bytes
+        with self._lock:
+            self.results[current["nodeid"]] = current
+            self._current = None
+        return current
+
+    # ===== 响应 =====
+
+    def record_response(self, body_bytes: int):
+        """
+        记录一个响应的响应体大小（由 HttpClient 调用）
+
+        Args:
+            body_bytes: 响应体字节数
+        """
+        current = self._current
+        if current is None:
+            return
+        with self._lock:
+            current["responses"] += 1
+            current["body_bytes"] += body_bytes
+            current["max_body_bytes"] = max(current["max_body_bytes"], body_bytes)
+
+    def record_decoded(self, obj: Any) -> Optional[int]:
+        """
+        记录解析后对象的大小（由 BaseAPI 在解析JSON后调用）
+
+        Args:
+            obj: 解析后的对象
+
+        Returns:
+            对象大小（字节），未在用例中或未开启 measure_decoded 时返回None
+        """
+        current = self._current
+        if current is None or not self.measure_decoded:
+            return None
+        size = deep_sizeof(obj)
+        with self._lock:
+            current["decoded_bytes"] += size
+            current["max_decoded_bytes"] = max(current["max_decoded_bytes"], size)
+        return size
+
+    # ===== 汇总 =====
+
+    def over_budget(self) -> List[Dict[str, Any]]:
+        """超出内存预算的用例（按峰值降序）"""
+        with self._lock:
+            items = [item for item in self.results.values() if item["over_budget"]]
+        return sorted(items, key=lambda item: item["peak_bytes"], reverse=True)
+
+    def write_summary(self, file_path: str):
+        """
+        把用例内存统计写入JSON文件
+
+        Args:
+            file_path: 文件路径
+        """
+        if not self.results:
+            return
+        file_dir = os.path.dirname(file_path)
+        if file_dir and not os.path.exists(file_dir):
+            os.makedirs(file_dir, exist_ok=True)
+        with self._lock:
+            summary = {
+                "budget_bytes": self.budget_bytes,
+                "over_budget": [item["nodeid"] for item in self.results.values() if item["over_budget"]],
+                "tests": sorted(self.results.values(), key=lambda item: item["peak_bytes"], reverse=True),
+            }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    def stop(self):
+        """停止由本类启动的 tracemalloc"""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+# 全局内存统计实例（延迟初始化）
+memory_tracker = LazyProxy(MemoryTracker)
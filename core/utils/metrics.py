@@ -0,0 +1,312 @@
+"""
+指标注册表
+收集请求计数、耗时直方图、错误数和缓存命中率，导出为 OpenMetrics 文本格式
+（可写入文件，或通过本地 HTTP 端点供 Prometheus 抓取）
+"""
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from core.utils.config_loader import config
+from core.utils.lazy_proxy import LazyProxy
+
+
+# 默认耗时直方图分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """格式化标签，如 {endpoint="/api",method="POST"}"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """格式化数值（整数不带小数点）"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """计数器指标"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        初始化计数器
+
+        Args:
+            name: 指标名称（不含 _total 后缀）
+            documentation: 指标说明
+            labelnames: 标签名列表
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        """
+        增加计数
+
+        Args:
+            *labelvalues: 标签值（与 labelnames 顺序一致）
+            amount: 增加量
+        """
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        """获取指定标签的当前值"""
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        """输出 OpenMetrics 文本行"""
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.documentation}"]
+        with self._lock:
+            for labelvalues, value in self._values.items():
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_total{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """直方图指标"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        初始化直方图
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名列表
+            buckets: 分桶上界（升序）
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # {标签值: [各分桶计数..., 总和, 总数]}
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        """
+        记录一个观测值
+
+        Args:
+            value: 观测值
+            *labelvalues: 标签值（与 labelnames 顺序一致）
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        """输出 OpenMetrics 文本行（分桶计数为累计值）"""
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.documentation}"]
+        with self._lock:
+            for labelvalues, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, labelvalues, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, labelvalues, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(state[-1])}")
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标注册表类
+
+    内置HTTP请求相关指标，由 HttpClient 在每次请求后调用 observe_request 更新；
+    其他模块的统计（如测试数据缓存命中率）通过 add_collector 注册，导出时才计算
+    """
+
+    def __init__(self):
+        """初始化指标注册表"""
+        self.enabled = config.get('metrics.enabled', False)
+        self._metrics = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        request_labels = ("endpoint", "method", "status", "account")
+        self.requests = self.counter(
+            "autoapi_http_requests", "HTTP请求总数", request_labels)
+        self.request_duration = self.histogram(
+            "autoapi_http_request_duration_seconds", "HTTP请求耗时（秒）", request_labels,
+            buckets=config.get('metrics.buckets', DEFAULT_BUCKETS))
+        self.errors = self.counter(
+            "autoapi_http_errors", "请求异常次数（连接失败、超时等）", ("endpoint", "method", "error"))
+        self.connections_reused = self.counter(
+            "autoapi_http_connections_reused", "复用连接池中已有连接的请求数", ("endpoint", "method"))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """创建并注册计数器"""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """创建并注册直方图"""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        """
+        注册导出时调用的收集函数
+
+        Args:
+            collector: 返回 OpenMetrics 文本行的函数
+        """
+        self._collectors.append(collector)
+
+    def observe_request(self, method: str, endpoint: str, account: str, elapsed_ms: float,
+                        status: Optional[int] = None, error: Optional[str] = None,
+                        reused: Optional[bool] = None):
+        """
+        记录一次请求（未启用时直接返回）
+
+        Args:
+            method: HTTP方法
+            endpoint: 端点模板
+            account: 账号名称
+            elapsed_ms: 请求耗时（毫秒）
+            status: HTTP状态码，请求异常时为None
+            error: 请求异常类型名称
+            reused: 是否复用了已有连接（启用耗时分解时提供）
+        """
+        if not self.enabled:
+            return
+        method = method.upper()
+        if error is not None:
+            self.errors.inc(endpoint, method, error)
+            return
+        labels = (endpoint, method, str(status), account)
+        self.requests.inc(*labels)
+        self.request_duration.observe(elapsed_ms / 1000, *labels)
+        if reused:
+            self.connections_reused.inc(endpoint, method)
+
+    def render(self) -> str:
+        """
+        输出 OpenMetrics 文本
+
+        Returns:
+            以 # EOF 结尾的指标文本
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str):
+        """
+        把指标写入文件
+
+        Args:
+            file_path: 文件路径
+        """
+        file_dir = os.path.dirname(file_path)
+        if file_dir and not os.path.exists(file_dir):
+            os.makedirs(file_dir, exist_ok=True)
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, file_path)
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1") -> int:
+        """
+        在后台线程启动本地指标端点（GET /metrics）
+
+        Args:
+            port: 端口，0表示自动分配
+            host: 监听地址
+
+        Returns:
+            实际监听的端口
+        """
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        return self._server.server_address[1]
+
+    def stop_http_server(self):
+        """停止本地指标端点"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _test_data_cache_collector() -> List[str]:
+    """测试数据（YamlLoader）缓存命中统计"""
+    from core.utils.yaml_loader import YamlLoader
+    stats = YamlLoader.get_cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    ratio = stats["hits"] / lookups if lookups else 0.0
+    return [
+        "# TYPE autoapi_test_data_cache_lookups counter",
+        "# HELP autoapi_test_data_cache_lookups 测试数据缓存查找次数",
+        f'autoapi_test_data_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+        f'autoapi_test_data_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        f'autoapi_test_data_cache_lookups_total{{result="compiled_hit"}} {stats["compiled_hits"]}',
+        "# TYPE autoapi_test_data_cache_hit_ratio gauge",
+        "# HELP autoapi_test_data_cache_hit_ratio 测试数据进程级缓存命中率",
+        f"autoapi_test_data_cache_hit_ratio {ratio:.4f}",
+    ]
+
+
+def _create_registry() -> MetricsRegistry:
+    """创建全局指标注册表并注册内置收集函数"""
+    registry = MetricsRegistry()
+    registry.add_collector(_test_data_cache_collector)
+    return registry
+
+
+# 全局指标注册表实例（延迟初始化）
+metrics = LazyProxy(_create_registry)
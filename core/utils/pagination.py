@@ -0,0 +1,249 @@
+"""
+分页一致性检查
+遍历列表接口的所有分页，检查跨页重复、缺失（短页）以及各页数量之和与 totalCount 是否一致，
+并指出出问题的页码
+
+每行只保存订单号的 64 位哈希（集合），数据量很大时可改用布隆过滤器（固定内存，存在极低的误报率）
+"""
+import hashlib
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from core.utils.config_loader import config
+
+
+def _digest(value: Any) -> bytes:
+    """订单号的 128 位摘要"""
+    return hashlib.blake2b(str(value).encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    布隆过滤器（位数组 + 双重哈希）
+
+    内存只与容量和误报率有关：100 万个元素、误报率 0.1% 约 1.7 MB
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预计元素个数
+            error_rate: 目标误报率
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, digest: bytes) -> bool:
+        """
+        添加元素
+
+        Args:
+            digest: 元素的 128 位摘要
+
+        Returns:
+            元素是否（可能）已经存在
+        """
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self._bits
+        present = True
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % self.size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                present = False
+                bits[position >> 3] |= mask
+        return present
+
+
+class PaginationChecker:
+    """
+    分页一致性检查类
+
+    逐页调用 feed()，或通过 walk() 自动翻页，最后用 result() 获取检查结果
+
+    Example:
+        >>> checker = PaginationChecker()
+        >>> checker.walk(lambda page_num, page_size: api.get_order_list_page(page_num, page_size), 100)
+        >>> checker.result()["ok"]
+        True
+    """
+
+    def __init__(
+        self,
+        id_field: str = "orderId",
+        data_key: str = "listData",
+        use_bloom: Optional[bool] = None,
+        bloom_capacity: Optional[int] = None,
+        bloom_error_rate: Optional[float] = None
+    ):
+        """
+        初始化检查
+
+        Args:
+            id_field: 行的唯一标识字段
+            data_key: data 中列表的键名
+            use_bloom: 是否使用布隆过滤器去重，默认 pagination.use_bloom
+            bloom_capacity: 布隆过滤器容量，默认第一页的 totalCount（至少 pagination.bloom_min_capacity）
+            bloom_error_rate: 布隆过滤器误报率，默认 pagination.bloom_error_rate
+        """
+        self.id_field = id_field
+        self.data_key = data_key
+        self.use_bloom = config.get('pagination.use_bloom', False) if use_bloom is None else use_bloom
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate or config.get('pagination.bloom_error_rate', 0.001)
+        self._seen_hashes = set()
+        self._bloom: Optional[BloomFilter] = None
+        self.pages = 0
+        self.rows = 0
+        self.total_count: Optional[int] = None
+        self.duplicates = 0
+        # 出问题的页码
+        self.duplicate_pages: List[int] = []
+        self.short_pages: List[int] = []
+        self.total_count_changes: List[int] = []
+        self.missing_id_pages: List[int] = []
+        # 上一页未满时记录页码，若之后仍有数据说明中间有缺失
+        self._pending_short: Optional[int] = None
+
+    def _seen(self, value: Any) -> bool:
+        """记录标识并返回是否已出现过"""
+        digest = _digest(value)
+        if self.use_bloom:
+            if self._bloom is None:
+                capacity = self.bloom_capacity or max(self.total_count or 0,
+                                                      config.get('pagination.bloom_min_capacity', 100000))
+                self._bloom = BloomFilter(capacity, self.bloom_error_rate)
+            return self._bloom.add(digest)
+        key = int.from_bytes(digest[:8], "little")
+        if key in self._seen_hashes:
+            return True
+        self._seen_hashes.add(key)
+        return False
+
+    def feed(self, page_num: int, rows: List[Dict[str, Any]], page_size: int,
+             total_count: Optional[int] = None):
+        """
+        检查一页数据
+
+        Args:
+            page_num: 页码
+            rows: 该页的行
+            page_size: 请求的每页大小
+            total_count: 该页返回的 totalCount
+        """
+        self.pages += 1
+        if total_count is not None:
+            if self.total_count is None:
+                self.total_count = total_count
+            elif total_count != self.total_count:
+                self.total_count_changes.append(page_num)
+                self.total_count = total_count
+
+        if rows and self._pending_short is not None:
+            self.short_pages.append(self._pending_short)
+        self._pending_short = page_num if len(rows) < page_size else None
+
+        duplicated = False
+        missing_id = False
+        id_field = self.id_field
+        for row in rows:
+            value = row.get(id_field)
+            if value is None:
+                missing_id = True
+                continue
+            if self._seen(value):
+                self.duplicates += 1
+                duplicated = True
+        self.rows += len(rows)
+        if duplicated:
+            self.duplicate_pages.append(page_num)
+        if missing_id:
+            self.missing_id_pages.append(page_num)
+
+    def walk(self, fetch_page: Callable[[int, int], Dict[str, Any]], page_size: int,
+             max_pages: Optional[int] = None) -> "PaginationChecker":
+        """
+        自动翻页直到取完 totalCount 条或遇到空页
+
+        Args:
+            fetch_page: 获取一页的函数 (page_num, page_size) -> 响应数据字典
+            page_size: 每页大小
+            max_pages: 最多翻页数，默认 pagination.max_pages
+
+        Returns:
+            self
+        """
+        for page_num, rows, total_count in iter_pages(fetch_page, page_size, self.data_key, max_pages):
+            self.feed(page_num, rows, page_size, total_count)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """
+        检查结果
+
+        Returns:
+            字典，ok 为 True 表示没有重复、缺失，且各页数量之和等于 totalCount
+        """
+        count_mismatch = self.total_count is not None and self.rows != self.total_count
+        return {
+            "ok": not (count_mismatch or self.duplicates or self.short_pages
+                       or self.total_count_changes or self.missing_id_pages),
+            "pages": self.pages,
+            "rows": self.rows,
+            "unique_rows": self.rows - self.duplicates,
+            "total_count": self.total_count,
+            "count_mismatch": count_mismatch,
+            "duplicates": self.duplicates,
+            "duplicate_pages": self.duplicate_pages,
+            "short_pages": self.short_pages,
+            "total_count_changes": self.total_count_changes,
+            "missing_id_pages": self.missing_id_pages,
+            "dedup": "bloom" if self.use_bloom else "hash_set",
+        }
+
+    def describe(self) -> str:
+        """文本形式的检查结果（用于断言消息）"""
+        result = self.result()
+        parts = [f"{result['pages']} 页共 {result['rows']} 行，totalCount {result['total_count']}"]
+        if result["count_mismatch"]:
+            parts.append(f"各页数量之和与 totalCount 相差 {result['rows'] - (result['total_count'] or 0)}")
+        if result["duplicates"]:
+            parts.append(f"重复 {result['duplicates']} 行（页码 {result['duplicate_pages']}）")
+        if result["short_pages"]:
+            parts.append(f"中间页未满、可能缺失数据（页码 {result['short_pages']}）")
+        if result["total_count_changes"]:
+            parts.append(f"翻页期间 totalCount 变化（页码 {result['total_count_changes']}）")
+        if result["missing_id_pages"]:
+            parts.append(f"缺少 {self.id_field}（页码 {result['missing_id_pages']}）")
+        return "；".join(parts)
+
+
+def iter_pages(fetch_page: Callable[[int, int], Dict[str, Any]], page_size: int,
+               data_key: str = "listData", max_pages: Optional[int] = None
+               ) -> Iterator[Tuple[int, List[Dict[str, Any]], Optional[int]]]:
+    """
+    逐页获取列表数据（不在内存中保留已处理的页）
+
+    Args:
+        fetch_page: 获取一页的函数 (page_num, page_size) -> 响应数据字典
+        page_size: 每页大小
+        data_key: data 中列表的键名
+        max_pages: 最多翻页数，默认 pagination.max_pages
+
+    Yields:
+        (页码, 该页的行, totalCount)
+    """
+    max_pages = max_pages or config.get('pagination.max_pages', 1000)
+    fetched = 0
+    for page_num in range(1, max_pages + 1):
+        data = fetch_page(page_num, page_size).get("data") or {}
+        rows = data.get(data_key) or []
+        total_count = data.get("totalCount")
+        yield page_num, rows, total_count
+        fetched += len(rows)
+        if not rows or (total_count is not None and fetched >= total_count):
+            break
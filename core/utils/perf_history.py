@@ -0,0 +1,255 @@
+"""
+性能历史
+把每次 run.py 执行的端点耗时和用例耗时保存到本地 SQLite，按 git 提交和运行环境区分；
+与同一环境最近若干次运行组成的滚动基线做 Mann-Whitney U 检验，输出回归报告
+"""
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from core.utils.config_loader import config
+from core.utils.stats import mann_whitney_u, percentile, summarize
+
+
+# 样本类型
+KIND_ENDPOINT = "endpoint"
+KIND_TEST = "test"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    commit_sha TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    exit_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_environment ON runs (environment, id);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50 REAL NOT NULL,
+    p95 REAL NOT NULL,
+    max REAL NOT NULL,
+    samples BLOB NOT NULL,
+    PRIMARY KEY (run_id, kind, name)
+);
+"""
+
+
+def current_commit() -> str:
+    """当前 git 提交号（非 git 环境时返回 unknown）"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5)
+        return result.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def current_environment() -> str:
+    """
+    运行环境标识：优先使用 perf_history.environment 配置，
+    否则由被测地址、操作系统和 Python 版本组成（不同环境的数据互不作为基线）
+    """
+    environment = config.get('perf_history.environment', '')
+    if environment:
+        return environment
+    base_url = config.get('base.base_url', '')
+    return f"{base_url}|{platform.system()}|py{platform.python_version()}"
+
+
+class PerfHistory:
+    """
+    性能历史类
+
+    Example:
+        >>> history = PerfHistory("reports/perf_history.sqlite")
+        >>> run_id = history.record_run(endpoint_samples, test_durations)
+        >>> results = history.compare(run_id)
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化性能历史
+
+        Args:
+            db_path: SQLite 文件路径，默认 perf_history.db_path
+        """
+        self.db_path = db_path or config.get('perf_history.db_path', 'reports/perf_history.sqlite')
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.executescript(_SCHEMA)
+
+    def record_run(self, endpoint_samples: Dict[str, Sequence[float]], test_durations: Dict[str, float],
+                   commit: Optional[str] = None, environment: Optional[str] = None,
+                   exit_code: Optional[int] = None) -> int:
+        """
+        保存一次运行的结果
+
+        Args:
+            endpoint_samples: {端点: [请求耗时（毫秒）...]}
+            test_durations: {用例 nodeid: 耗时（毫秒）}
+            commit: git 提交号，默认当前提交
+            environment: 环境标识，默认 current_environment()
+            exit_code: 本次运行的退出码
+
+        Returns:
+            运行ID
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (commit_sha, environment, created_at, exit_code) VALUES (?, ?, ?, ?)",
+                (commit or current_commit(), environment or current_environment(),
+                 datetime.now().isoformat(timespec="seconds"), exit_code)
+            )
+            run_id = cursor.lastrowid
+            rows = []
+            for kind, groups in ((KIND_ENDPOINT, endpoint_samples),
+                                 (KIND_TEST, {name: [value] for name, value in test_durations.items()})):
+                for name, values in groups.items():
+                    if not values:
+                        continue
+                    stats = summarize(values)
+                    rows.append((run_id, kind, name, stats["count"], stats["p50"], stats["p95"], stats["max"],
+                                 array('d', values).tobytes()))
+            self._conn.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run_id
+
+    def _run_environment(self, run_id: int) -> str:
+        """运行的环境标识"""
+        row = self._conn.execute("SELECT environment FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"运行不存在: {run_id}")
+        return row[0]
+
+    def _samples(self, run_ids: Sequence[int], kind: str) -> Dict[str, List[float]]:
+        """读取若干次运行的样本，按名称合并"""
+        result: Dict[str, List[float]] = {}
+        if not run_ids:
+            return result
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self._conn.execute(
+            f"SELECT name, samples FROM samples WHERE kind = ? AND run_id IN ({placeholders})",
+            (kind, *run_ids)
+        )
+        for name, blob in rows:
+            values = array('d')
+            values.frombytes(blob)
+            result.setdefault(name, []).extend(values)
+        return result
+
+    def baseline_runs(self, run_id: int, runs: Optional[int] = None) -> List[int]:
+        """
+        滚动基线：同一环境中该运行之前的最近若干次运行
+
+        Args:
+            run_id: 当前运行ID
+            runs: 基线运行次数，默认 perf_history.baseline_runs
+
+        Returns:
+            基线运行ID列表（新到旧）
+        """
+        runs = runs or config.get('perf_history.baseline_runs', 10)
+        rows = self._conn.execute(
+            "SELECT id FROM runs WHERE environment = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (self._run_environment(run_id), run_id, runs)
+        )
+        return [row[0] for row in rows]
+
+    def compare(self, run_id: int, runs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        与滚动基线比较，找出变慢的端点和用例
+
+        判定为回归需要同时满足：单侧 Mann-Whitney U 检验 p 值小于 perf_history.alpha，
+        且 p95 比基线 p95 增长超过 perf_history.p95_threshold；基线运行次数不足
+        perf_history.min_baseline_runs 时不判定
+
+        Args:
+            run_id: 当前运行ID
+            runs: 基线运行次数
+
+        Returns:
+            比较结果列表，每项包含 kind, name, p95, baseline_p95, ratio, p_value, regression
+        """
+        alpha = config.get('perf_history.alpha', 0.05)
+        threshold = config.get('perf_history.p95_threshold', 0.2)
+        min_runs = config.get('perf_history.min_baseline_runs', 3)
+        baseline_ids = self.baseline_runs(run_id, runs)
+
+        results = []
+        for kind in (KIND_ENDPOINT, KIND_TEST):
+            current = self._samples([run_id], kind)
+            baseline = self._samples(baseline_ids, kind)
+            for name, values in sorted(current.items()):
+                base_values = baseline.get(name, [])
+                p95 = percentile(sorted(values), 95)
+                base_p95 = percentile(sorted(base_values), 95)
+                _, p_value = mann_whitney_u(values, base_values)
+                ratio = p95 / base_p95 if base_p95 else None
+                regression = (len(baseline_ids) >= min_runs and ratio is not None
+                              and p_value < alpha and ratio > 1 + threshold)
+                results.append({
+                    "kind": kind, "name": name, "count": len(values),
+                    "p95": round(p95, 3), "baseline_p95": round(base_p95, 3),
+                    "baseline_count": len(base_values),
+                    "ratio": round(ratio, 3) if ratio is not None else None,
+                    "p_value": round(p_value, 6), "regression": regression,
+                })
+        return results
+
+    def test_durations(self, runs: Optional[int] = None, environment: Optional[str] = None) -> Dict[str, float]:
+        """
+        最近若干次运行中每个用例耗时的中位数（供分片调度使用）
+
+        Args:
+            runs: 最近的运行次数，默认 sharding.history_runs
+            environment: 只使用该环境的运行，为None时不限环境
+
+        Returns:
+            {用例 nodeid: 耗时中位数（毫秒）}
+        """
+        runs = runs or config.get('sharding.history_runs', 20)
+        if environment is None:
+            rows = self._conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (runs,))
+        else:
+            rows = self._conn.execute(
+                "SELECT id FROM runs WHERE environment = ? ORDER BY id DESC LIMIT ?", (environment, runs))
+        return {name: percentile(sorted(values), 50)
+                for name, values in self._samples([row[0] for row in rows], KIND_TEST).items()}
+
+    def write_report(self, run_id: int, results: List[Dict[str, Any]], file_path: str):
+        """
+        把比较结果写入JSON报告
+
+        Args:
+            run_id: 当前运行ID
+            results: compare() 的返回值
+            file_path: 报告路径
+        """
+        commit, environment = self._conn.execute(
+            "SELECT commit_sha, environment FROM runs WHERE id = ?", (run_id,)).fetchone()
+        report = {
+            "run_id": run_id,
+            "commit": commit,
+            "environment": environment,
+            "baseline_runs": self.baseline_runs(run_id),
+            "regressions": [item for item in results if item["regression"]],
+            "results": results,
+        }
+        file_dir = os.path.dirname(file_path)
+        if file_dir and not os.path.exists(file_dir):
+            os.makedirs(file_dir, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
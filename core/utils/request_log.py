@@ -0,0 +1,144 @@
+"""
+结构化请求日志
+每次请求/响应写一条紧凑的 JSON Lines 记录，便于跨多次运行分析接口耗时
+"""
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from core.utils.config_loader import config
+from core.utils.lazy_proxy import LazyProxy
+
+
+class RequestLog:
+    """
+    结构化请求日志类
+
+    每条记录包含：时间戳、请求方法、端点模板、状态码、耗时、请求/响应字节数、
+    账号、测试用例ID，以及按采样率记录的（截断后的）请求体和响应体
+    """
+
+    def __init__(self):
+        """初始化结构化请求日志（文件在首次写入时才打开）"""
+        self.enabled = config.get('request_log.enabled', False)
+        self.text_log = config.get('request_log.text_log', True)
+        self.file_path = config.get('request_log.file_path', 'logs/requests.jsonl')
+        self.body_sample_rate = float(config.get('request_log.body_sample_rate', 0.0))
+        self.max_body_chars = int(config.get('request_log.max_body_chars', 2048))
+        self.include_headers = config.get('request_log.include_headers', False)
+        self._redact_headers = {
+            name.lower() for name in config.get('request_log.redact_headers', ['Cookie', 'Authorization'])
+        }
+        self._file = None
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def redact_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """
+        脱敏请求头
+
+        Args:
+            headers: 原始请求头
+
+        Returns:
+            敏感字段（如 Cookie、Authorization）替换为 *** 的请求头副本
+        """
+        return {
+            key: ('***' if key.lower() in self._redact_headers else value)
+            for key, value in headers.items()
+        }
+
+    def truncate(self, value: Any) -> str:
+        """
+        把请求体/响应体转换为字符串并按配置截断
+
+        Args:
+            value: 字符串、字典、列表等
+
+        Returns:
+            截断后的字符串
+        """
+        if isinstance(value, bytes):
+            value = value.decode('utf-8', errors='replace')
+        elif not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        if len(value) > self.max_body_chars:
+            return f"{value[:self.max_body_chars]}...(共 {len(value)} 字符)"
+        return value
+
+    def record(self, method: str, endpoint: str, elapsed_ms: float,
+               account: Optional[str] = None,
+               request_headers: Optional[Dict[str, str]] = None,
+               request_body: Any = None,
+               response=None,
+               error: Optional[str] = None):
+        """
+        写入一条请求记录（未启用时直接返回）
+
+        Args:
+            method: HTTP方法
+            endpoint: 端点模板（调用方传入的路径，不含域名和查询参数）
+            elapsed_ms: 请求耗时（毫秒）
+            account: 当前账号名称
+            request_headers: 请求头
+            request_body: 请求体（json 或 data）
+            response: requests.Response对象，请求失败时为None
+            error: 请求失败时的错误信息
+        """
+        if not self.enabled:
+            return
+
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": method.upper(),
+            "endpoint": endpoint,
+            "status": response.status_code if response is not None else None,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "req_bytes": None,
+            "resp_bytes": None,
+            "account": account,
+            "test": os.environ.get('PYTEST_CURRENT_TEST', '').rsplit(' ', 1)[0] or None,
+        }
+        if response is not None:
+            body = response.request.body if response.request is not None else None
+            entry["req_bytes"] = len(body) if body is not None else 0
+            # 流式响应尚未读取内容时不强制读取
+            if getattr(response, '_content_consumed', True):
+                entry["resp_bytes"] = len(response.content)
+        if error is not None:
+            entry["error"] = error
+        if self.include_headers and request_headers:
+            entry["req_headers"] = self.redact_headers(request_headers)
+        if self.body_sample_rate > 0 and self._random.random() < self.body_sample_rate:
+            if request_body is not None:
+                entry["req_body"] = self.truncate(request_body)
+            if entry["resp_bytes"] is not None:
+                entry["resp_body"] = self.truncate(response.text)
+
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                log_dir = os.path.dirname(self.file_path)
+                if log_dir and not os.path.exists(log_dir):
+                    os.makedirs(log_dir, exist_ok=True)
+                self._file = open(self.file_path, 'a', encoding='utf-8')
+            self._file.write(line + "\n")
+
+    def flush(self):
+        """把缓冲中的记录写入磁盘"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# 全局结构化请求日志实例（延迟初始化）
+request_log = LazyProxy(RequestLog)
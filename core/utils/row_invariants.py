@@ -0,0 +1,170 @@
+"""
+列表行不变量检查
+一次遍历检查每一行是否满足查询条件（日期范围、订单状态、排序），
+只累计违规数量并保留前 N 个示例，支持完整列表和逐页（流式）检查
+
+行字段名因接口而异，由调用方传入（如 ReportAPI.MOCK_ORDER_ROW_FIELDS）；
+需要检查的字段在行中缺失时记为 missing_field 违规，不参与范围/状态/排序比较
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from core.utils.config_loader import config
+
+
+# 规则名称
+RULE_DATE = "date_range"
+RULE_STATUS = "status"
+RULE_SORT = "sort"
+RULE_MISSING = "missing_field"
+
+
+class RowInvariants:
+    """
+    列表行不变量检查类
+
+    逐页调用 check() 时行号和排序状态跨页延续，最后通过 summary() 获取汇总
+
+    Example:
+        >>> invariants = RowInvariants.from_params({"startDate": "2025-01-01", "orderStatus": [1, 2]})
+        >>> invariants.check(response_data["data"]["listData"])
+        >>> invariants.summary()
+        {'rows': 50, 'violations': 0, 'by_rule': {}, 'examples': []}
+    """
+
+    def __init__(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        order_status: Optional[Iterable[Any]] = None,
+        sort_field: Optional[str] = None,
+        sort_order: str = "desc",
+        date_field: str = "createTime",
+        status_field: str = "orderStatus",
+        id_field: str = "orderId",
+        max_examples: Optional[int] = None
+    ):
+        """
+        初始化检查条件
+
+        Args:
+            start_date: 开始日期（YYYY-MM-DD，包含）
+            end_date: 结束日期（YYYY-MM-DD，包含）
+            order_status: 允许的订单状态
+            sort_field: 排序字段，为None时不检查排序
+            sort_order: 排序方向 asc/desc
+            date_field: 日期字段（取前10位与日期比较）
+            status_field: 状态字段
+            id_field: 示例中用于定位行的字段
+            max_examples: 保留的违规示例数，默认 assertion.max_examples
+        """
+        self.start_date = start_date or None
+        self.end_date = end_date or None
+        self.order_status = frozenset(int(status) for status in order_status) if order_status else None
+        self.sort_field = sort_field
+        self.descending = str(sort_order).lower() == "desc"
+        self.date_field = date_field
+        self.status_field = status_field
+        self.id_field = id_field
+        self.max_examples = max_examples if max_examples is not None else config.get('assertion.max_examples', 5)
+        self.rows = 0
+        self.violations = 0
+        self.by_rule: Dict[str, int] = {}
+        self.examples: List[str] = []
+        self._last_sort_value: Any = None
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any], **kwargs) -> "RowInvariants":
+        """
+        根据列表接口的请求参数创建检查条件
+
+        Args:
+            params: 请求参数，包含 startDate, endDate, orderStatus, sortRule（均可选）
+            **kwargs: 其他构造参数
+
+        Returns:
+            RowInvariants 实例
+        """
+        sort_rule = params.get("sortRule") or {}
+        return cls(
+            start_date=params.get("startDate"),
+            end_date=params.get("endDate"),
+            order_status=params.get("orderStatus"),
+            sort_field=sort_rule.get("field") or None,
+            sort_order=sort_rule.get("order") or "desc",
+            **kwargs
+        )
+
+    def _violate(self, rule: str, index: int, row: Dict[str, Any], detail: str):
+        """记录一次违规"""
+        self.violations += 1
+        self.by_rule[rule] = self.by_rule.get(rule, 0) + 1
+        if len(self.examples) < self.max_examples:
+            self.examples.append(f"第 {index} 行（{self.id_field}={row.get(self.id_field)}）{rule}: {detail}")
+
+    def check(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        检查一批行（一页或完整列表）
+
+        Args:
+            rows: 行列表
+
+        Returns:
+            本批新增的违规数
+        """
+        before = self.violations
+        start, end = self.start_date, self.end_date
+        statuses = self.order_status
+        date_field, status_field, sort_field = self.date_field, self.status_field, self.sort_field
+        descending = self.descending
+        last = self._last_sort_value
+        index = self.rows
+
+        for row in rows:
+            if start is not None or end is not None:
+                value = row.get(date_field)
+                if value is None:
+                    self._violate(RULE_MISSING, index, row, f"缺少 {date_field}")
+                else:
+                    day = str(value)[:10]
+                    if (start is not None and day < start) or (end is not None and day > end):
+                        self._violate(RULE_DATE, index, row, f"{value} 不在 {start or ''}..{end or ''}")
+            if statuses is not None:
+                value = row.get(status_field)
+                if value is None:
+                    self._violate(RULE_MISSING, index, row, f"缺少 {status_field}")
+                elif value not in statuses:
+                    self._violate(RULE_STATUS, index, row, f"{value} 不在 {sorted(statuses)}")
+            if sort_field is not None:
+                value = row.get(sort_field)
+                if value is None:
+                    self._violate(RULE_MISSING, index, row, f"缺少 {sort_field}")
+                else:
+                    if last is not None and (value > last if descending else value < last):
+                        self._violate(RULE_SORT, index, row,
+                                      f"{sort_field} {value} 应{'<=' if descending else '>='} 上一行 {last}")
+                    last = value
+            index += 1
+
+        self._last_sort_value = last
+        self.rows = index
+        return self.violations - before
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        违规汇总
+
+        Returns:
+            {"rows": 检查行数, "violations": 违规数, "by_rule": {规则: 违规数}, "examples": 前 N 个示例}
+        """
+        return {
+            "rows": self.rows,
+            "violations": self.violations,
+            "by_rule": dict(self.by_rule),
+            "examples": list(self.examples),
+        }
+
+    def describe(self) -> str:
+        """单行/多行文本形式的汇总（用于断言消息）"""
+        if not self.violations:
+            return f"{self.rows} 行全部满足条件"
+        rules = ", ".join(f"{rule} {count}" for rule, count in self.by_rule.items())
+        return f"{self.rows} 行中 {self.violations} 处违规（{rules}），示例:\n  " + "\n  ".join(self.examples)
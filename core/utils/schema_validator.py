@@ -0,0 +1,312 @@
+"""
+响应结构校验
+把 JSON Schema（常用子集）编译为嵌套的校验函数并缓存，一次遍历收集所有违规项及其路径，
+支持分页数据逐页增量校验
+
+支持的关键字:
+    type（可为列表，如 [string, "null"]）、enum、const、
+    minimum、maximum、exclusiveMinimum、exclusiveMaximum、
+    minLength、maxLength、pattern、
+    properties、required、additionalProperties（false）、
+    items、minItems、maxItems、
+    definitions + $ref（"#/definitions/xxx"）
+"""
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.utils.yaml_loader import YamlLoader
+
+
+# 校验函数：(值, 路径, 违规列表) -> None
+Check = Callable[[Any, str, List[str]], None]
+
+_TYPE_NAMES = {
+    bool: "boolean", int: "integer", float: "number", str: "string",
+    list: "array", dict: "object", type(None): "null",
+}
+
+
+def _type_name(value: Any) -> str:
+    """JSON 类型名称"""
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _matches_type(value: Any, expected: str) -> bool:
+    """值是否符合 JSON 类型（bool 不算 integer/number）"""
+    value_type = type(value)
+    if expected == "integer":
+        return value_type is int
+    if expected == "number":
+        return value_type is int or value_type is float
+    return _TYPE_NAMES.get(value_type) == expected
+
+
+class _Compiler:
+    """把 schema 编译为校验函数（$ref 在编译时解析，同一定义只编译一次）"""
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self._refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Dict[str, Any]) -> Check:
+        """编译一个 schema 节点"""
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        checks: List[Check] = []
+        types = schema.get("type")
+        if isinstance(types, str):
+            types = [types]
+        if "enum" in schema:
+            checks.append(self._enum(schema["enum"]))
+        if "const" in schema:
+            expected = schema["const"]
+            checks.append(lambda value, path, errors: value == expected or errors.append(
+                f"{path}: 应为 {expected!r}，实际为 {value!r}"))
+        checks.extend(self._number_checks(schema))
+        checks.extend(self._string_checks(schema))
+        if "properties" in schema or "required" in schema or schema.get("additionalProperties") is False:
+            checks.append(self._object(schema))
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            checks.append(self._array(schema))
+
+        def check(value: Any, path: str, errors: List[str]):
+            if types is not None and not any(_matches_type(value, name) for name in types):
+                errors.append(f"{path}: 类型应为 {'/'.join(types)}，实际为 {_type_name(value)}")
+                return
+            for item_check in checks:
+                item_check(value, path, errors)
+
+        return check
+
+    def _compile_ref(self, ref: str) -> Check:
+        """编译 $ref（支持递归引用）"""
+        if ref in self._refs:
+            return self._refs[ref]
+        if not ref.startswith("#/"):
+            raise ValueError(f"只支持文档内引用: {ref}")
+        target: Any = self.root
+        for part in ref[2:].split("/"):
+            target = target[part]
+        compiled: List[Check] = []
+        self._refs[ref] = lambda value, path, errors: compiled[0](value, path, errors)
+        compiled.append(self.compile(target))
+        return self._refs[ref]
+
+    @staticmethod
+    def _enum(options: List[Any]) -> Check:
+        try:
+            allowed = frozenset(options)
+        except TypeError:
+            allowed = options
+
+        def check(value, path, errors):
+            try:
+                ok = value in allowed
+            except TypeError:
+                ok = False
+            # True == 1，需要区分 bool 和数字
+            if not ok or (type(value) is bool) != any(type(option) is bool and option == value for option in options):
+                errors.append(f"{path}: 取值应为 {options}，实际为 {value!r}")
+
+        return check
+
+    @staticmethod
+    def _number_checks(schema: Dict[str, Any]) -> List[Check]:
+        checks = []
+        bounds = (
+            ("minimum", lambda value, bound: value >= bound, ">="),
+            ("maximum", lambda value, bound: value <= bound, "<="),
+            ("exclusiveMinimum", lambda value, bound: value > bound, ">"),
+            ("exclusiveMaximum", lambda value, bound: value < bound, "<"),
+        )
+        for keyword, compare, symbol in bounds:
+            if keyword not in schema:
+                continue
+
+            def check(value, path, errors, bound=schema[keyword], compare=compare, symbol=symbol):
+                if type(value) in (int, float) and not compare(value, bound):
+                    errors.append(f"{path}: 应 {symbol} {bound}，实际为 {value}")
+
+            checks.append(check)
+        return checks
+
+    @staticmethod
+    def _string_checks(schema: Dict[str, Any]) -> List[Check]:
+        checks = []
+        min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+        if min_length is not None or max_length is not None:
+            def check_length(value, path, errors):
+                if type(value) is str:
+                    if min_length is not None and len(value) < min_length:
+                        errors.append(f"{path}: 长度应 >= {min_length}，实际为 {len(value)}")
+                    if max_length is not None and len(value) > max_length:
+                        errors.append(f"{path}: 长度应 <= {max_length}，实际为 {len(value)}")
+            checks.append(check_length)
+        if "pattern" in schema:
+            pattern = re.compile(schema["pattern"])
+
+            def check_pattern(value, path, errors):
+                if type(value) is str and pattern.search(value) is None:
+                    errors.append(f"{path}: 不匹配 {pattern.pattern}，实际为 {value!r}")
+            checks.append(check_pattern)
+        return checks
+
+    def _object(self, schema: Dict[str, Any]) -> Check:
+        properties = [(name, self.compile(sub)) for name, sub in schema.get("properties", {}).items()]
+        required = schema.get("required", [])
+        known = frozenset(schema.get("properties", {}))
+        closed = schema.get("additionalProperties") is False
+
+        def check(value, path, errors):
+            if type(value) is not dict:
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: 缺少必填字段 {name}")
+            for name, property_check in properties:
+                if name in value:
+                    property_check(value[name], f"{path}.{name}", errors)
+            if closed:
+                for name in value.keys() - known:
+                    errors.append(f"{path}: 不允许的字段 {name}")
+
+        return check
+
+    def _array(self, schema: Dict[str, Any]) -> Check:
+        item_check = self.compile(schema["items"]) if "items" in schema else None
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+
+        def check(value, path, errors):
+            if type(value) is not list:
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: 元素个数应 >= {min_items}，实际为 {len(value)}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: 元素个数应 <= {max_items}，实际为 {len(value)}")
+            if item_check is not None:
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]", errors)
+
+        return check
+
+
+class SchemaValidator:
+    """
+    编译后的结构校验器
+
+    Example:
+        >>> validator = SchemaValidator({"type": "object", "required": ["code"]})
+        >>> validator.validate({"data": None})
+        ['$: 缺少必填字段 code']
+    """
+
+    def __init__(self, schema: Dict[str, Any], name: str = ""):
+        """
+        编译 schema
+
+        Args:
+            schema: JSON Schema 字典
+            name: 名称（用于错误消息，通常是端点）
+        """
+        self.schema = schema
+        self.name = name
+        self._check = _Compiler(schema).compile(schema)
+
+    def validate(self, data: Any, path: str = "$") -> List[str]:
+        """
+        校验数据，返回所有违规项
+
+        Args:
+            data: 待校验的数据
+            path: 根路径（增量校验时用于区分页）
+
+        Returns:
+            违规项列表，格式为 "路径: 说明"，通过时为空列表
+        """
+        errors: List[str] = []
+        self._check(data, path, errors)
+        return errors
+
+    def is_valid(self, data: Any) -> bool:
+        """数据是否通过校验"""
+        return not self.validate(data)
+
+
+class IncrementalValidator:
+    """
+    增量校验：分页/流式数据逐页校验并累计违规项，不需要把所有页放在内存中
+
+    Example:
+        >>> incremental = IncrementalValidator(validator)
+        >>> for page_num, page in enumerate(pages, 1):
+        ...     incremental.feed(page, f"page[{page_num}]")
+        >>> incremental.errors
+    """
+
+    def __init__(self, validator: SchemaValidator):
+        """
+        初始化增量校验
+
+        Args:
+            validator: 结构校验器
+        """
+        self.validator = validator
+        self.errors: List[str] = []
+        self.pages = 0
+
+    def feed(self, data: Any, label: Optional[str] = None) -> List[str]:
+        """
+        校验一页数据
+
+        Args:
+            data: 一页数据
+            label: 该页的路径前缀，默认 page[序号]
+
+        Returns:
+            该页的违规项
+        """
+        self.pages += 1
+        errors = self.validator.validate(data, label or f"page[{self.pages}]")
+        self.errors.extend(errors)
+        return errors
+
+
+# 已编译的校验器缓存：{(文件路径, 名称): (schema 对象, 校验器)}
+_validators: Dict[Tuple[str, str], Tuple[Any, SchemaValidator]] = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(name: str, file_name: str) -> SchemaValidator:
+    """
+    获取 bizs/data 下 schema 文件中指定名称（通常是端点）的校验器
+
+    编译结果缓存；schema 文件修改后 YamlLoader 返回新对象，校验器随之重新编译
+
+    Args:
+        name: schema 名称，如 "/api/report/order/listPage"
+        file_name: bizs/data 下的 schema 文件，如 "schemas/report.yaml"
+
+    Returns:
+        结构校验器
+
+    Raises:
+        KeyError: schema 文件中不存在该名称
+    """
+    schemas = YamlLoader.load_test_data(file_name, shared=True)
+    if name not in schemas:
+        raise KeyError(f"schema 不存在: {name}（{os.path.join('bizs', 'data', file_name)}）")
+    schema = schemas[name]
+    key = (file_name, name)
+    cached = _validators.get(key)
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    # 文档内引用相对于整个文件解析，definitions 可在多个端点间共享
+    root = dict(schema)
+    if "definitions" in schemas and "definitions" not in root:
+        root["definitions"] = schemas["definitions"]
+    validator = SchemaValidator(root, name)
+    with _validators_lock:
+        _validators[key] = (schema, validator)
+    return validator
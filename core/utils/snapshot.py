@@ -0,0 +1,321 @@
+"""
+快照（golden）比对
+把响应规范化（去掉时间戳等易变字段、键排序后紧凑序列化）后先比较内容哈希，
+哈希一致直接通过；不一致时才读取快照并计算按路径定位的结构化差异
+
+快照目录结构（snapshot.dir）:
+    index.json          {快照名称: 内容哈希}，哈希比对只读取此文件
+    index.json.lock     写入时的跨进程文件锁（并行 worker 依次合并索引）
+    <快照名称>.<名称哈希>.json.gz    规范化后的 JSON（gzip 压缩）
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from core.utils.config_loader import config
+from core.utils.lazy_proxy import LazyProxy
+from core.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+INDEX_FILE = "index.json"
+LOCK_FILE = INDEX_FILE + ".lock"
+
+# 路径分段: data.listData[*].createTime -> ("data", "listData", "*", "createTime")
+_SEGMENT = re.compile(r"\[(\*|-?\d+)\]|([^.\[\]]+)")
+
+
+def _parse_pattern(pattern: str) -> Tuple[Any, ...]:
+    """把忽略路径解析为分段（"*" 匹配任意键或下标，数字匹配列表下标）"""
+    if pattern.startswith("$"):
+        pattern = pattern[1:]
+    segments = []
+    for index, key in _SEGMENT.findall(pattern):
+        if index:
+            segments.append("*" if index == "*" else int(index))
+        else:
+            segments.append(key)
+    return tuple(segments)
+
+
+def _prune(node: Any, patterns: List[Tuple[Any, ...]], ignore_keys: frozenset) -> Any:
+    """去掉忽略的字段；没有需要处理的子路径时直接复用原对象"""
+    if not patterns and not ignore_keys:
+        return node
+    if isinstance(node, dict):
+        result = {}
+        for key, value in node.items():
+            if key in ignore_keys:
+                continue
+            remaining = [pattern[1:] for pattern in patterns if pattern[0] == key or pattern[0] == "*"]
+            if any(not pattern for pattern in remaining):
+                continue
+            result[key] = _prune(value, remaining, ignore_keys)
+        return result
+    if isinstance(node, list):
+        result = []
+        for index, value in enumerate(node):
+            remaining = [pattern[1:] for pattern in patterns if pattern[0] == index or pattern[0] == "*"]
+            if any(not pattern for pattern in remaining):
+                continue
+            result.append(_prune(value, remaining, ignore_keys))
+        return result
+    return node
+
+
+def canonicalize(data: Any, ignore: Optional[Iterable[str]] = None,
+                 ignore_keys: Optional[Iterable[str]] = None) -> Any:
+    """
+    规范化数据：去掉忽略的路径和字段
+
+    Args:
+        data: 响应数据
+        ignore: 忽略的路径，如 ["data.listData[*].createTime"]
+        ignore_keys: 任意层级都忽略的字段名，如 ["timestamp", "traceId"]
+
+    Returns:
+        规范化后的数据（未改动的子树与原数据共享）
+    """
+    patterns = [_parse_pattern(pattern) for pattern in ignore or ()]
+    return _prune(data, [pattern for pattern in patterns if pattern], frozenset(ignore_keys or ()))
+
+
+def dumps(data: Any) -> bytes:
+    """紧凑、键排序的 JSON 序列化（相同内容得到相同字节）"""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(canonical_bytes: bytes) -> str:
+    """内容哈希"""
+    return hashlib.sha256(canonical_bytes).hexdigest()
+
+
+def structural_diff(expected: Any, actual: Any, path: str = "$", limit: int = 50) -> List[str]:
+    """
+    结构化差异：逐层比较，返回按路径定位的差异项
+
+    Args:
+        expected: 快照数据
+        actual: 实际数据
+        path: 根路径
+        limit: 最多返回的差异项数
+
+    Returns:
+        差异项列表，如 "$.data.listData[3].amount: 期望 12.5, 实际 13.0"
+    """
+    diffs: List[str] = []
+
+    def walk(left: Any, right: Any, current: str):
+        if len(diffs) >= limit:
+            return
+        if isinstance(left, dict) and isinstance(right, dict):
+            for key in left:
+                if key not in right:
+                    diffs.append(f"{current}.{key}: 缺少字段")
+                else:
+                    walk(left[key], right[key], f"{current}.{key}")
+            for key in right:
+                if key not in left:
+                    diffs.append(f"{current}.{key}: 多出字段")
+        elif isinstance(left, list) and isinstance(right, list):
+            if len(left) != len(right):
+                diffs.append(f"{current}: 元素个数 期望 {len(left)}, 实际 {len(right)}")
+            for index, (left_item, right_item) in enumerate(zip(left, right)):
+                walk(left_item, right_item, f"{current}[{index}]")
+        elif left != right or type(left) is not type(right):
+            diffs.append(f"{current}: 期望 {json.dumps(left, ensure_ascii=False)[:100]}, "
+                         f"实际 {json.dumps(right, ensure_ascii=False)[:100]}")
+
+    walk(expected, actual, path)
+    return diffs[:limit]
+
+
+def _file_name(name: str) -> str:
+    """
+    快照名称转文件名
+
+    路径分隔符等特殊字符替换为 _ 便于识别，并附加名称的哈希，
+    避免 "a/b" 和 "a_b" 这类替换后相同的名称写到同一个文件
+
+    Args:
+        name: 快照名称
+
+    Returns:
+        文件名，如 "report_history_order_list_第一页.7d3d083d.json.gz"
+    """
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^\w.\-]+", "_", name).strip("_") + f".{digest}.json.gz"
+
+
+@contextmanager
+def _file_lock(lock_path: str) -> Iterator[None]:
+    """
+    跨进程排他文件锁（阻塞等待），进程退出时由系统自动释放
+
+    Args:
+        lock_path: 锁文件路径
+    """
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK 重试约 10 秒后抛出 OSError，继续等待
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(file_path: str, content: bytes):
+    """先写临时文件再原子替换，进程中途退出时不会留下写了一半的文件"""
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class SnapshotStore:
+    """
+    快照存储类
+
+    比对模式下哈希一致直接通过，不读取快照文件；
+    更新模式（pytest --snapshot-update 或 snapshot.update）下只记录新快照，
+    在会话结束时由 flush() 批量写入
+    """
+
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        """
+        初始化快照存储
+
+        Args:
+            snapshot_dir: 快照目录，默认 snapshot.dir
+        """
+        self.snapshot_dir = snapshot_dir or config.get('snapshot.dir', 'bizs/data/snapshots')
+        self.update = config.get('snapshot.update', False)
+        self.ignore_keys = frozenset(config.get('snapshot.ignore_keys', []) or [])
+        self._index: Optional[Dict[str, str]] = None
+        # 待写入的快照: {名称: (哈希, 规范化字节)}
+        self._pending: Dict[str, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> Dict[str, str]:
+        """快照索引 {名称: 哈希}（首次访问时读取）"""
+        if self._index is None:
+            index_path = os.path.join(self.snapshot_dir, INDEX_FILE)
+            if os.path.exists(index_path):
+                with open(index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {}
+        return self._index
+
+    def load(self, name: str) -> Any:
+        """
+        读取快照
+
+        Args:
+            name: 快照名称
+
+        Returns:
+            快照数据
+        """
+        with gzip.open(os.path.join(self.snapshot_dir, _file_name(name)), "rb") as f:
+            return json.loads(f.read().decode("utf-8"))
+
+    def assert_match(self, name: str, data: Any, ignore: Optional[Iterable[str]] = None):
+        """
+        断言数据与快照一致
+
+        Args:
+            name: 快照名称，如 "report/history_order_list/指定时间筛选"
+            data: 响应数据
+            ignore: 本次比对额外忽略的路径，如 ["data.listData[*].createTime"]
+        """
+        canonical = canonicalize(data, ignore, self.ignore_keys)
+        canonical_bytes = dumps(canonical)
+        digest = content_hash(canonical_bytes)
+
+        if self.update:
+            with self._lock:
+                self._pending[name] = (digest, canonical_bytes)
+            logger.info(f"快照已记录（会话结束时写入）: {name}")
+            return
+
+        expected_digest = self.index.get(name)
+        assert expected_digest is not None, \
+            f"快照不存在: {name}（使用 pytest --snapshot-update 生成）"
+        if expected_digest == digest:
+            logger.info(f"✓ 快照断言通过: {name}")
+            return
+
+        expected = canonicalize(self.load(name), ignore, self.ignore_keys)
+        diffs = structural_diff(expected, canonical, limit=config.get('snapshot.max_diffs', 20))
+        if not diffs:
+            # 快照生成后新增了忽略路径，规范化后内容一致
+            logger.info(f"✓ 快照断言通过: {name}")
+            return
+        raise AssertionError(f"快照断言失败: {name}\n  " + "\n  ".join(diffs))
+
+    def flush(self) -> int:
+        """
+        批量写入更新模式下记录的快照（索引只写一次）
+
+        在跨进程文件锁内重新读取索引并合并，快照文件和索引均先写临时文件再原子替换
+
+        Returns:
+            实际写入的快照数量（内容未变化的快照不重写，不计入）
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        # 持有文件锁完成 读取索引-合并-写回，并行 worker 依次合并，不会覆盖彼此写入的条目
+        with _file_lock(os.path.join(self.snapshot_dir, LOCK_FILE)):
+            self._index = None
+            index = self.index
+            written = 0
+            for name, (digest, canonical_bytes) in pending.items():
+                if index.get(name) == digest:
+                    continue
+                # mtime=0 使内容相同的快照得到相同的压缩字节，避免无意义的文件变更
+                _write_atomic(os.path.join(self.snapshot_dir, _file_name(name)),
+                              gzip.compress(canonical_bytes, mtime=0))
+                index[name] = digest
+                written += 1
+            if not written:
+                logger.info(f"快照均未变化，无需写入: {self.snapshot_dir}")
+                return 0
+            _write_atomic(os.path.join(self.snapshot_dir, INDEX_FILE),
+                          json.dumps(index, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"))
+        logger.info(f"已写入 {written} 个快照（{len(pending) - written} 个未变化）: {self.snapshot_dir}")
+        return written
+
+
+# 全局快照存储实例（延迟初始化）
+snapshot_store = LazyProxy(SnapshotStore)
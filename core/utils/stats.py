@@ -0,0 +1,96 @@
+"""
+统计工具
+提供耗时数据的分位数、汇总计算和显著性检验
+"""
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    计算分位数（线性插值）
+
+    Args:
+        sorted_values: 已升序排列的数值列表
+        q: 分位点，0~100，如 95 表示 p95
+
+    Returns:
+        分位数值，列表为空时返回 0.0
+    """
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    rank = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return float(sorted_values[lower])
+    fraction = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """
+    汇总一组数值
+
+    Args:
+        values: 数值序列（如多次请求的耗时）
+
+    Returns:
+        包含 count、mean、p50、p95、p99、max 的字典
+    """
+    sorted_values = sorted(values)
+    count = len(sorted_values)
+    if count == 0:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": count,
+        "mean": round(sum(sorted_values) / count, 3),
+        "p50": round(percentile(sorted_values, 50), 3),
+        "p95": round(percentile(sorted_values, 95), 3),
+        "p99": round(percentile(sorted_values, 99), 3),
+        "max": round(sorted_values[-1], 3),
+    }
+
+
+def mann_whitney_u(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """
+    单侧 Mann-Whitney U 检验（正态近似，含并列值修正和连续性修正）
+
+    检验 current 是否整体大于 baseline（如本次耗时是否比基线更慢），不要求数据服从正态分布
+
+    Args:
+        current: 本次样本
+        baseline: 基线样本
+
+    Returns:
+        (current 的 U 统计量, 单侧 p 值)，任一样本为空时返回 (0.0, 1.0)
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    n = n1 + n2
+
+    # 计算秩（并列值取平均秩），同时累计并列修正项
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        i = j + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
@@ -2,67 +2,217 @@
 YAML文件加载器
 用于加载测试数据文件
 """
+import copy
+import hashlib
 import os
+import pickle
+import threading
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from core.utils.config_loader import config
+
+# 优先使用 libyaml 的 C 加速解析器，不可用时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+# 编译缓存文件格式版本（格式变化时递增，旧缓存自动失效）
+_COMPILED_VERSION = 1
 
 
 class YamlLoader:
     """YAML文件加载器类"""
-    
+
+    # 进程级解析缓存: {绝对路径: ((mtime_ns, size), 解析后的数据)}
+    _cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+    _cache_lock = threading.Lock()
+    # 缓存命中统计
+    _stats = {"hits": 0, "misses": 0, "compiled_hits": 0}
+
     @staticmethod
-    def load(file_path: str) -> Dict[str, Any]:
+    def _get_project_root() -> str:
+        """获取项目根目录"""
+        return os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+
+    @staticmethod
+    def load(file_path: str, compiled: Optional[bool] = None, shared: bool = False) -> Dict[str, Any]:
         """
         加载YAML文件
-        
+
+        同一文件在修改时间和大小不变时只解析一次，后续从缓存结果返回。
+        默认返回缓存数据的深拷贝，调用方可以随意修改；只读场景可传 shared=True 直接使用缓存对象（零拷贝）
+
         Args:
             file_path: YAML文件路径（相对路径或绝对路径）
-            
+            compiled: 是否使用磁盘上的编译缓存文件，None表示使用配置 test_data.compiled_cache
+            shared: 是否返回进程内共享的缓存对象（不拷贝，调用方不得原地修改）
+
         Returns:
             解析后的字典数据
         """
         # 如果是相对路径，从项目根目录开始
         if not os.path.isabs(file_path):
-            project_root = os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            )
-            file_path = os.path.join(project_root, file_path)
-        
-        if not os.path.exists(file_path):
+            file_path = os.path.join(YamlLoader._get_project_root(), file_path)
+
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"YAML文件不存在: {file_path}")
-        
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        use_cache = config.get('test_data.cache', True)
+        if use_cache:
+            cached = YamlLoader._cache.get(file_path)
+            if cached is not None and cached[0] == signature:
+                YamlLoader._stats["hits"] += 1
+                return cached[1] if shared else copy.deepcopy(cached[1])
+        YamlLoader._stats["misses"] += 1
+
+        if compiled is None:
+            compiled = config.get('test_data.compiled_cache', False)
+
+        data = None
+        loaded = False
+        if compiled:
+            loaded, data = YamlLoader._load_compiled(file_path, signature)
+        if not loaded:
+            data = YamlLoader._parse(file_path)
+            if compiled:
+                YamlLoader._save_compiled(file_path, signature, data)
+
+        if use_cache:
+            with YamlLoader._cache_lock:
+                YamlLoader._cache[file_path] = (signature, data)
+            if not shared:
+                return copy.deepcopy(data)
+        return data
+
+    @staticmethod
+    def _parse(file_path: str) -> Any:
+        """解析YAML文件"""
         with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    
+            return yaml.load(f, Loader=_SafeLoader)
+
     @staticmethod
-    def load_test_data(file_name: str) -> Dict[str, Any]:
+    def _get_compiled_path(file_path: str) -> str:
+        """
+        获取编译缓存文件路径
+
+        Args:
+            file_path: YAML文件绝对路径
+
+        Returns:
+            编译缓存文件路径（文件名包含源路径的哈希，避免同名文件冲突）
+        """
+        cache_dir = config.get('test_data.compiled_cache_dir', '.cache/test_data')
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(YamlLoader._get_project_root(), cache_dir)
+        digest = hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{digest}.pickle")
+
+    @staticmethod
+    def _load_compiled(file_path: str, signature: Tuple[int, int]) -> Tuple[bool, Any]:
+        """
+        从编译缓存文件加载数据
+
+        Args:
+            file_path: YAML文件绝对路径
+            signature: 源文件签名 (mtime_ns, size)
+
+        Returns:
+            (是否加载成功, 数据)，缓存不存在或已过期时返回 (False, None)
+        """
+        compiled_path = YamlLoader._get_compiled_path(file_path)
+        try:
+            with open(compiled_path, 'rb') as f:
+                # 先读取头部，源文件已变化时不再反序列化数据部分
+                header = pickle.load(f)
+                if header != (_COMPILED_VERSION, file_path, signature):
+                    return False, None
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            from core.utils.logger import logger
+            logger.warning(f"读取编译缓存失败，将重新解析YAML: {compiled_path}, {e}")
+            return False, None
+
+        YamlLoader._stats["compiled_hits"] += 1
+        return True, data
+
+    @staticmethod
+    def _save_compiled(file_path: str, signature: Tuple[int, int], data: Any):
+        """
+        保存编译缓存文件（先写临时文件再原子替换，避免并发读取到半个文件）
+
+        Args:
+            file_path: YAML文件绝对路径
+            signature: 源文件签名 (mtime_ns, size)
+            data: 解析后的数据
+        """
+        compiled_path = YamlLoader._get_compiled_path(file_path)
+        tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((_COMPILED_VERSION, file_path, signature), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, compiled_path)
+        except Exception as e:
+            from core.utils.logger import logger
+            logger.warning(f"保存编译缓存失败: {compiled_path}, {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def clear_cache():
+        """清空进程级解析缓存（不删除磁盘上的编译缓存文件）"""
+        with YamlLoader._cache_lock:
+            YamlLoader._cache.clear()
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, int]:
+        """
+        获取缓存命中统计
+
+        Returns:
+            包含 hits、misses、compiled_hits 的字典
+        """
+        return dict(YamlLoader._stats)
+
+    @staticmethod
+    def load_test_data(file_name: str, shared: bool = False) -> Dict[str, Any]:
         """
         加载测试数据文件
-        
+
         Args:
             file_name: 测试数据文件名（如 'login_cases.yaml'）
-            
+            shared: 是否返回进程内共享的缓存对象，见 load
+
         Returns:
-            测试数据字典
+            测试数据字典（默认为独立副本，shared=True 时为缓存共享对象，请勿原地修改）
         """
-        project_root = os.path.dirname(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        )
-        data_path = os.path.join(project_root, "bizs", "data", file_name)
-        return YamlLoader.load(data_path)
-    
+        data_path = os.path.join(YamlLoader._get_project_root(), "bizs", "data", file_name)
+        return YamlLoader.load(data_path, shared=shared)
+
     @staticmethod
     def get_case_data(file_name: str, case_name: str) -> Optional[Dict[str, Any]]:
         """
         获取指定用例的数据
-        
+
         Args:
             file_name: 测试数据文件名
             case_name: 用例名称
-            
+
         Returns:
-            用例数据字典，如果不存在返回None
+            用例数据字典（独立副本，可以修改），如果不存在返回None
         """
-        data = YamlLoader.load_test_data(file_name)
-        return data.get(case_name)
-
+        # 只拷贝需要的用例，不拷贝整个文件
+        data = YamlLoader.load_test_data(file_name, shared=True)
+        case_data = data.get(case_name)
+        return copy.deepcopy(case_data) if case_data is not None else None
@@ -1,15 +1,159 @@
 """
 测试运行入口
 """
+import argparse
 import sys
 import os
 import pytest
-from core.utils.logger import logger
+from core.utils.logger import logger, Logger
 from core.utils.config_loader import config
+from core.utils.request_log import request_log
+from core.utils.metrics import metrics
 
 
-def main():
+# 报告格式
+REPORT_FORMATS = ("html", "jsonl", "both")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    
+    Args:
+        argv: 命令行参数列表，None表示使用 sys.argv
+        
+    Returns:
+        解析结果
+    """
+    parser = argparse.ArgumentParser(description="接口自动化测试运行入口")
+    parser.add_argument(
+        "--profile", choices=["cpu", "mem"],
+        help="性能剖析模式：cpu（采样调用栈）或 mem（tracemalloc），结果写入 reports/"
+    )
+    parser.add_argument(
+        "--mock-server", action="store_true",
+        help="启动本地模拟报表服务并把 base_url 指向它（离线运行）"
+    )
+    parser.add_argument(
+        "--snapshot-update", action="store_true",
+        help="重新记录 golden 快照（会话结束时批量写入 snapshot.dir）"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=config.get('parallel.workers', 0),
+        help="并行 worker 进程数（每个 worker 独立的会话、Token 和日志文件，报告自动合并）"
+    )
+    parser.add_argument(
+        "--shard", metavar="i/N",
+        help="只执行第 i 个分片（共 N 个，用于多台 CI 节点；指定共用耗时文件时按耗时均衡分配，否则按哈希均分）"
+    )
+    parser.add_argument(
+        "--durations-file", metavar="PATH", default=config.get('sharding.durations_file', '') or None,
+        help="分片使用的共用用例耗时文件（所有节点必须相同，由各节点的 reports/durations_shard_*.json 合并得到）"
+    )
+    parser.add_argument(
+        "--report-format", choices=REPORT_FORMATS, default=config.get('test.report_format', 'html'),
+        help="报告格式：html（pytest-html 独立报告）、jsonl（流式结果 + HTML 摘要，适合大规模用例）或 both"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="增量执行：只执行源码、用例数据或配置有变化的用例以及上次失败的用例"
+    )
+    parser.add_argument(
+        "--failed-first", action="store_true",
+        help="上次失败的用例优先执行"
+    )
+    args = parser.parse_args(argv)
+    if args.shard:
+        from core.runner.sharding import parse_shard
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.durations_file and not os.path.exists(args.durations_file):
+            parser.error(f"分片耗时文件不存在: {args.durations_file}（首次运行可不指定，按哈希均分用例）")
+    return args
+
+
+def record_perf_history(test_durations, exit_code: int, mock_server: bool = False) -> int:
+    """
+    保存本次运行的端点耗时和用例耗时，与滚动基线比较并输出回归报告
+    
+    Args:
+        test_durations: {用例 nodeid: 耗时（毫秒）}
+        exit_code: pytest 退出码
+        mock_server: 是否使用了本地模拟服务（与真实后端的数据分开作为基线）
+        
+    Returns:
+        最终退出码（配置了 perf_history.fail_on_regression 且存在回归时返回非0）
+    """
+    from core.base.request_timing import timing_collector
+    from core.utils.perf_history import PerfHistory, current_environment
+    
+    environment = current_environment() + ("|mock" if mock_server else "")
+    history = PerfHistory()
+    try:
+        run_id = history.record_run(timing_collector.samples(), test_durations,
+                                    environment=environment, exit_code=exit_code)
+        results = history.compare(run_id)
+        report_file = config.get('perf_history.report_file', 'reports/perf_regression.json')
+        history.write_report(run_id, results, report_file)
+    finally:
+        history.close()
+    
+    regressions = [item for item in results if item["regression"]]
+    logger.info(f"性能历史已记录（运行ID: {run_id}），回归报告: {report_file}")
+    for item in regressions:
+        logger.warning(
+            f"性能回归 [{item['kind']}] {item['name']}: p95 {item['baseline_p95']:.1f} -> {item['p95']:.1f} ms "
+            f"(x{item['ratio']}, p={item['p_value']:.4f})"
+        )
+    if regressions and config.get('perf_history.fail_on_regression', False) and exit_code == 0:
+        logger.error(f"发现 {len(regressions)} 项性能回归，本次运行判定为失败")
+        return 1
+    return exit_code
+
+
+def select_test_shard(shard: str, test_dir: str, report_dir: str, durations_file: str = None) -> str:
+    """
+    收集用例并选出本分片的用例，写入用例列表文件
+    
+    Args:
+        shard: 分片参数 "i/N"
+        test_dir: 测试目录
+        report_dir: 报告目录
+        durations_file: 共用耗时文件，None 表示按 nodeid 哈希均分
+        
+    Returns:
+        pytest 参数形式的用例列表文件（"@文件路径"），本分片没有用例时返回None
+    """
+    from core.runner.parallel import collect_nodeids
+    from core.runner.sharding import parse_shard, select_shard, load_durations
+    
+    index, count = parse_shard(shard)
+    nodeids = collect_nodeids([test_dir])
+    if durations_file:
+        logger.info(f"分片按共用耗时文件均衡分配: {durations_file}")
+        durations = load_durations(durations_file)
+    else:
+        logger.info("未指定共用耗时文件，分片按 nodeid 哈希均分用例")
+        durations = None
+    selected, loads = select_shard(nodeids, index, count, durations)
+    logger.info(
+        f"分片 {index}/{count}：{len(selected)}/{len(nodeids)} 个用例，预计耗时 {loads[index - 1] / 1000:.1f} s"
+        f"（各分片: {', '.join(f'{load / 1000:.1f}' for load in loads)} s）"
+    )
+    if not selected:
+        return None
+    shard_file = os.path.join(report_dir, f"shard_{index}_of_{count}.txt")
+    with open(shard_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(selected) + "\n")
+    return f"@{shard_file}"
+
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+    
     logger.info("=" * 60)
     logger.info("接口自动化测试框架")
     logger.info("=" * 60)
@@ -22,27 +166,139 @@ def main():
     if not os.path.exists(report_dir):
         os.makedirs(report_dir, exist_ok=True)
     
-    # 构建pytest参数
-    pytest_args = [
-        test_dir,
+    # 构建pytest参数（并行模式下同样传给每个 worker）
+    common_args = [
         "-v",  # 详细输出
         "-s",  # 显示print输出
         "--tb=short",  # 简短的错误回溯
-        f"--html={report_dir}/report.html",  # HTML报告
-        "--self-contained-html",  # 独立的HTML报告
-        f"--junitxml={report_dir}/report.xml",  # XML报告
     ]
     
     # 如果配置了日志级别，可以添加日志相关参数
     log_level = config.get('logging.level', 'INFO')
     if log_level:
-        pytest_args.extend(["-o", f"log_cli_level={log_level}"])
+        common_args.extend(["-o", f"log_cli_level={log_level}"])
+    
+    if args.mock_server:
+        common_args.append("--mock-server")
+    if args.snapshot_update:
+        common_args.append("--snapshot-update")
+    
+    pytest_args = [
+        test_dir,
+        *common_args,
+        f"--junitxml={report_dir}/report.xml",  # XML报告
+    ]
+    
+    # 报告格式：pytest-html 在内存中保存全部结果，jsonl 逐条写出
+    html_report = args.report_format in ("html", "both")
+    result_stream = args.report_format in ("jsonl", "both")
+    if html_report:
+        try:
+            import pytest_html  # noqa: F401
+            pytest_args += [f"--html={report_dir}/report.html", "--self-contained-html"]
+        except ImportError:
+            logger.warning("未安装 pytest-html，不生成 HTML 报告")
+            html_report = False
+    results_file = os.path.join(report_dir, "results.jsonl")
+    if result_stream:
+        pytest_args.append(f"--results-jsonl={results_file}")
+    
+    # 分片：按历史耗时选出本节点执行的用例，通过 @文件 传给 pytest
+    # （依赖 pytest 8.2+ 的 @文件 参数，见 requirements.txt）
+    test_paths = [test_dir]
+    empty_shard = False
+    if args.shard:
+        shard_file = select_test_shard(args.shard, test_dir, report_dir, args.durations_file)
+        if shard_file is None:
+            # 不执行用例，但照常走完收尾流程（记录性能历史、导出指标、关闭日志）
+            logger.warning(f"分片 {args.shard} 没有分配到用例（分片数多于用例数）")
+            empty_shard = True
+        else:
+            test_paths = [shard_file]
+            pytest_args[0] = shard_file
     
     # 运行测试
     logger.info(f"开始运行测试，测试目录: {test_dir}")
     logger.info(f"报告将保存到: {report_dir}")
     
-    exit_code = pytest.main(pytest_args)
+    # 运行期间的指标抓取端点
+    metrics_port = config.get('metrics.http_port', 0)
+    if metrics.enabled and metrics_port and args.workers > 1:
+        logger.warning("并行模式下请求在 worker 进程中执行，不启动指标抓取端点（指标在结束后合并导出）")
+    elif metrics.enabled and metrics_port:
+        port = metrics.start_http_server(metrics_port)
+        logger.info(f"指标抓取端点: http://127.0.0.1:{port}/metrics")
+    
+    # 性能剖析插件
+    plugins = []
+    if args.profile and args.workers > 1:
+        logger.warning("并行模式不支持性能剖析，已忽略 --profile")
+    elif args.profile:
+        from core.runner.profiler import ProfilerPlugin
+        plugins.append(ProfilerPlugin(
+            args.profile, report_dir,
+            interval=config.get('profile.interval_ms', 5) / 1000,
+            top_n=config.get('profile.top_n', 20),
+            memory_frames=config.get('profile.memory_frames', 10)
+        ))
+        logger.info(f"性能剖析模式: {args.profile}")
+    
+    # 增量执行 / 失败用例优先
+    incremental_plugin = None
+    if (args.incremental or args.failed_first) and args.workers > 1:
+        logger.warning("并行模式不支持增量执行，已忽略 --incremental/--failed-first")
+    elif args.incremental or args.failed_first:
+        from core.runner.incremental import IncrementalPlugin
+        incremental_plugin = IncrementalPlugin(failed_first=args.failed_first, skip_unchanged=args.incremental)
+        plugins.append(incremental_plugin)
+    
+    # 用例耗时收集（性能历史；分片模式下写出本分片的耗时文件，供合并为共用耗时文件）
+    perf_history_enabled = config.get('perf_history.enabled', True)
+    duration_plugin = None
+    if perf_history_enabled or args.shard:
+        from core.runner.durations import DurationPlugin
+        duration_plugin = DurationPlugin()
+        plugins.append(duration_plugin)
+    
+    if empty_shard:
+        exit_code = pytest.ExitCode.OK
+    elif args.workers > 1:
+        # 多进程并行：用例耗时从合并后的 JUnit XML 读取（端点耗时在各 worker 进程中，不计入性能历史）
+        from core.runner.parallel import run_parallel
+        exit_code, durations = run_parallel(test_paths, common_args, report_dir, args.workers,
+                                            html_report, result_stream)
+        if duration_plugin is not None:
+            duration_plugin.durations = durations
+    else:
+        exit_code = pytest.main(pytest_args, plugins=plugins)
+        if incremental_plugin is not None and exit_code == pytest.ExitCode.NO_TESTS_COLLECTED \
+                and incremental_plugin.deselected:
+            logger.info("增量执行：所有用例均未变化，无需执行")
+            exit_code = pytest.ExitCode.OK
+    
+    if result_stream and not empty_shard and os.path.exists(results_file):
+        from core.runner.result_stream import render_html
+        summary_file = os.path.join(report_dir, "results.html")
+        render_html([results_file], summary_file)
+        logger.info(f"结果摘要已生成: {summary_file}")
+    
+    if duration_plugin is not None and args.shard:
+        from core.runner.sharding import parse_shard, write_durations
+        index, count = parse_shard(args.shard)
+        durations_output = os.path.join(report_dir, f"durations_shard_{index}_of_{count}.json")
+        write_durations(durations_output, duration_plugin.durations)
+        logger.info(f"本分片用例耗时已写出（合并后作为下一次运行的 --durations-file）: {durations_output}")
+    if duration_plugin is not None and perf_history_enabled:
+        exit_code = record_perf_history(duration_plugin.durations, exit_code, args.mock_server)
+    
+    # 导出指标
+    if metrics.enabled:
+        metrics_file = config.get('metrics.file_path', 'reports/metrics.txt')
+        # 并行模式下已由 run_parallel 合并各 worker 的指标
+        if args.workers <= 1:
+            metrics.write(metrics_file)
+        metrics.stop_http_server()
+        logger.info(f"指标已导出到: {metrics_file}")
     
     logger.info("=" * 60)
     if exit_code == 0:
@@ -51,6 +307,10 @@ def main():
         logger.warning(f"测试执行完成，退出码: {exit_code}")
     logger.info("=" * 60)
     
+    # 停止异步日志线程，写出剩余日志
+    Logger.shutdown()
+    request_log.close()
+    
     return exit_code
 
 
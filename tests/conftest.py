@@ -2,16 +2,84 @@
 pytest 配置文件（必须放在 tests 目录）
 定义全局 fixtures 和测试会话配置
 """
+import logging
+import os
 import pytest
-from core.utils.logger import logger
+from core.utils.logger import logger, Logger
+from core.utils.config_loader import config, WORKER_ENV
+from core.utils.request_log import request_log
+from core.base.request_timing import timing_collector
+from core.base.http_client import http_client
+from core.base.rate_limiter import rate_limiter
+from core.utils.memory import memory_tracker
+from core.utils.snapshot import snapshot_store
+from core.utils.metrics import metrics
+
+
+def pytest_addoption(parser):
+    """注册命令行参数"""
+    parser.addoption(
+        "--mock-server", action="store_true", default=False,
+        help="启动本地模拟报表服务并把 base_url 指向它（配置见 config.yaml 的 mock_server）"
+    )
+    parser.addoption(
+        "--snapshot-update", action="store_true", default=False,
+        help="重新记录 golden 快照，会话结束时批量写入（配置见 config.yaml 的 snapshot）"
+    )
+    parser.addoption(
+        "--results-jsonl", default=None, metavar="PATH",
+        help="每个用例结束时向该文件追加一行 JSON 结果（流式报告，可离线渲染为 HTML）"
+    )
+
+
+def pytest_configure(config):
+    """按命令行参数注册流式结果报告插件"""
+    results_file = config.getoption("--results-jsonl")
+    if results_file:
+        from core.runner.result_stream import ResultStreamPlugin
+        config.pluginmanager.register(ResultStreamPlugin(results_file), "result_stream")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    记录用例每个阶段（setup/call/teardown）的结果
+    供 fixture 在 teardown 阶段判断用例是否失败；
+    按用例缓冲日志时，在 teardown 结果生成后结束缓冲（teardown 出错也输出完整日志）
+    """
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+    if report.when == "teardown" and getattr(item, "log_buffered", False):
+        _end_test_log_buffer(item)
+
+
+def _end_test_log_buffer(item):
+    """
+    结束用例的日志缓冲：任一阶段失败时输出完整日志，
+    否则只输出 always_flush_level 及以上的日志和一行摘要
+
+    Args:
+        item: pytest 用例
+    """
+    item.log_buffered = False
+    reports = [getattr(item, f"rep_{when}", None) for when in ("setup", "call", "teardown")]
+    failed = any(report is not None and report.failed for report in reports)
+    level = config.get('logging.buffer_per_test.always_flush_level', 'WARNING')
+    count = Logger.end_test_buffer(flush=failed, min_level=getattr(logging, level) if level else None)
+    if not failed:
+        outcome = (reports[1] or reports[0]).outcome
+        logger.info(f"[{outcome}] {item.nodeid}（已省略 {count} 条日志）")
 
 
 @pytest.fixture(scope="session", autouse=True)
-def test_session_setup():
+def test_session_setup(request):
     """
     测试会话级别的设置
     在整个测试套件开始前和结束后执行
     """
+    if request.config.getoption("--snapshot-update"):
+        snapshot_store.update = True
     logger.info("=" * 60)
     logger.info("开始执行测试套件")
     logger.info("=" * 60)
@@ -19,16 +87,113 @@ def test_session_setup():
     logger.info("=" * 60)
     logger.info("测试套件执行完成")
     logger.info("=" * 60)
+    # 按端点汇总请求耗时
+    timing_collector.log_summary()
+    # 限速状态（限流次数、等待时间、自适应后的速率）
+    if rate_limiter.enabled:
+        rate_limiter.log_summary()
+    timing_collector.write_summary(config.get('timing.summary_file', 'reports/timing_summary.json'))
+    # 异步队列日志模式下，确保会话结束前日志全部写出
+    Logger.flush()
+    request_log.flush()
+    # 用例内存统计
+    if memory_tracker.enabled:
+        memory_tracker.write_summary(config.get('memory.summary_file', 'reports/memory_summary.json'))
+        memory_tracker.stop()
+    # 并行 worker 的请求指标写到隔离后的文件，由 run_parallel 合并（非并行时由 run.py 导出）
+    if metrics.enabled and os.environ.get(WORKER_ENV):
+        metrics.write(config.get('metrics.file_path', 'reports/metrics.txt'))
+    # 更新模式下记录的快照批量写入
+    if snapshot_store.is_initialized():
+        snapshot_store.flush()
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    """
+    本地模拟报表服务 fixture（会话级别，按 mock_server 配置启动）
+
+    需要直接控制延迟、错误注入或查看数据集的用例可以请求此 fixture
+    """
+    from bizs.mock.report_server import ReportMockServer
+    server = ReportMockServer.from_config()
+    server.start()
+    logger.info(f"本地模拟报表服务已启动: {server.base_url}（{len(server.orders)} 条订单）")
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def use_mock_server(request):
+    """
+    指定 --mock-server 或配置 mock_server.enabled 时，
+    整个测试会话的请求都发往本地模拟报表服务
+    """
+    if not (request.config.getoption("--mock-server") or config.get('mock_server.enabled', False)):
+        yield None
+        return
+    server = request.getfixturevalue("mock_server")
+    original_base_url = http_client.base_url
+    http_client.base_url = server.base_url
+    yield server
+    http_client.base_url = original_base_url
 
 
 @pytest.fixture(scope="function", autouse=True)
-def test_case_log():
+def test_case_log(request):
     """
     测试用例级别的日志分隔
     每个测试方法执行前后自动添加分隔线
+    
+    启用 logging.buffer_per_test 时，用例日志先缓冲在内存中，
+    由 pytest_runtest_makereport 在 teardown 结束后按用例结果决定是否输出（见 _end_test_log_buffer）
     """
+    if config.get('logging.buffer_per_test.enabled', False):
+        Logger.begin_test_buffer()
+        request.node.log_buffered = True
+    
     logger.info("-" * 60)
     yield
     logger.info("-" * 60)
 
 
+@pytest.fixture(scope="function", autouse=True)
+def test_memory(request):
+    """
+    用例内存统计（启用 memory.enabled 时）
+    记录峰值、保留内存、RSS变化以及响应大小，写入用例属性（JUnit XML 的 properties）；
+    峰值超出 memory.test_budget_mb 的用例输出告警，并在测试结束时汇总
+    """
+    if not memory_tracker.enabled:
+        yield
+        return
+    memory_tracker.begin_test(request.node.nodeid)
+    yield
+    result = memory_tracker.end_test()
+    if result is None:
+        return
+    for key in ("peak_bytes", "retained_bytes", "rss_delta_bytes", "responses",
+                "body_bytes", "max_body_bytes", "decoded_bytes", "max_decoded_bytes"):
+        request.node.user_properties.append((f"memory_{key}", result[key]))
+    if result["over_budget"]:
+        request.node.user_properties.append(("memory_over_budget", True))
+        logger.warning(
+            f"用例内存超出预算: {request.node.nodeid} 峰值 {result['peak_bytes'] / 1024 / 1024:.1f} MB "
+            f"> {memory_tracker.budget_bytes / 1024 / 1024:.1f} MB"
+        )
+
+
+def pytest_terminal_summary(terminalreporter):
+    """在测试结果摘要中列出超出内存预算的用例"""
+    if not memory_tracker.is_initialized() or not memory_tracker.enabled:
+        return
+    over_budget = memory_tracker.over_budget()
+    if not over_budget:
+        return
+    terminalreporter.section("内存超出预算的用例")
+    for item in over_budget:
+        terminalreporter.write_line(
+            f"{item['peak_bytes'] / 1024 / 1024:8.1f} MB 峰值  "
+            f"{item['retained_bytes'] / 1024 / 1024:8.1f} MB 保留  "
+            f"{item['max_body_bytes'] / 1024:8.1f} KB 最大响应体  {item['nodeid']}"
+        )
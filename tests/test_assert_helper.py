@@ -0,0 +1,70 @@
+"""
+断言助手测试
+测试JSON解析缓存、批量（软）断言和截断的断言消息
+"""
+import json
+import pytest
+import requests
+from core.assert_helper import assert_helper, short_repr
+
+
+class _CountingResponse(requests.Response):
+    """记录 json() 调用次数的响应"""
+
+    def __init__(self, body):
+        super().__init__()
+        self.status_code = 200
+        self._content = json.dumps(body).encode("utf-8")
+        self._content_consumed = True
+        self.json_calls = 0
+
+    def json(self, **kwargs):
+        self.json_calls += 1
+        return super().json(**kwargs)
+
+
+class TestAssertHelper:
+    """断言助手测试类"""
+
+    def test_json_decoded_once(self):
+        """多个响应断言只解析一次JSON"""
+        response = _CountingResponse({"code": "200", "message": "success", "data": {"totalCount": 1}})
+        assert_helper.assert_response_code(response, "200")
+        assert_helper.assert_response_message(response, "succ")
+        assert_helper.assert_response_contains(response, "data")
+        assert_helper.assert_response_json(response, {"code": "200"})
+        assert response.json_calls == 1
+
+    def test_soft_assert_reports_all_failures(self):
+        """批量断言执行全部检查，结束时一次性报告所有失败"""
+        response = _CountingResponse({"code": "500", "message": "error", "data": None})
+        with pytest.raises(AssertionError) as excinfo:
+            with assert_helper.soft(response) as check:
+                check.status_code(200)
+                check.code("200")
+                check.message("success")
+                check.contains("traceId")
+                check.is_not_none(check.data["data"], "data 不应为空")
+        message = str(excinfo.value)
+        assert "4/7 项未通过" in message
+        assert "期望 200, 实际 500" in message and "缺少键: traceId" in message
+        assert response.json_calls == 1
+
+    def test_soft_assert_passes(self):
+        """全部通过时不抛出异常；直接断言字典数据"""
+        with assert_helper.soft(data={"code": "200", "data": {"listData": []}}) as check:
+            check.code("200")
+            check.is_in("listData", check.data["data"])
+        assert check.checks == 3 and not check.failures
+
+    def test_failure_messages_truncated(self):
+        """失败消息中的大容器被截断"""
+        rows = [{"orderId": f"ORD{i:06d}", "amount": i} for i in range(10000)]
+        with pytest.raises(AssertionError) as excinfo:
+            assert_helper.assert_in({"orderId": "missing"}, rows)
+        assert len(str(excinfo.value)) < 1000
+        assert short_repr("x" * 1000).endswith("（共 1000 字符）")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
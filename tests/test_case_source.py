@@ -0,0 +1,91 @@
+"""
+流式用例数据源测试
+测试 JSONL / 多文档YAML 的偏移索引、按ID定位和分片
+"""
+import json
+import pytest
+from core.utils.case_source import CaseSource
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    """临时 JSONL 用例文件 fixture"""
+    path = tmp_path / "cases.jsonl"
+    lines = [json.dumps({"case_id": f"case_{i}", "pageNum": i}) for i in range(10)]
+    path.write_text("\n".join(lines[:5]) + "\n\n" + "\n".join(lines[5:]) + "\n", encoding="utf-8")
+    return path
+
+
+def _make_source(path, tmp_path, **kwargs):
+    """创建索引写入临时目录的数据源"""
+    source = CaseSource(str(path), **kwargs)
+    source.index_path = str(tmp_path / "index" / (path.name + ".idx"))
+    return source
+
+
+class TestCaseSource:
+    """流式用例数据源测试类"""
+
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_jsonl_random_access(self, jsonl_file, tmp_path, use_mmap):
+        """按序号和ID直接读取用例"""
+        source = _make_source(jsonl_file, tmp_path, use_mmap=use_mmap)
+        try:
+            assert len(source) == 10
+            assert source[3] == {"case_id": "case_3", "pageNum": 3}
+            assert source[-1]["pageNum"] == 9
+            assert source.get("case_7")["pageNum"] == 7
+            assert source.get("missing") is None
+        finally:
+            source.close()
+
+    def test_index_persisted_and_rebuilt_on_change(self, jsonl_file, tmp_path):
+        """索引持久化复用，源文件变化后重建"""
+        source = _make_source(jsonl_file, tmp_path)
+        assert len(source) == 10
+        source.close()
+
+        with open(jsonl_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"case_id": "case_10", "pageNum": 10}) + "\n")
+        source = _make_source(jsonl_file, tmp_path)
+        try:
+            assert len(source) == 11
+            assert source.get("case_10")["pageNum"] == 10
+        finally:
+            source.close()
+
+    def test_shards_cover_all_cases(self, jsonl_file, tmp_path):
+        """分片连续且覆盖全部用例，分片内可流式读取"""
+        source = _make_source(jsonl_file, tmp_path)
+        try:
+            shards = [source.shard(i, 3) for i in range(3)]
+            assert [len(r) for r in shards] == [4, 3, 3]
+            assert [i for r in shards for i in r] == list(range(10))
+
+            ids = [case_id for case_id, _ in source.iter_cases(shards[1].start, shards[1].stop)]
+            assert ids == ["case_4", "case_5", "case_6"]
+
+            indexes, param_ids = source.parametrize_args(shard=(2, 3))
+            assert indexes == [7, 8, 9]
+            assert param_ids == ["case_7", "case_8", "case_9"]
+        finally:
+            source.close()
+
+    def test_multi_document_yaml(self, tmp_path):
+        """多文档YAML按文档建立索引，缺少ID字段时使用序号"""
+        path = tmp_path / "cases.yaml"
+        path.write_text(
+            "# 报表用例\n---\ncase_id: first\npageNum: 1\n---\npageNum: 2\n---\ncase_id: third\npageNum: 3\n",
+            encoding="utf-8"
+        )
+        source = _make_source(path, tmp_path)
+        try:
+            assert source.case_ids() == ["first", "1", "third"]
+            assert source.get("third") == {"case_id": "third", "pageNum": 3}
+            assert source[1] == {"pageNum": 2}
+        finally:
+            source.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
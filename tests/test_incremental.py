@@ -0,0 +1,114 @@
+"""
+增量执行测试
+在临时项目中多次执行 pytest，测试未变化用例的跳过、依赖模块/单条用例数据变化后的重新执行以及失败用例优先
+"""
+import os
+import re
+import subprocess
+import sys
+import pytest
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_TESTS = '''
+import os
+import pytest
+from core.utils.case_source import CaseSource
+from helpers.values import EXPECTED
+
+cases = CaseSource(os.path.join(os.path.dirname(__file__), "cases.jsonl"))
+case_indexes, case_ids = cases.parametrize_args()
+
+
+def test_alpha():
+    assert EXPECTED == 1
+
+
+def test_beta():
+    assert os.environ.get("BETA_FAIL") != "1"
+
+
+@pytest.mark.parametrize("case_index", case_indexes, ids=case_ids)
+def test_case(case_index):
+    assert cases[case_index]["value"] > 0
+'''
+
+RUNNER = '''
+import sys
+import pytest
+sys.path.insert(0, {project!r})
+from core.runner.incremental import IncrementalPlugin, Fingerprinter
+plugin = IncrementalPlugin({state!r}, failed_first={failed_first!r},
+                           fingerprinter=Fingerprinter(root={root!r}, config_keys=[], data_dirs=['.']))
+sys.exit(pytest.main([{root!r}, "-v", "-p", "no:cacheprovider"], plugins=[plugin]))
+'''
+
+
+def write_cases(root, values):
+    """写入 JSONL 用例数据"""
+    lines = [f'{{"case_id": "c{i}", "value": {value}}}' for i, value in enumerate(values)]
+    (root / "cases.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def run(root, failed_first=False, beta_fail=False):
+    """
+    在子进程中执行临时项目的用例
+
+    Returns:
+        按执行顺序排列的 [(用例名, 结果)]
+    """
+    script = RUNNER.format(project=PROJECT_ROOT, state=str(root / "state.json"),
+                           failed_first=failed_first, root=str(root))
+    env = dict(os.environ, BETA_FAIL="1" if beta_fail else "0")
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    return re.findall(r"::(\S+) (PASSED|FAILED)", result.stdout)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """临时项目：测试模块、被导入的项目包和 JSONL 用例数据"""
+    (tmp_path / "helpers").mkdir()
+    (tmp_path / "helpers" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "helpers" / "values.py").write_text("EXPECTED = 1\n", encoding="utf-8")
+    (tmp_path / "test_sample.py").write_text(SAMPLE_TESTS, encoding="utf-8")
+    write_cases(tmp_path, [1, 2, 3])
+    return tmp_path
+
+
+class TestIncremental:
+    """增量执行测试类"""
+
+    def test_unchanged_tests_skipped(self, project):
+        """第二次执行时未变化且通过的用例被跳过"""
+        assert len(run(project)) == 5
+        assert run(project) == []
+
+    def test_dependency_change_reruns(self, project):
+        """导入的项目模块变化后，该模块的用例全部重新执行"""
+        run(project)
+        (project / "helpers" / "values.py").write_text("EXPECTED = 1  # changed\n", encoding="utf-8")
+        assert len(run(project)) == 5
+
+    def test_single_case_change_reruns_only_that_case(self, project):
+        """修改 JSONL 中的一条用例只重新执行这一条"""
+        run(project)
+        write_cases(project, [1, 5, 3])
+        assert run(project) == [("test_case[c1]", "PASSED")]
+
+    def test_failed_rerun_and_failed_first(self, project):
+        """上次失败的用例即使未变化也重新执行，并可优先执行"""
+        outcomes = run(project, beta_fail=True)
+        assert ("test_beta", "FAILED") in outcomes
+
+        write_cases(project, [1, 2, 4])
+        outcomes = run(project, failed_first=True, beta_fail=True)
+        assert outcomes == [("test_beta", "FAILED"), ("test_case[c2]", "PASSED")]
+
+        assert run(project) == [("test_beta", "PASSED")]
+        assert run(project) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,74 @@
+"""
+JSON 路径测试
+测试路径编译缓存、通配符/切片/过滤和 extract_value 的兼容性
+"""
+import pytest
+from core.test_helper import BaseTest
+from core.utils.json_path import compile_path
+
+
+RESPONSE = {
+    "$schema": "order-list",
+    "code": "200",
+    "data": {
+        "totalCount": 3,
+        "listData": [
+            {"orderId": "A", "orderStatus": 1, "amount": 10.5, "shop": {"id": 5}},
+            {"orderId": "B", "orderStatus": 2, "amount": 99, "remark": "加急"},
+            {"orderId": "C", "orderStatus": 2, "amount": 0},
+        ],
+        "key.with.dot": True,
+    },
+}
+
+
+class TestJsonPath:
+    """JSON 路径测试类"""
+
+    def test_compiled_once(self):
+        """同一路径只编译一次"""
+        assert compile_path("data.listData[*].orderId") is compile_path("data.listData[*].orderId")
+
+    @pytest.mark.parametrize("path, expected", [
+        ("data.listData[*].orderStatus", [1, 2, 2]),
+        ("data.listData[1:].orderId", ["B", "C"]),
+        ("data.listData[::2].orderId", ["A", "C"]),
+        ("data.listData[-1].orderId", ["C"]),
+        ("data.listData[?(@.orderStatus == 2)].orderId", ["B", "C"]),
+        ("data.listData[?(@.orderStatus in [1, 3])].orderId", ["A"]),
+        ("data.listData[?(@.amount >= 10)].orderId", ["A", "B"]),
+        ("data.listData[?(@.shop.id == 5)].orderId", ["A"]),
+        ("data.listData[?(@.remark)].orderId", ["B"]),
+        ("data.listData[?(@.orderId != 'A')].orderId", ["B", "C"]),
+        ('data["key.with.dot"]', [True]),
+        ("$.data.listData[*].missing", []),
+        ("$['code']", ["200"]),
+        ("$schema", ["order-list"]),
+        ("$.$schema", ["order-list"]),
+    ])
+    def test_find(self, path, expected):
+        """多值路径一次取出所有匹配"""
+        assert compile_path(path).find(RESPONSE) == expected
+
+    def test_extract_value_backward_compatible(self):
+        """单值路径的行为与原实现一致，多值路径返回列表"""
+        assert BaseTest.extract_value(RESPONSE, "data.listData[0].orderId") == "A"
+        assert BaseTest.extract_value(RESPONSE, "data.totalCount") == 3
+        assert BaseTest.extract_value(RESPONSE, "data.listData[9].orderId", "默认") == "默认"
+        assert BaseTest.extract_value(RESPONSE, "data.missing.id") is None
+        assert BaseTest.extract_value(RESPONSE, "code.value", 0) == 0
+        assert BaseTest.extract_value(RESPONSE, "data.listData[*].orderId") == ["A", "B", "C"]
+        assert BaseTest.extract_value(RESPONSE, "data.listData[*].missing", []) == []
+        assert BaseTest.extract_values(RESPONSE, "data.listData[?(@.orderStatus == 9)]") == []
+        assert BaseTest.extract_value(RESPONSE, "$") == RESPONSE
+
+    @pytest.mark.parametrize("path", ["data.list[", "data.list[x]", "data.list[1:2:3:4]",
+                                      "data.list[?(status == 1)]"])
+    def test_invalid_path(self, path):
+        """语法错误的路径抛出 ValueError"""
+        with pytest.raises(ValueError):
+            compile_path(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
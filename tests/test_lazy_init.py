@@ -0,0 +1,55 @@
+"""
+延迟初始化测试
+验证导入框架模块时不会创建全局单例
+"""
+import os
+import subprocess
+import sys
+import pytest
+from core.utils.lazy_proxy import LazyProxy
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyInit:
+    """延迟初始化测试类"""
+
+    def test_proxy_builds_once_on_first_use(self):
+        """代理只在首次访问属性时调用一次工厂函数"""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return {"name": "value"}
+
+        proxy = LazyProxy(factory)
+        assert not proxy.is_initialized()
+        assert calls == []
+
+        assert proxy.get("name") == "value"
+        assert proxy.get("name") == "value"
+        assert proxy.is_initialized()
+        assert len(calls) == 1
+
+    def test_import_does_not_build_singletons(self):
+        """导入业务模块和用例模块后，全局单例仍未初始化"""
+        code = (
+            "import bizs.apis.report_api, core.test_helper, tests.test_report\n"
+            "from core.utils.config_loader import config\n"
+            "from core.utils.account_loader import account_loader\n"
+            "from core.utils.logger import logger\n"
+            "from core.base.session_manager import session_manager\n"
+            "from core.base.http_client import http_client\n"
+            "objs = [config, account_loader, logger, session_manager, http_client]\n"
+            "print(sum(o.is_initialized() for o in objs))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "0"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,193 @@
+"""
+日志工具测试
+测试异步队列日志、按用例缓冲日志和轮转文件压缩
+"""
+import gzip
+import logging
+import queue
+import pytest
+from logging.handlers import RotatingFileHandler
+from core.utils.config_loader import config
+from core.utils.logger import Logger, BoundedQueueHandler, logger, _gzip_namer, _gzip_rotator
+
+
+# 使用 tests/conftest.py 中按用例缓冲日志的 fixture 的临时用例
+BUFFER_CONFTEST = '''
+from tests.conftest import pytest_runtest_makereport, test_case_log
+'''
+
+BUFFER_TESTS = '''
+import pytest
+from core.utils.logger import logger
+
+
+@pytest.fixture
+def broken_teardown():
+    yield
+    logger.info("teardown 出错用例的日志")
+    raise RuntimeError("teardown 出错")
+
+
+@pytest.fixture
+def warns_on_teardown():
+    yield
+    logger.warning("fixture 告警日志")
+
+
+def test_pass():
+    logger.info("通过用例的日志")
+
+
+def test_fail():
+    logger.info("失败用例的日志")
+    assert False
+
+
+def test_teardown_error(broken_teardown):
+    logger.info("teardown 出错的用例日志")
+
+
+def test_pass_with_warning(warns_on_teardown):
+    logger.info("带告警的通过用例日志")
+'''
+
+
+class ListHandler(logging.Handler):
+    """把日志记录收集到列表中的handler"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _make_record(level=logging.INFO, msg="message"):
+    """创建日志记录"""
+    return logging.LogRecord("test", level, __file__, 0, msg, None, None)
+
+
+class TestLogger:
+    """日志工具测试类"""
+
+    def test_drop_policy_drops_low_level_records_when_full(self):
+        """队列满时丢弃 WARNING 以下的日志并计数"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), full_policy="drop")
+        for _ in range(5):
+            handler.handle(_make_record())
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_queue_mode_writes_in_background_and_shutdown_restores_sync(self):
+        """队列模式下日志由后台线程写出，停止后logger改回同步输出"""
+        test_logger = logging.getLogger("test_queue_logger")
+        test_logger.propagate = False
+        sink = ListHandler()
+        Logger._start_queue(test_logger, [sink])
+        try:
+            for i in range(100):
+                test_logger.warning(f"消息 {i}")
+            Logger.flush()
+            assert len(sink.records) == 100
+            assert isinstance(test_logger.handlers[0], BoundedQueueHandler)
+        finally:
+            Logger.shutdown()
+
+        assert test_logger.handlers == [sink]
+        test_logger.warning("停止后的消息")
+        assert sink.records[-1].getMessage() == "停止后的消息"
+        test_logger.removeHandler(sink)
+
+    @pytest.mark.parametrize("failed", [False, True])
+    def test_test_buffer_flushes_only_on_failure(self, failed, monkeypatch):
+        """按用例缓冲的日志只在失败时输出"""
+        name = f"test_buffer_logger_{failed}"
+        test_logger = logging.getLogger(name)
+        test_logger.propagate = False
+        test_logger.setLevel(logging.INFO)
+        sink = ListHandler()
+        test_logger.addHandler(sink)
+        monkeypatch.setitem(Logger._loggers, name, test_logger)
+        try:
+            Logger.begin_test_buffer(name)
+            for i in range(5):
+                test_logger.info(f"用例日志 {i}")
+            assert sink.records == []
+
+            assert Logger.end_test_buffer(flush=failed, name=name) == (0 if failed else 5)
+            assert len(sink.records) == (5 if failed else 0)
+            assert test_logger.handlers == [sink]
+        finally:
+            test_logger.removeHandler(sink)
+
+    def test_test_buffer_keeps_warnings(self, monkeypatch):
+        """不全部输出时，min_level 及以上的日志仍然输出"""
+        name = "test_buffer_logger_warning"
+        test_logger = logging.getLogger(name)
+        test_logger.propagate = False
+        test_logger.setLevel(logging.INFO)
+        sink = ListHandler()
+        test_logger.addHandler(sink)
+        monkeypatch.setitem(Logger._loggers, name, test_logger)
+        try:
+            Logger.begin_test_buffer(name)
+            test_logger.info("普通日志")
+            test_logger.warning("告警日志")
+            test_logger.error("错误日志")
+            assert Logger.end_test_buffer(flush=False, name=name, min_level=logging.WARNING) == 1
+            assert [record.getMessage() for record in sink.records] == ["告警日志", "错误日志"]
+        finally:
+            test_logger.removeHandler(sink)
+
+    def test_case_log_fixture_buffers_passing_tests(self, tmp_path, monkeypatch):
+        """
+        启用 logging.buffer_per_test 时，conftest 的 test_case_log 只输出失败（含 teardown 出错）用例的完整日志，
+        通过的用例只输出告警及以上的日志和一行摘要
+        """
+        monkeypatch.setitem(config.get('logging.buffer_per_test'), 'enabled', True)
+        (tmp_path / "conftest.py").write_text(BUFFER_CONFTEST, encoding="utf-8")
+        (tmp_path / "test_buffer_sample.py").write_text(BUFFER_TESTS, encoding="utf-8")
+        sink = ListHandler()
+        logger.addHandler(sink)
+        try:
+            exit_code = pytest.main([str(tmp_path), "-q", "-p", "no:cacheprovider", "-p", "no:html",
+                                     "--import-mode=importlib"])
+        finally:
+            logger.removeHandler(sink)
+
+        assert exit_code == pytest.ExitCode.TESTS_FAILED
+        messages = [record.getMessage() for record in sink.records]
+        assert "失败用例的日志" in messages
+        assert "通过用例的日志" not in messages
+        assert any(message.startswith("[passed] ") and message.endswith("test_pass（已省略 3 条日志）")
+                   for message in messages)
+        assert not any("test_fail（已省略" in message for message in messages)
+        # teardown 出错时输出完整日志（包括 teardown 阶段的日志）
+        assert "teardown 出错的用例日志" in messages and "teardown 出错用例的日志" in messages
+        assert not any("test_teardown_error（已省略" in message for message in messages)
+        # 通过的用例仍然输出 fixture 的告警
+        assert "fixture 告警日志" in messages
+        assert "带告警的通过用例日志" not in messages
+        assert any(message.endswith("test_pass_with_warning（已省略 3 条日志）") for message in messages)
+
+    def test_rotated_files_are_gzipped(self, tmp_path):
+        """轮转后的日志文件被压缩为 gzip"""
+        log_file = tmp_path / "api_test.log"
+        handler = RotatingFileHandler(str(log_file), maxBytes=200, backupCount=2, encoding="utf-8")
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+        try:
+            for i in range(20):
+                handler.emit(_make_record(msg=f"第 {i} 行日志内容"))
+        finally:
+            handler.close()
+
+        rotated = tmp_path / "api_test.log.1.gz"
+        assert rotated.exists()
+        with gzip.open(rotated, "rt", encoding="utf-8") as f:
+            assert "日志内容" in f.read()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,71 @@
+"""
+内存统计测试
+测试对象大小计算、用例峰值/保留内存、响应大小统计和内存预算标记
+"""
+import sys
+import pytest
+from core.base import base_api as base_api_module
+from core.base import http_client as http_client_module
+from core.base.base_api import BaseAPI
+from core.base.http_client import HttpClient
+from core.utils.memory import MemoryTracker, deep_sizeof
+from bizs.mock.report_server import ReportMockServer, LIST_PAGE_PATH
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """启用状态的独立内存统计 fixture"""
+    tracker = MemoryTracker()
+    tracker.enabled = True
+    tracker.budget_bytes = 1024 * 1024
+    monkeypatch.setattr(http_client_module, "memory_tracker", tracker)
+    monkeypatch.setattr(base_api_module, "memory_tracker", tracker)
+    yield tracker
+    tracker.stop()
+
+
+class TestMemory:
+    """内存统计测试类"""
+
+    def test_deep_sizeof(self):
+        """嵌套对象的大小包含所有子对象，共享对象只计算一次"""
+        row = {"orderId": "ORD0001", "amount": 12.5}
+        assert deep_sizeof(row) > sys.getsizeof(row)
+        assert deep_sizeof([row, row]) == sys.getsizeof([row, row]) + deep_sizeof(row)
+
+    def test_peak_retained_and_budget(self, tracker):
+        """峰值和保留内存分开统计；峰值超出预算时标记"""
+        tracker.begin_test("test_small")
+        kept = [bytes(1024) for _ in range(10)]
+        small = tracker.end_test()
+        assert not small["over_budget"]
+        assert small["retained_bytes"] >= 10 * 1024
+
+        tracker.begin_test("test_large")
+        temporary = bytearray(4 * 1024 * 1024)
+        del temporary
+        large = tracker.end_test()
+        assert large["peak_bytes"] >= 4 * 1024 * 1024
+        assert large["retained_bytes"] < 1024 * 1024
+        assert large["over_budget"]
+        assert [item["nodeid"] for item in tracker.over_budget()] == ["test_large"]
+        del kept
+
+    def test_response_sizes_recorded(self, tracker):
+        """HttpClient 记录响应体大小，BaseAPI 记录解析后对象大小"""
+        with ReportMockServer(size=500) as base_url:
+            api = BaseAPI()
+            api.client = HttpClient()
+            api.client.base_url = base_url
+            tracker.begin_test("test_responses")
+            api.post(LIST_PAGE_PATH, json={"pageNum": 1, "pageSize": 100})
+            api.post(LIST_PAGE_PATH, json={"pageNum": 1, "pageSize": 10})
+            result = tracker.end_test()
+        assert result["responses"] == 2
+        assert result["max_body_bytes"] > 100 * 50
+        assert result["body_bytes"] > result["max_body_bytes"]
+        assert result["max_decoded_bytes"] > result["max_body_bytes"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
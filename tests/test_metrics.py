@@ -0,0 +1,57 @@
+"""
+指标注册表测试
+测试请求指标的 OpenMetrics 导出和本地抓取端点
+"""
+import urllib.request
+import pytest
+from core.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    """启用状态的指标注册表 fixture"""
+    registry = MetricsRegistry()
+    registry.enabled = True
+    yield registry
+    registry.stop_http_server()
+
+
+class TestMetrics:
+    """指标注册表测试类"""
+
+    def test_render_openmetrics(self, registry):
+        """请求计数、耗时直方图和错误数按 OpenMetrics 格式导出"""
+        endpoint = "/api/report/order/listPage"
+        registry.observe_request("post", endpoint, "default", 30, status=200, reused=False)
+        registry.observe_request("POST", endpoint, "default", 300, status=200, reused=True)
+        registry.observe_request("POST", endpoint, "default", 5, error="ConnectTimeout")
+
+        text = registry.render()
+        labels = 'endpoint="/api/report/order/listPage",method="POST",status="200",account="default"'
+        assert f"autoapi_http_requests_total{{{labels}}} 2" in text
+        assert f'autoapi_http_request_duration_seconds_bucket{{{labels},le="0.05"}} 1' in text
+        assert f'autoapi_http_request_duration_seconds_bucket{{{labels},le="0.5"}} 2' in text
+        assert f'autoapi_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert f"autoapi_http_request_duration_seconds_count{{{labels}}} 2" in text
+        assert ('autoapi_http_errors_total{endpoint="/api/report/order/listPage",'
+                'method="POST",error="ConnectTimeout"} 1') in text
+        assert "autoapi_test_data_cache_hit_ratio" not in text
+        assert text.endswith("# EOF\n")
+
+    def test_disabled_registry_records_nothing(self, registry):
+        """未启用时不记录"""
+        registry.enabled = False
+        registry.observe_request("GET", "/api/ping", "default", 1, status=200)
+        assert registry.requests.get("/api/ping", "GET", "200", "default") == 0
+
+    def test_http_endpoint(self, registry):
+        """本地抓取端点返回指标文本"""
+        registry.observe_request("GET", "/api/ping", "default", 1, status=200)
+        port = registry.start_http_server(0)
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+            assert "autoapi_http_requests_total" in response.read().decode("utf-8")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
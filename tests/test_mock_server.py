@@ -0,0 +1,93 @@
+"""
+本地模拟报表服务测试
+测试分页、筛选、排序与暴力计算结果一致，以及延迟和错误注入
+"""
+import time
+import pytest
+import requests
+from core.base.http_client import HttpClient
+from bizs.mock.report_server import ReportMockServer, LIST_PAGE_PATH, LATENCY_HEADER, ERROR_HEADER
+
+
+@pytest.fixture(scope="module")
+def server():
+    """小数据集的模拟服务 fixture"""
+    server = ReportMockServer(size=2000, seed=7, start_date="2025-11-01", days=30)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    """指向模拟服务的HTTP客户端 fixture"""
+    client = HttpClient()
+    client.base_url = server.base_url
+    return client
+
+
+def _expected(server, start_date, end_date, statuses, field, descending):
+    """暴力计算期望的订单号顺序"""
+    rows = [
+        order for order in server.orders
+        if f"{start_date} 00:00:00" <= order["createTime"] <= f"{end_date} 23:59:59"
+        and (not statuses or order["orderStatus"] in statuses)
+    ]
+    indexed = sorted(enumerate(rows), key=lambda item: (item[1][field], item[0]), reverse=descending)
+    return [order["orderId"] for _, order in indexed]
+
+
+class TestMockServer:
+    """本地模拟报表服务测试类"""
+
+    @pytest.mark.parametrize("statuses, field, order", [
+        ([], "createTime", "desc"),
+        ([1, 3], "createTime", "asc"),
+        ([2], "amount", "desc"),
+        ([], "orderId", "asc"),
+    ])
+    def test_pages_match_brute_force(self, server, client, statuses, field, order):
+        """逐页拉取的结果与暴力筛选排序一致，totalCount 正确"""
+        expected = _expected(server, "2025-11-05", "2025-11-20", statuses, field, order == "desc")
+        payload = {"pageSize": 100, "startDate": "2025-11-05", "endDate": "2025-11-20",
+                   "orderStatus": statuses, "sortRule": {"field": field, "order": order}}
+        seen = []
+        page_num = 1
+        while True:
+            data = client.post(LIST_PAGE_PATH, json=dict(payload, pageNum=page_num)).json()["data"]
+            assert data["totalCount"] == len(expected)
+            if not data["listData"]:
+                break
+            seen.extend(row["orderId"] for row in data["listData"])
+            page_num += 1
+        assert seen == expected
+
+    def test_invalid_params_return_business_error(self, client):
+        """非法分页参数、排序字段和状态筛选返回业务错误码"""
+        assert client.post(LIST_PAGE_PATH, json={"pageNum": 0}).json()["code"] == "400"
+        body = {"pageNum": 1, "sortRule": {"field": "shopName", "order": "asc"}}
+        assert client.post(LIST_PAGE_PATH, json=body).json()["code"] == "400"
+        for status in (["paid"], 2, "1,2", [None], {"status": 1}):
+            response = client.post(LIST_PAGE_PATH, json={"pageNum": 1, "orderStatus": status}).json()
+            assert response["code"] == "400" and "orderStatus" in response["message"]
+        assert client.post(LIST_PAGE_PATH, json={"pageNum": 1, "sortRule": "createTime"}).json()["code"] == "400"
+
+    def test_latency_and_error_injection(self, server, client):
+        """请求头注入延迟和错误状态码；按比例注入错误"""
+        start = time.perf_counter()
+        client.post(LIST_PAGE_PATH, json={"pageNum": 1}, headers={LATENCY_HEADER: "50"})
+        assert time.perf_counter() - start >= 0.05
+
+        response = client.post(LIST_PAGE_PATH, json={"pageNum": 1}, headers={ERROR_HEADER: "503"})
+        assert response.status_code == 503
+
+        server.error_rate = 1.0
+        try:
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.post(LIST_PAGE_PATH, json={"pageNum": 1}).raise_for_status()
+        finally:
+            server.error_rate = 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,92 @@
+"""
+分页一致性测试
+测试跨页重复、缺失、totalCount 校验和布隆过滤器去重
+"""
+import json
+import pytest
+from bizs.apis.report_api import ReportAPI
+from bizs.mock.report_server import ReportMockServer
+from core.base.http_client import HttpClient
+from core.test_helper import BaseTest
+from core.utils.pagination import BloomFilter, PaginationChecker, _digest
+
+
+@pytest.fixture(scope="module")
+def server():
+    """模拟报表服务（只在进程内查询，不启动 HTTP）"""
+    return ReportMockServer(size=1000)
+
+
+def _fetcher(server, drift_after_page=None):
+    """
+    获取一页的函数；drift_after_page 之后模拟翻页期间新增了 3 条数据（后续页整体后移）
+    """
+    def fetch_page(page_num, page_size):
+        data = json.loads(server.render_list_page({"pageNum": page_num, "pageSize": page_size}))
+        if drift_after_page is not None and page_num > drift_after_page:
+            previous = json.loads(server.render_list_page({"pageNum": page_num - 1, "pageSize": page_size}))
+            rows = previous["data"]["listData"][-3:] + data["data"]["listData"]
+            data["data"]["listData"] = rows[:page_size]
+            data["data"]["totalCount"] += 3
+        return data
+    return fetch_page
+
+
+class TestPagination:
+    """分页一致性测试类"""
+
+    def test_consistent_listing(self, server):
+        """一致的分页：无重复、无缺失，数量之和等于 totalCount"""
+        result = PaginationChecker().walk(_fetcher(server), page_size=128).result()
+        assert result["ok"]
+        assert result["pages"] == 8
+        assert result["rows"] == result["unique_rows"] == result["total_count"] == 1000
+
+    def test_drift_reports_pages(self, server):
+        """翻页期间数据变化：报告重复行所在页和 totalCount 变化的页"""
+        checker = PaginationChecker().walk(_fetcher(server, drift_after_page=2), page_size=100)
+        result = checker.result()
+        assert not result["ok"]
+        assert result["duplicates"] == 3
+        assert result["duplicate_pages"] == [3]
+        assert result["total_count_changes"] == [3]
+        assert "页码 [3]" in checker.describe()
+
+    def test_gap_and_count_mismatch(self):
+        """中间页未满视为缺失；各页数量之和与 totalCount 不一致"""
+        checker = PaginationChecker()
+        checker.feed(1, [{"orderId": i} for i in range(10)], 10, 30)
+        checker.feed(2, [{"orderId": i} for i in range(10, 17)], 10, 30)
+        checker.feed(3, [{"orderId": i} for i in range(20, 30)], 10, 30)
+        result = checker.result()
+        assert result["short_pages"] == [2]
+        assert result["count_mismatch"]
+        with pytest.raises(AssertionError, match="中间页未满"):
+            BaseTest.assert_pagination_consistent(
+                [(1, [{"orderId": 1}], 3), (2, [{"orderId": 2}, {"orderId": 3}], 3)], page_size=2
+            )
+
+    def test_bloom_filter(self, server):
+        """布隆过滤器去重结果与哈希集合一致"""
+        result = PaginationChecker(use_bloom=True).walk(_fetcher(server, drift_after_page=5), 100).result()
+        assert result["dedup"] == "bloom"
+        assert result["duplicates"] == 3
+        bloom = BloomFilter(10000, 0.01)
+        false_positives = sum(bloom.add(_digest(i)) for i in range(10000))
+        assert false_positives < 10000 * 0.02
+
+    def test_report_api_pages(self, server):
+        """ReportAPI 逐页获取并断言分页一致"""
+        with server as base_url:
+            api = ReportAPI()
+            api.client = HttpClient()
+            api.client.base_url = base_url
+            result = BaseTest.assert_pagination_consistent(
+                api.iter_order_list_pages({"startDate": "2025-02-01", "endDate": "2025-04-30"}, page_size=60),
+                page_size=60
+            )
+        assert result["rows"] == result["total_count"] > 60
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,121 @@
+"""
+并行执行测试
+测试用例分配、退出码合并、worker 路径隔离以及 JUnit/HTML 报告合并
+"""
+import xml.etree.ElementTree as ET
+import pytest
+from core.runner.parallel import (
+    collect_nodeids, distribute, combine_exit_codes, run_workers, merge_junit, merge_html, merge_metrics,
+    junit_durations
+)
+from core.utils.config_loader import ConfigLoader
+from core.utils.metrics import MetricsRegistry
+
+
+SAMPLE_TESTS = '''
+import pytest
+
+def test_pass_1():
+    pass
+
+def test_pass_2():
+    pass
+
+def test_fail():
+    assert 1 == 2
+
+@pytest.mark.skip(reason="示例")
+def test_skip():
+    pass
+'''
+
+
+class TestParallel:
+    """并行执行测试类"""
+
+    def test_distribute_keeps_classes_together(self):
+        """同一测试类的用例分到同一个 worker，且各 worker 数量均衡"""
+        nodeids = [f"tests/test_a.py::TestA::test_{i}" for i in range(4)] + \
+                  [f"tests/test_b.py::TestB::test_{i}[{i}]" for i in range(3)] + \
+                  [f"tests/test_c.py::test_{i}" for i in range(3)]
+        groups = distribute(nodeids, 3)
+        assert sorted(len(group) for group in groups) == [3, 3, 4]
+        for group in groups:
+            assert len({nodeid.split("::")[0] for nodeid in group}) == 1
+        # 分组少于 worker 数时按用例拆分
+        assert len(distribute(nodeids[:4], 3)) == 3
+
+    def test_combine_exit_codes(self):
+        """有失败时为1；没有用例的 worker 不影响结果"""
+        assert combine_exit_codes([0, 5, 0]) == 0
+        assert combine_exit_codes([0, 1, 2]) == 1
+        assert combine_exit_codes([0, 2]) == 2
+        assert combine_exit_codes([5, 5]) == 5
+
+    def test_worker_paths_isolated(self):
+        """worker 子进程中日志和 Token 文件放到各自目录"""
+        loader = object.__new__(ConfigLoader)
+        loader._config = {
+            "parallel": {"isolated_paths": ["logging.file_path", "auth.token_file", "request_log.file_path"]},
+            "logging": {"file_path": "logs/api_test.log"},
+            "auth": {"token_file": "logs/token.txt"},
+            "request_log": {"file_path": ""},
+        }
+        loader._isolate_worker_paths("w2")
+        assert loader.get('logging.file_path') == "logs/w2/api_test.log"
+        assert loader.get('auth.token_file') == "logs/w2/token.txt"
+        assert loader.get('request_log.file_path') == ""
+
+    def test_merge_metrics(self, tmp_path):
+        """各 worker 的指标加上 worker 标签后按指标分组合并"""
+        registry = MetricsRegistry()
+        registry.enabled = True
+        registry.observe_request("POST", "/api/a", "default", 12.0, status=200)
+        registry.add_collector(lambda: ["# TYPE autoapi_ratio gauge", "autoapi_ratio 0.5"])
+        files = {}
+        for worker_id in ("w1", "w2"):
+            files[worker_id] = str(tmp_path / worker_id / "metrics.txt")
+            registry.write(files[worker_id])
+        output = tmp_path / "metrics.txt"
+        assert merge_metrics(dict(files, w3=str(tmp_path / "missing.txt")), str(output)) > 0
+
+        lines = output.read_text(encoding="utf-8").splitlines()
+        assert lines[-1] == "# EOF" and lines.count("# EOF") == 1
+        requests_total = [line for line in lines if line.startswith("autoapi_http_requests_total{")]
+        assert len(requests_total) == 2
+        assert requests_total[0].startswith('autoapi_http_requests_total{worker="w1",endpoint="/api/a"')
+        assert 'autoapi_ratio{worker="w2"} 0.5' in "\n".join(lines)
+        # 同一指标的 TYPE 行只出现一次，且样本紧随其后
+        type_lines = [line for line in lines if line.startswith("# TYPE autoapi_http_requests ")]
+        assert len(type_lines) == 1
+        assert lines.index(requests_total[1]) - lines.index(type_lines[0]) <= 3
+
+    def test_workers_and_merged_reports(self, tmp_path):
+        """两个 worker 执行后合并为一份 JUnit XML 和 HTML 报告"""
+        test_file = tmp_path / "test_sample.py"
+        test_file.write_text(SAMPLE_TESTS, encoding="utf-8")
+        nodeids = collect_nodeids([str(test_file)])
+        assert len(nodeids) == 4
+
+        report_dir = str(tmp_path / "reports")
+        exit_codes = run_workers(distribute(nodeids, 2), ["-q", "-p", "no:cacheprovider"], report_dir)
+        assert sorted(exit_codes) == [0, 1]
+
+        workers = [tmp_path / "reports" / "workers" / worker for worker in ("w1", "w2")]
+        totals = merge_junit([str(path / "report.xml") for path in workers], str(tmp_path / "report.xml"))
+        assert (totals["tests"], totals["failures"], totals["skipped"]) == (4, 1, 1)
+        suite = ET.parse(tmp_path / "report.xml").getroot().find("testsuite")
+        assert len(suite.findall("testcase")) == 4
+
+        durations = junit_durations(str(tmp_path / "report.xml"), nodeids)
+        assert len(durations) == 3
+
+        assert merge_html([str(path / "report.html") for path in workers], str(tmp_path / "report.html"), 1.5)
+        content = (tmp_path / "report.html").read_text(encoding="utf-8")
+        assert '<p class="run-count">4 tests took 00:00:01.</p>' in content
+        assert '<span class="passed">2' in content and '<span class="failed">1' in content
+        assert content.count("test_sample.py::test_") >= 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
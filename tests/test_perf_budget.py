@@ -0,0 +1,61 @@
+"""
+性能预算断言测试
+使用本地模拟报表服务注入延迟，验证耗时断言、预热和重复执行
+"""
+import pytest
+from core.assert_helper import assert_helper
+from core.base.http_client import HttpClient
+from bizs.mock.report_server import ReportMockServer, LIST_PAGE_PATH, LATENCY_HEADER
+
+
+@pytest.fixture(scope="module")
+def server():
+    """模拟服务 fixture"""
+    server = ReportMockServer(size=200)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    """指向模拟服务的HTTP客户端 fixture"""
+    client = HttpClient()
+    client.base_url = server.base_url
+    return client
+
+
+class TestPerfBudget:
+    """性能预算断言测试类"""
+
+    def test_assert_response_time(self, client):
+        """单次请求耗时超过上限时断言失败"""
+        response = client.post(LIST_PAGE_PATH, json={"pageNum": 1}, headers={LATENCY_HEADER: "30"})
+        assert_helper.assert_response_time(response, 5000)
+        with pytest.raises(AssertionError, match="耗时断言失败"):
+            assert_helper.assert_response_time(response, 10)
+
+    def test_budget_warmup_and_repeat(self, server, client):
+        """预热请求不计入样本；重复执行的分位数超过预算时断言失败"""
+        def call():
+            return client.post(LIST_PAGE_PATH, json={"pageNum": 1}, headers={LATENCY_HEADER: "20"}).json()
+
+        before = server.request_count
+        result, latencies = assert_helper.measure_latency(call, warmup=2, repeat=3)
+        assert server.request_count - before == 5
+        assert len(latencies) == 3 and min(latencies) >= 20
+        assert result["code"] == "200"
+
+        assert assert_helper.assert_latency_budget(call, {"max_latency_ms": 5000, "repeat": 2})["code"] == "200"
+        with pytest.raises(AssertionError, match="p95 期望 <= 5 ms"):
+            assert_helper.assert_latency_budget(call, {"max_latency_ms": 5, "repeat": 2})
+
+    def test_no_budget_runs_once(self, server, client):
+        """未声明预算时只执行一次"""
+        before = server.request_count
+        assert_helper.assert_latency_budget(lambda: client.post(LIST_PAGE_PATH, json={}), None)
+        assert server.request_count - before == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,73 @@
+"""
+性能历史测试
+测试 Mann-Whitney U 检验、运行记录和滚动基线回归判定
+"""
+import json
+import random
+import pytest
+from core.utils.perf_history import PerfHistory, KIND_ENDPOINT, KIND_TEST
+from core.utils.stats import mann_whitney_u
+
+
+ENDPOINT = "POST /api/report/order/listPage"
+TEST_ID = "tests/test_report.py::TestReport::test_history_order_list_with_date_filter"
+
+
+@pytest.fixture
+def history(tmp_path):
+    """临时数据库的性能历史 fixture"""
+    history = PerfHistory(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def _latencies(rng, center, count=30):
+    """生成围绕 center 波动的耗时样本"""
+    return [rng.gauss(center, center * 0.05) for _ in range(count)]
+
+
+class TestPerfHistory:
+    """性能历史测试类"""
+
+    def test_mann_whitney_u(self):
+        """明显变慢时 p 值很小，分布相同时 p 值较大"""
+        _, p_value = mann_whitney_u([5, 6, 7, 8, 9], [1, 2, 3, 4, 5])
+        assert p_value == pytest.approx(0.00799, abs=1e-4)
+        assert mann_whitney_u([1, 2, 3], [1, 2, 3])[1] > 0.5
+        assert mann_whitney_u([], [1, 2]) == (0.0, 1.0)
+
+    def test_regression_detected_against_rolling_baseline(self, history, tmp_path):
+        """端点 p95 显著变慢时判定为回归，变快不判定"""
+        rng = random.Random(1)
+        for _ in range(4):
+            history.record_run({ENDPOINT: _latencies(rng, 100)}, {TEST_ID: rng.gauss(500, 20)},
+                               commit="base", environment="env")
+
+        slow_run = history.record_run({ENDPOINT: _latencies(rng, 160)}, {TEST_ID: 510},
+                                      commit="slow", environment="env")
+        results = {(item["kind"], item["name"]): item for item in history.compare(slow_run)}
+        assert results[(KIND_ENDPOINT, ENDPOINT)]["regression"]
+        assert results[(KIND_ENDPOINT, ENDPOINT)]["ratio"] > 1.4
+        assert not results[(KIND_TEST, TEST_ID)]["regression"]
+
+        fast_run = history.record_run({ENDPOINT: _latencies(rng, 80)}, {}, commit="fast", environment="env")
+        assert not any(item["regression"] for item in history.compare(fast_run))
+
+        report_file = tmp_path / "perf_regression.json"
+        history.write_report(slow_run, history.compare(slow_run), str(report_file))
+        report = json.loads(report_file.read_text(encoding="utf-8"))
+        assert report["commit"] == "slow"
+        assert [item["name"] for item in report["regressions"]] == [ENDPOINT]
+
+    def test_baseline_limited_to_same_environment(self, history):
+        """其他环境的运行不作为基线；基线不足时不判定回归"""
+        rng = random.Random(2)
+        for _ in range(5):
+            history.record_run({ENDPOINT: _latencies(rng, 100)}, {}, commit="a", environment="other")
+        run_id = history.record_run({ENDPOINT: _latencies(rng, 300)}, {}, commit="b", environment="env")
+        assert history.baseline_runs(run_id) == []
+        assert not any(item["regression"] for item in history.compare(run_id))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
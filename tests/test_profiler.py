@@ -0,0 +1,86 @@
+"""
+性能剖析插件测试
+在临时用例上运行 cpu/mem 两种模式，检查折叠栈和 Top-N 汇总文件以及按用例的归因
+"""
+import pytest
+from core.runner.profiler import ProfilerPlugin
+
+
+SAMPLE_TESTS = '''
+import time
+
+retained = []
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_slow():
+    busy(0.3)
+
+
+def test_fast():
+    pass
+
+
+def test_allocate():
+    retained.append(bytearray(2 * 1024 * 1024))
+'''
+
+
+def run_profiler(tmp_path, mode):
+    """在临时用例上运行剖析插件，返回输出目录"""
+    test_file = tmp_path / "test_profile_sample.py"
+    test_file.write_text(SAMPLE_TESTS, encoding="utf-8")
+    output_dir = tmp_path / "reports"
+    plugin = ProfilerPlugin(mode, str(output_dir), interval=0.002, top_n=5)
+    # 固定 rootdir，用例 nodeid 不随仓库所在目录变化
+    exit_code = pytest.main([str(test_file), "-q", "-p", "no:cacheprovider", "-p", "no:html",
+                             "--import-mode=importlib", f"--rootdir={tmp_path}"], plugins=[plugin])
+    assert exit_code == 0
+    return output_dir
+
+
+class TestProfiler:
+    """性能剖析插件测试类"""
+
+    def test_invalid_mode(self, tmp_path):
+        """只支持 cpu 和 mem"""
+        with pytest.raises(ValueError):
+            ProfilerPlugin("io", str(tmp_path))
+
+    def test_cpu(self, tmp_path):
+        """样本按用例归因，估计耗时与实际耗时接近"""
+        output_dir = run_profiler(tmp_path, "cpu")
+        collapsed = (output_dir / "profile_cpu.collapsed").read_text(encoding="utf-8").splitlines()
+        slow = [line for line in collapsed if line.startswith("test_profile_sample.py::test_slow;")]
+        assert slow and any("busy" in line for line in slow)
+        slow_samples = sum(int(line.rsplit(" ", 1)[1]) for line in slow)
+        total_samples = sum(int(line.rsplit(" ", 1)[1]) for line in collapsed)
+        assert slow_samples / total_samples > 0.8
+
+        summary = (output_dir / "profile_cpu_summary.txt").read_text(encoding="utf-8").splitlines()
+        assert "估计值" in summary[1]
+        top_test = summary[summary.index("Top 5 用例（采样估计耗时 / 实际耗时）:") + 1]
+        assert top_test.endswith("test_profile_sample.py::test_slow")
+        estimated_ms, actual_ms = (float(value) for value in top_test.split("ms")[:2])
+        assert actual_ms >= 300
+        assert 0.7 * actual_ms <= estimated_ms <= 1.3 * actual_ms
+
+    def test_mem(self, tmp_path):
+        """用例的峰值和净增内存，以及会话结束时保留的分配位置"""
+        output_dir = run_profiler(tmp_path, "mem")
+        assert (output_dir / "profile_mem.collapsed").exists()
+        summary = (output_dir / "profile_mem_summary.txt").read_text(encoding="utf-8").splitlines()
+        top_test = summary[summary.index("Top 5 用例（峰值增量 / 用例结束时净增）:") + 1]
+        assert top_test.endswith("test_profile_sample.py::test_allocate")
+        peak_kb, retained_kb = (float(value) for value in top_test.split("KB")[:2])
+        assert peak_kb >= 2048 and retained_kb >= 2048
+        assert any("test_profile_sample.py:" in line for line in summary if "KB" in line)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
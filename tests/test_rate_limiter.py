@@ -0,0 +1,117 @@
+"""
+客户端限速测试
+使用模拟时钟测试令牌桶限速、Retry-After 暂停、AIMD 速率调整和各维度限速配置
+"""
+import pytest
+from core.base.rate_limiter import TokenBucket, RateLimiter, parse_retry_after
+
+
+class FakeClock:
+    """模拟时钟：sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+SETTINGS = {
+    "enabled": True,
+    "host": {"rate": 10, "burst": 2},
+    "account": {"rate": 0},
+    "endpoint": {"rate": 0},
+    "overrides": {"endpoint": {"/slow": {"rate": 1, "burst": 1}}},
+    "split_across_workers": False,
+    "adaptive": {"enabled": True, "status_codes": [429], "decrease_factor": 0.5,
+                 "increase_step": 1.0, "increase_interval_s": 1.0, "min_rate": 1, "max_retry_after_s": 30},
+}
+
+
+class TestRateLimiter:
+    """客户端限速测试类"""
+
+    def test_bucket_rate(self):
+        """突发容量用完后按 1/rate 的间隔放行"""
+        clock = FakeClock()
+        bucket = TokenBucket("t", rate=10, burst=2, clock=clock)
+        waits = [bucket.reserve() for _ in range(5)]
+        assert waits == pytest.approx([0, 0, 0.1, 0.2, 0.3])
+        clock.now += 1
+        assert bucket.reserve() == 0
+
+    def test_parse_retry_after(self):
+        """Retry-After 支持秒数和 HTTP 日期"""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_aimd(self):
+        """限流时乘性减（在途请求的多个 429 只降一次），之后每个周期加性增直到配置速率"""
+        clock = FakeClock()
+        bucket = TokenBucket("t", rate=8, burst=1, min_rate=1, clock=clock)
+        bucket.on_throttle()
+        bucket.on_throttle()
+        assert bucket.rate == 4
+        clock.now += 0.5
+        bucket.on_throttle()
+        assert bucket.rate == 2
+        for _ in range(3):
+            bucket.on_throttle()
+            clock.now += 1
+        assert bucket.rate == 1
+        rates = []
+        for _ in range(10):
+            clock.now += 1
+            bucket.on_success()
+            rates.append(bucket.rate)
+        assert rates[:3] == [2, 3, 4] and rates[-1] == 8
+        assert bucket.throttled == 6
+
+    def test_retry_after_blocks_bucket(self):
+        """Retry-After 期间暂停该桶（超过上限时按上限暂停）"""
+        clock = FakeClock()
+        limiter = RateLimiter(SETTINGS, clock=clock, sleep=clock.sleep)
+        buckets = limiter.acquire("h", "default", "/a")
+        limiter.observe(buckets, 429, "5")
+        start = clock.now
+        limiter.acquire("h", "default", "/a")
+        assert clock.now - start == pytest.approx(5)
+        limiter.observe(buckets, 429, "3600")
+        start = clock.now
+        limiter.acquire("h", "default", "/a")
+        assert clock.now - start == pytest.approx(30)
+
+    def test_scopes(self):
+        """各维度分别限速，未配置速率的维度不创建令牌桶；关闭时不限速"""
+        clock = FakeClock()
+        limiter = RateLimiter(SETTINGS, clock=clock, sleep=clock.sleep)
+        assert [bucket.name for bucket in limiter.acquire("h", "default", "/a")] == ["host:h"]
+        assert [bucket.name for bucket in limiter.acquire("h", "default", "/slow")] == ["host:h", "endpoint:/slow"]
+        start = clock.now
+        for _ in range(3):
+            limiter.acquire("other", "default", "/slow")
+        # /slow 每秒 1 次，第一次消耗突发容量
+        assert clock.now - start == pytest.approx(3)
+        assert set(limiter.summary()) == {"host:h", "host:other", "endpoint:/slow"}
+        # 正常响应不降速
+        buckets = limiter.acquire("h", "default", "/a")
+        limiter.observe(buckets, 200)
+        assert limiter.summary()["host:h"]["rate"] == 10
+
+        disabled = RateLimiter(dict(SETTINGS, enabled=False), clock=clock, sleep=clock.sleep)
+        assert disabled.acquire("h", "default", "/slow") == []
+
+    def test_split_across_workers(self, monkeypatch):
+        """并行模式下速率按 worker 数量均分"""
+        monkeypatch.setenv("API_TEST_WORKER_COUNT", "4")
+        limiter = RateLimiter(dict(SETTINGS, split_across_workers=True))
+        assert limiter.acquire("h", "default", "/a")[0].max_rate == 2.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -5,6 +5,7 @@
 import pytest
 from bizs.apis.report_api import ReportAPI
 from core.utils.yaml_loader import YamlLoader
+from core.utils.case_source import CaseSource
 from core.utils.logger import logger
 from core.test_helper import BaseTest
 from core.assert_helper import assert_helper
@@ -16,23 +17,49 @@ def report_api():
     return ReportAPI(account_name="default")
 
 
+@pytest.fixture(scope="class")
+def schema_file(use_mock_server):
+    """响应结构定义：模拟服务下额外校验行字段，实际接口只校验文档约定的字段"""
+    return ReportAPI.MOCK_SCHEMA_FILE if use_mock_server else ReportAPI.SCHEMA_FILE
+
+
+@pytest.fixture(scope="class")
+def row_fields(use_mock_server):
+    """行不变量检查的字段名：只有模拟服务的行字段是已知的，实际接口返回 None（不检查）"""
+    return ReportAPI.MOCK_ORDER_ROW_FIELDS if use_mock_server else None
+
+
 @pytest.fixture(scope="class")
 def test_data():
     """测试数据 fixture"""
     return YamlLoader.load_test_data("report_cases.yaml")
 
 
+# 流式用例数据源（创建时不读取文件和配置；参数化时只读取索引，用例内容在执行时按需读取）
+history_order_cases = CaseSource("bizs/data/report_cases.jsonl")
+
+
+def pytest_generate_tests(metafunc):
+    """数据驱动用例在收集阶段生成参数化（导入模块时不生成索引、不初始化配置和日志）"""
+    if "case_index" in metafunc.fixturenames:
+        indexes, ids = history_order_cases.parametrize_args()
+        metafunc.parametrize("case_index", indexes, ids=ids)
+
+
 class TestReport(BaseTest):
     """报表测试类"""
     
-    def test_history_order_list_with_date_filter(self, report_api, test_data):
+    def test_history_order_list_with_date_filter(self, report_api, test_data, schema_file, row_fields):
         """测试历史订单列表 - 指定时间筛选"""
         # 1. 获取测试数据
-        case_data = test_data["history_order_list"]["指定时间筛选"]
+        case_data = dict(test_data["history_order_list"]["指定时间筛选"])
+        budget = case_data.pop("perf_budget", None)
         logger.info(f"请求参数: {case_data}")
         
-        # 2. 调用API（使用 BaseAPI 的 post 方法，自动处理响应和错误）
-        response_data = report_api.report_order_listPage(params=case_data)
+        # 2. 调用API（使用 BaseAPI 的 post 方法，自动处理响应和错误），按性能预算断言耗时
+        response_data = assert_helper.assert_latency_budget(
+            lambda: report_api.report_order_listPage(params=case_data), budget
+        )
         
         # 3. 断言响应数据
         assert_helper.assert_is_not_none(response_data, "响应数据不应为空")
@@ -46,6 +73,37 @@ class TestReport(BaseTest):
             )
             logger.info(f"[业务状态码断言] ✓ 通过 - 状态码: {response_data.get('code')}")
         
+        # 响应结构断言（列出所有违规字段及路径）
+        assert_helper.assert_schema(response_data, report_api.history_order_list, schema_file)
+        
+        # 每一行都满足筛选条件（日期范围、订单状态、排序），行字段名已知时才检查
+        if row_fields:
+            self.assert_rows_match_filter(response_data, case_data, **row_fields)
+        
+        # 4. 记录数据数量
+        self.log_data_count(response_data)
+    
+    def test_history_order_list_cases(self, report_api, case_index, schema_file, row_fields):
+        """测试历史订单列表 - 数据驱动（JSONL 用例文件）"""
+        # 1. 按序号读取用例数据
+        case_data = history_order_cases[case_index]
+        # 用例ID和性能预算不是接口参数
+        case_data.pop(history_order_cases.id_field, None)
+        budget = case_data.pop("perf_budget", None)
+        
+        # 2. 调用API（声明了性能预算时断言耗时）
+        response_data = assert_helper.assert_latency_budget(
+            lambda: report_api.report_order_listPage(params=case_data), budget
+        )
+        
+        # 3. 断言业务状态码
+        assert_helper.assert_is_not_none(response_data, "响应数据不应为空")
+        if "code" in response_data:
+            assert_helper.assert_equal(str(response_data.get("code")), "200", "业务状态码应为'200'")
+        assert_helper.assert_schema(response_data, report_api.history_order_list, schema_file)
+        if row_fields:
+            self.assert_rows_match_filter(response_data, case_data, **row_fields)
+        
         # 4. 记录数据数量
         self.log_data_count(response_data)
 
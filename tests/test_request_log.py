@@ -0,0 +1,82 @@
+"""
+结构化请求日志测试
+测试 JSON Lines 记录内容、请求头脱敏和请求体截断
+"""
+import json
+import pytest
+import requests
+from core.utils.request_log import RequestLog
+
+
+def _make_response(status_code=200, body=b'{"code": "200"}'):
+    """构造一个已读取内容的 requests.Response"""
+    prepared = requests.Request(
+        "POST", "https://example.com/api/report/order/listPage", json={"pageNum": 1}
+    ).prepare()
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response._content_consumed = True
+    response.request = prepared
+    return response
+
+
+@pytest.fixture
+def request_log(tmp_path):
+    """写入临时文件的结构化请求日志 fixture"""
+    log = RequestLog()
+    log.enabled = True
+    log.file_path = str(tmp_path / "requests.jsonl")
+    yield log
+    log.close()
+
+
+class TestRequestLog:
+    """结构化请求日志测试类"""
+
+    def test_record_fields(self, request_log):
+        """每次请求写一条紧凑记录"""
+        response = _make_response()
+        request_log.record("post", "/api/report/order/listPage", 12.345,
+                           account="default", response=response)
+        request_log.close()
+
+        with open(request_log.file_path, encoding="utf-8") as f:
+            entry = json.loads(f.readline())
+        assert entry["method"] == "POST"
+        assert entry["endpoint"] == "/api/report/order/listPage"
+        assert entry["status"] == 200
+        assert entry["elapsed_ms"] == 12.35
+        assert entry["req_bytes"] == len(response.request.body)
+        assert entry["resp_bytes"] == len(response.content)
+        assert entry["account"] == "default"
+        assert "resp_body" not in entry
+
+    def test_headers_redacted_and_bodies_truncated(self, request_log):
+        """敏感请求头脱敏，采样到的请求体/响应体被截断"""
+        request_log.include_headers = True
+        request_log.body_sample_rate = 1.0
+        request_log.max_body_chars = 10
+        request_log.record(
+            "POST", "/api/report/order/listPage", 1.0,
+            request_headers={"Cookie": "secret", "Accept": "application/json"},
+            request_body={"pageNum": 1, "pageSize": 50},
+            response=_make_response(body=b'{"code": "200", "data": {"listData": []}}')
+        )
+        request_log.close()
+
+        with open(request_log.file_path, encoding="utf-8") as f:
+            entry = json.loads(f.readline())
+        assert entry["req_headers"] == {"Cookie": "***", "Accept": "application/json"}
+        assert entry["req_body"].startswith('{"pageNum"')
+        assert "...(共" in entry["resp_body"]
+
+    def test_disabled_writes_nothing(self, request_log, tmp_path):
+        """未启用时不创建文件"""
+        request_log.enabled = False
+        request_log.record("GET", "/api/ping", 1.0, error="timeout")
+        assert not (tmp_path / "requests.jsonl").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,125 @@
+"""
+请求耗时分解测试
+使用本地 HTTP 服务验证建连、连接复用、首字节和汇总统计
+"""
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.base.http_client import HttpClient
+from core.base.request_timing import (
+    RequestTiming, TimingCollector, _TimedConnectionMixin, get_current_timing, set_current_timing
+)
+from core.base import http_client as http_client_module
+
+
+class _FakeConnection:
+    """模拟连接：TCP 建连 10ms，connect 中再进行 20ms 的 TLS 握手"""
+
+    def _new_conn(self):
+        time.sleep(0.01)
+
+    def connect(self):
+        self._new_conn()
+        time.sleep(0.02)
+
+
+class _TimedFakeConnection(_TimedConnectionMixin, _FakeConnection):
+    """带耗时记录的模拟连接"""
+
+
+class _SlowJsonHandler(BaseHTTPRequestHandler):
+    """延迟 20ms 返回 JSON 的请求处理器"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(0.02)
+        body = json.dumps({"code": "200", "data": {"listData": []}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """本地 HTTP 服务 fixture"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowJsonHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    """独立的耗时收集器 fixture"""
+    collector = TimingCollector()
+    monkeypatch.setattr(http_client_module, "timing_collector", collector)
+    return collector
+
+
+class TestRequestTiming:
+    """请求耗时分解测试类"""
+
+    def test_timing_breakdown_and_connection_reuse(self, local_server, collector):
+        """首次请求新建连接，第二次复用连接；首字节耗时包含服务端处理时间"""
+        client = HttpClient()
+        client.base_url = local_server
+        seen = []
+        collector.add_hook(seen.append)
+
+        first = client.post("/api/report/order/listPage", json={"pageNum": 1})
+        second = client.post("/api/report/order/listPage", json={"pageNum": 2})
+
+        assert [t.reused for t in seen] == [False, True]
+        assert first.timing.connect_ms > 0
+        assert second.timing.connect_ms == 0
+        assert second.timing.ttfb_ms >= 20
+        assert second.timing.total_ms >= second.timing.ttfb_ms
+        assert second.json()["code"] == "200"
+
+        summary = collector.summary()["POST /api/report/order/listPage"]
+        assert summary["requests"] == 2
+        assert summary["reused"] == 1
+        assert summary["ttfb_ms"]["count"] == 2
+
+    def test_failed_request_counted_as_error(self, collector):
+        """连接失败的请求计入错误数"""
+        client = HttpClient()
+        client.base_url = "http://127.0.0.1:9"
+        client.timeout = 1
+        with pytest.raises(Exception):
+            client.get("/api/ping")
+        assert collector.summary()["GET /api/ping"]["errors"] == 1
+
+    def test_tls_measured_per_connection(self):
+        """同一请求新建多个连接（如重试）时，每个连接的 TLS 耗时只减去该连接自己的建连耗时"""
+        timing = RequestTiming("GET", "/api/ping")
+        set_current_timing(timing)
+        try:
+            for _ in range(3):
+                _TimedFakeConnection().connect()
+        finally:
+            set_current_timing(None)
+        assert not timing.reused
+        assert timing.connect_ms >= 30
+        assert 60 <= timing.tls_ms < 60 + timing.connect_ms
+
+    def test_timing_cleared_on_unexpected_error(self, collector):
+        """请求抛出非 requests 异常时也清除当前线程的耗时记录"""
+        client = HttpClient()
+        with pytest.raises(TypeError):
+            client.get("/api/ping", unknown_argument=True)
+        assert get_current_timing() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
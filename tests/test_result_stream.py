@@ -0,0 +1,96 @@
+"""
+流式结果报告测试
+测试逐条写出的 JSONL 记录、中断后不完整文件的处理以及离线 HTML 摘要
+"""
+import json
+import pytest
+from core.runner.result_stream import ResultStreamPlugin, iter_records, summarize, render_html
+
+
+SAMPLE_TESTS = '''
+import logging
+import pytest
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("setup 出错")
+
+def test_pass():
+    pass
+
+@pytest.mark.parametrize("value", [1, 2, 3])
+def test_param(value):
+    logging.getLogger("sample").warning("检查 %s", value)
+    assert value < 3, "x" * 500
+
+def test_error(broken):
+    pass
+
+@pytest.mark.skip(reason="示例跳过")
+def test_skip():
+    pass
+
+@pytest.mark.xfail(reason="已知问题")
+def test_xfail():
+    assert False
+'''
+
+
+@pytest.fixture
+def results(tmp_path):
+    """执行示例用例，返回结果文件路径"""
+    test_file = tmp_path / "test_stream_sample.py"
+    test_file.write_text(SAMPLE_TESTS, encoding="utf-8")
+    results_file = tmp_path / "results.jsonl"
+    plugin = ResultStreamPlugin(str(results_file), max_text_chars=200)
+    pytest.main([str(test_file), "-q", "-p", "no:cacheprovider", "-p", "no:html", "--import-mode=importlib"],
+                plugins=[plugin])
+    return results_file
+
+
+class TestResultStream:
+    """流式结果报告测试类"""
+
+    def test_records(self, results):
+        """每个用例一条记录，首尾为会话和汇总记录"""
+        records = list(iter_records(str(results)))
+        assert records[0]["type"] == "session"
+        assert records[-1]["type"] == "summary"
+        tests = {record["nodeid"].split("::")[1]: record for record in records[1:-1]}
+        assert len(tests) == 7
+        assert {name: record["outcome"] for name, record in tests.items()} == {
+            "test_pass": "passed", "test_param[1]": "passed", "test_param[2]": "passed",
+            "test_param[3]": "failed", "test_error": "error", "test_skip": "skipped", "test_xfail": "xfailed",
+        }
+        assert records[-1]["counts"]["failed"] == 1 and records[-1]["counts"]["error"] == 1
+        # 失败信息和日志截断
+        failed = tests["test_param[3]"]
+        assert "省略" in failed["message"] and len(failed["message"]) < 300
+        assert "检查 3" in failed["log"]
+        assert "setup 出错" in tests["test_error"]["message"]
+        assert tests["test_skip"]["message"] == "Skipped: 示例跳过"
+
+    def test_partial_file(self, results):
+        """进程中断时写了一半的行被跳过，摘要标记为不完整"""
+        lines = results.read_text(encoding="utf-8").splitlines()
+        results.write_text("\n".join(lines[:4]) + "\n" + lines[4][:10], encoding="utf-8")
+        summary = summarize([str(results)])
+        assert summary["total"] == 3
+        assert not summary["complete"]
+
+    def test_render_html(self, results, tmp_path):
+        """HTML 摘要包含统计、最慢用例和有限条失败记录"""
+        output = tmp_path / "results.html"
+        summary = render_html([str(results), str(results)], str(output), max_failures=3, slowest=2)
+        assert summary["total"] == 14 and summary["complete"]
+        assert len(summary["failures"]) == 3 and summary["omitted_failures"] == 1
+        assert len(summary["slowest"]) == 2
+        content = output.read_text(encoding="utf-8")
+        assert "14 个用例" in content
+        assert "另有 1 个失败用例未列出" in content
+        assert "不完整" not in content
+        json.dumps(summary)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
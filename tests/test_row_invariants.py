@@ -0,0 +1,101 @@
+"""
+列表行不变量测试
+测试日期范围、订单状态、排序检查，违规汇总和逐页检查
+"""
+import json
+import pytest
+from bizs.mock.report_server import ReportMockServer
+from core.assert_helper import assert_helper
+from core.test_helper import BaseTest
+from core.utils.row_invariants import RowInvariants, RULE_DATE, RULE_STATUS, RULE_SORT, RULE_MISSING
+
+
+PARAMS = {
+    "startDate": "2025-03-01", "endDate": "2025-05-31", "orderStatus": [1, 2],
+    "sortRule": {"field": "createTime", "order": "desc"},
+}
+
+
+@pytest.fixture(scope="module")
+def server():
+    """模拟报表服务（只在进程内查询，不启动 HTTP）"""
+    return ReportMockServer(size=5000)
+
+
+def _query(server, params):
+    """按参数查询一页数据"""
+    return json.loads(server.render_list_page(params))
+
+
+class TestRowInvariants:
+    """列表行不变量测试类"""
+
+    def test_filtered_page_passes(self, server):
+        """模拟服务按条件返回的数据全部满足不变量"""
+        response_data = _query(server, dict(PARAMS, pageNum=1, pageSize=200))
+        summary = BaseTest.assert_rows_match_filter(response_data, PARAMS)
+        assert summary["rows"] == len(response_data["data"]["listData"]) > 0
+        assert summary["violations"] == 0
+
+    def test_violation_summary(self, server):
+        """违规只保留前 N 个示例，按规则计数"""
+        rows = _query(server, {"pageNum": 1, "pageSize": 300})["data"]["listData"]
+        invariants = RowInvariants.from_params(dict(PARAMS, sortRule={"field": "createTime", "order": "asc"}),
+                                               max_examples=3)
+        invariants.check(rows)
+        summary = invariants.summary()
+        assert summary["rows"] == 300
+        assert summary["by_rule"][RULE_DATE] > 0
+        assert summary["by_rule"][RULE_STATUS] > 0
+        assert summary["by_rule"][RULE_SORT] == 299
+        assert summary["violations"] == sum(summary["by_rule"].values())
+        assert len(summary["examples"]) == 3
+        with pytest.raises(AssertionError, match=f"300 行中 {summary['violations']} 处违规"):
+            assert_helper.assert_invariants(invariants)
+
+    def test_streamed_pages(self, server):
+        """逐页检查时行号和排序跨页延续"""
+        invariants = RowInvariants.from_params(PARAMS)
+        for page_num in range(1, 4):
+            page = _query(server, dict(PARAMS, pageNum=page_num, pageSize=50))
+            invariants.check(page["data"]["listData"])
+        assert invariants.rows == 150
+        assert_helper.assert_invariants(invariants)
+
+        # 第二页顺序颠倒时在页边界处也能发现排序违规
+        invariants = RowInvariants.from_params(PARAMS)
+        for page_num in (2, 1):
+            page = _query(server, dict(PARAMS, pageNum=page_num, pageSize=50))
+            invariants.check(page["data"]["listData"])
+        assert invariants.by_rule == {RULE_SORT: 1}
+        assert invariants.examples[0].startswith("第 50 行")
+
+    def test_missing_fields(self):
+        """缺少检查字段的行记为 missing_field，不误报为日期/状态/排序违规"""
+        invariants = RowInvariants.from_params(PARAMS)
+        invariants.check([
+            {"orderId": "a", "createTime": "2025-04-02 00:00:00", "orderStatus": 1},
+            {"orderId": "b", "orderStatus": 2},
+            {"orderId": "c", "createTime": "2025-04-01 00:00:00"},
+        ])
+        assert invariants.by_rule == {RULE_MISSING: 3}
+        assert invariants.examples[0] == "第 1 行（orderId=b）missing_field: 缺少 createTime"
+
+    def test_custom_field_names(self):
+        """字段名可配置（与实际接口的行字段一致）"""
+        rows = [{"id": 1, "created": "2025-04-02", "status": 1}, {"id": 2, "created": "2025-04-01", "status": 2}]
+        summary = BaseTest.assert_rows_match_filter(
+            {"data": {"listData": rows}}, dict(PARAMS, sortRule={"field": "created", "order": "desc"}),
+            date_field="created", status_field="status", id_field="id"
+        )
+        assert summary["violations"] == 0
+
+    def test_empty_filters(self):
+        """空条件（与接口的空值语义一致）不做检查"""
+        invariants = RowInvariants.from_params({"orderStatus": [], "sortRule": {"field": "", "order": ""}})
+        invariants.check([{"orderStatus": 9, "createTime": "2000-01-01 00:00:00"}])
+        assert invariants.violations == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
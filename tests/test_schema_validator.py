@@ -0,0 +1,114 @@
+"""
+结构校验测试
+测试 schema 编译、违规项路径、校验器缓存和分页增量校验
+"""
+import copy
+import json
+import time
+import pytest
+from bizs.apis.report_api import ReportAPI
+from bizs.mock.report_server import ReportMockServer, LIST_PAGE_PATH
+from core.assert_helper import assert_helper
+from core.base.http_client import HttpClient
+from core.utils.schema_validator import SchemaValidator, IncrementalValidator, get_validator
+
+
+@pytest.fixture(scope="module")
+def page():
+    """模拟服务的一页订单数据（1000 行）"""
+    server = ReportMockServer(size=1000)
+    return json.loads(server.render_list_page({"pageNum": 1, "pageSize": 1000}))
+
+
+class TestSchemaValidator:
+    """结构校验测试类"""
+
+    def test_keywords(self):
+        """类型、枚举、范围、长度、正则、必填和额外字段"""
+        validator = SchemaValidator({
+            "type": "object",
+            "required": ["id", "tags"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "integer", "minimum": 1},
+                "name": {"type": ["string", "null"], "maxLength": 3, "pattern": "^[a-z]+$"},
+                "status": {"enum": [0, 1]},
+                "tags": {"type": "array", "maxItems": 2, "items": {"type": "string"}},
+            },
+        })
+        assert validator.validate({"id": 1, "name": None, "status": 1, "tags": ["a"]}) == []
+        errors = validator.validate({"id": True, "name": "ABCD", "status": False, "tags": ["a", 1, "c"], "x": 0})
+        assert errors == [
+            "$.id: 类型应为 integer，实际为 boolean",
+            "$.name: 长度应 <= 3，实际为 4",
+            "$.name: 不匹配 ^[a-z]+$，实际为 'ABCD'",
+            "$.status: 取值应为 [0, 1]，实际为 False",
+            "$.tags: 元素个数应 <= 2，实际为 3",
+            "$.tags[1]: 类型应为 string，实际为 integer",
+            "$: 不允许的字段 x",
+        ]
+        assert validator.validate({"id": 0}) == ["$: 缺少必填字段 tags", "$.id: 应 >= 1，实际为 0"]
+
+    def test_report_schema_reports_all_violations(self, page):
+        """报表响应通过校验；破坏多行数据时列出每一处违规及路径"""
+        validator = get_validator(LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE)
+        assert validator.validate(page) == []
+
+        broken = copy.deepcopy(page)
+        rows = broken["data"]["listData"]
+        rows[3]["orderStatus"] = 9
+        rows[10]["createTime"] = "2025/01/01"
+        del rows[20]["orderId"]
+        broken["data"]["totalCount"] = "1000"
+        errors = validator.validate(broken)
+        assert errors == [
+            "$.data.totalCount: 类型应为 integer，实际为 string",
+            "$.data.listData[3].orderStatus: 取值应为 [0, 1, 2, 3, 4, 5]，实际为 9",
+            "$.data.listData[10].createTime: 不匹配 ^\\d{4}-\\d{2}-\\d{2} \\d{2}:\\d{2}:\\d{2}$，实际为 '2025/01/01'",
+            "$.data.listData[20]: 缺少必填字段 orderId",
+        ]
+        with pytest.raises(AssertionError, match="共 4 处违规"):
+            assert_helper.assert_schema(broken, LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE)
+
+    def test_contract_schema_allows_any_row_fields(self, page):
+        """实际接口的 schema 只约束文档中的字段，行字段不同不算违规"""
+        validator = get_validator(LIST_PAGE_PATH, ReportAPI.SCHEMA_FILE)
+        assert validator.validate(page) == []
+        assert validator.validate({"code": "200", "data": {"totalCount": 1, "listData": [{"id": 1}]}}) == []
+        assert validator.validate({"code": "200", "data": {"totalCount": 1}}) == ["$.data: 缺少必填字段 listData"]
+
+    def test_validator_cached(self):
+        """同一 schema 只编译一次"""
+        assert get_validator(LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE) is \
+            get_validator(LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE)
+        with pytest.raises(KeyError):
+            get_validator("/api/not/exists", ReportAPI.MOCK_SCHEMA_FILE)
+
+    def test_incremental_pages(self):
+        """分页数据逐页校验，违规项带页路径"""
+        validator = get_validator(LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE)
+        incremental = IncrementalValidator(validator)
+        with ReportMockServer(size=250) as base_url:
+            api = ReportAPI()
+            api.client = HttpClient()
+            api.client.base_url = base_url
+            for page_num in range(1, 4):
+                data = api.get_order_list_page(page_num=page_num, page_size=100)
+                if page_num == 2:
+                    data["data"]["listData"][0]["amount"] = -1
+                incremental.feed(data)
+        assert incremental.pages == 3
+        assert incremental.errors == ["page[2].data.listData[0].amount: 应 >= 0，实际为 -1"]
+
+    def test_throughput(self, page):
+        """编译后的校验器每秒可校验数万行"""
+        validator = get_validator(LIST_PAGE_PATH, ReportAPI.MOCK_SCHEMA_FILE)
+        start = time.perf_counter()
+        for _ in range(20):
+            validator.validate(page)
+        rows_per_second = 20 * len(page["data"]["listData"]) / (time.perf_counter() - start)
+        assert rows_per_second > 20000, f"校验速度 {rows_per_second:.0f} 行/秒"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,98 @@
+"""
+分片测试
+测试分片参数解析、LPT 装箱、新用例的处理、哈希均分、耗时文件合并和历史耗时读取
+"""
+import os
+import random
+import pytest
+from core.runner.sharding import (
+    parse_shard, assign_shards, select_shard, hash_shards, load_durations, write_durations, merge_durations
+)
+from core.utils.perf_history import PerfHistory
+
+
+class TestSharding:
+    """分片测试类"""
+
+    def test_parse_shard(self):
+        """i/N 格式，i 从 1 开始"""
+        assert parse_shard("2/4") == (2, 4)
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with pytest.raises(ValueError):
+                parse_shard(value)
+
+    def test_lpt_balances_shards(self):
+        """LPT 装箱后各分片耗时接近，且每个用例只出现在一个分片"""
+        rng = random.Random(7)
+        nodeids = [f"tests/test_{i // 10}.py::test_{i}" for i in range(200)]
+        durations = {nodeid: rng.expovariate(1 / 500) for nodeid in nodeids}
+        shards, loads = assign_shards(nodeids, 4, durations)
+
+        assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(nodeids)
+        assert max(loads) - min(loads) <= max(durations.values())
+        assert max(loads) / (sum(loads) / 4) < 1.05
+        # 分片内保持收集顺序
+        for shard in shards:
+            assert shard == sorted(shard, key=nodeids.index)
+
+    def test_new_tests_deterministic(self):
+        """没有历史耗时的用例按已知中位数估计，结果与输入顺序无关"""
+        known = {f"t::known_{i}": float(100 * (i + 1)) for i in range(5)}
+        nodeids = list(known) + [f"t::new_{i}" for i in range(6)]
+        shards, loads = assign_shards(nodeids, 3, known)
+        reversed_shards, _ = assign_shards(list(reversed(nodeids)), 3, known)
+        assert [sorted(shard) for shard in shards] == [sorted(shard) for shard in reversed_shards]
+        assert sum(loads) == pytest.approx(sum(known.values()) + 6 * 300)
+
+    def test_select_shard_with_absolute_nodeids(self):
+        """收集得到的绝对路径 nodeid 与历史中的相对路径匹配"""
+        relative = [f"tests/test_a.py::test_{i}" for i in range(4)]
+        absolute = [os.path.abspath(nodeid.split("::")[0]) + "::" + nodeid.split("::")[1] for nodeid in relative]
+        durations = {relative[0]: 1000.0, relative[1]: 10.0, relative[2]: 10.0, relative[3]: 10.0}
+        first, loads = select_shard(absolute, 1, 2, durations)
+        second, _ = select_shard(absolute, 2, 2, durations)
+        assert first == [absolute[0]]
+        assert second == absolute[1:]
+        assert loads == [1000.0, 30.0]
+
+    def test_hash_split_without_durations(self):
+        """没有共用耗时文件时按哈希均分：不重复、不遗漏、数量均衡，与输入顺序无关"""
+        nodeids = [f"tests/test_{i // 10}.py::test_{i}" for i in range(103)]
+        shards = hash_shards(nodeids, 4)
+        assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(nodeids)
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+        assert [sorted(shard) for shard in hash_shards(list(reversed(nodeids)), 4)] == \
+            [sorted(shard) for shard in shards]
+        for shard in shards:
+            assert shard == sorted(shard, key=nodeids.index)
+
+        selected = [select_shard(nodeids, index, 4)[0] for index in range(1, 5)]
+        assert selected == shards
+
+    def test_durations_file_merge(self, tmp_path):
+        """各节点的耗时文件合并到共用耗时文件：后面的覆盖前面的，本次未执行的用例保留原耗时"""
+        shared = str(tmp_path / "durations.json")
+        write_durations(shared, {"t::a": 100, "t::b": 200})
+        write_durations(str(tmp_path / "s1.json"), {"t::a": 150})
+        write_durations(str(tmp_path / "s2.json"), {"t::c": 30.5})
+        merged = merge_durations(shared, [str(tmp_path / "s1.json"), str(tmp_path / "s2.json")])
+        assert merged == {"t::a": 150, "t::b": 200, "t::c": 30.5}
+        assert load_durations(shared) == merged
+        with pytest.raises(FileNotFoundError):
+            load_durations(str(tmp_path / "missing.json"))
+
+    def test_history_durations(self, tmp_path):
+        """历史耗时取最近若干次运行的中位数（分片运行只包含部分用例）"""
+        history = PerfHistory(str(tmp_path / "history.sqlite"))
+        try:
+            history.record_run({}, {"t::a": 100, "t::b": 50}, commit="c", environment="e")
+            history.record_run({}, {"t::a": 300}, commit="c", environment="e")
+            history.record_run({}, {"t::a": 200, "t::c": 10}, commit="c", environment="e")
+            assert history.test_durations(runs=3) == {"t::a": 200, "t::b": 50, "t::c": 10}
+            assert history.test_durations(runs=1) == {"t::a": 200, "t::c": 10}
+        finally:
+            history.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
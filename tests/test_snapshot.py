@@ -0,0 +1,137 @@
+"""
+快照比对测试
+测试规范化、哈希快速通过、结构化差异和批量更新
+"""
+import copy
+import json
+import os
+import threading
+import pytest
+from bizs.mock.report_server import ReportMockServer
+from core.utils.snapshot import SnapshotStore, canonicalize, dumps, structural_diff, INDEX_FILE
+
+
+NAME = "report/history_order_list/第一页"
+
+
+@pytest.fixture(scope="module")
+def page():
+    """模拟服务的一页订单数据"""
+    server = ReportMockServer(size=200)
+    data = json.loads(server.render_list_page({"pageNum": 1, "pageSize": 50}))
+    data["timestamp"] = 1700000000
+    return data
+
+
+@pytest.fixture
+def store(tmp_path, page):
+    """已记录一个快照的临时快照存储"""
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    store.ignore_keys = frozenset(["timestamp"])
+    store.update = True
+    store.assert_match(NAME, page)
+    assert store.flush() == 1
+    # 重新打开，模拟下一次运行
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    store.ignore_keys = frozenset(["timestamp"])
+    return store
+
+
+class TestSnapshot:
+    """快照比对测试类"""
+
+    def test_canonicalize(self):
+        """忽略路径和任意层级字段；键顺序不影响序列化结果"""
+        data = {"b": 1, "a": {"traceId": "x", "rows": [{"id": 1, "t": 5}, {"id": 2, "t": 6}]}}
+        canonical = canonicalize(data, ["a.rows[*].t"], ["traceId"])
+        assert canonical == {"b": 1, "a": {"rows": [{"id": 1}, {"id": 2}]}}
+        assert dumps({"x": 1, "y": [1, 2]}) == dumps({"y": [1, 2], "x": 1}) == b'{"x":1,"y":[1,2]}'
+        assert canonicalize(data) is data
+
+    def test_hash_fast_path(self, store, page, monkeypatch):
+        """内容一致（易变字段不同）时只比较哈希，不读取快照文件"""
+        monkeypatch.setattr(store, "load", lambda name: pytest.fail("哈希一致时不应读取快照"))
+        changed = dict(page, timestamp=1800000000)
+        store.assert_match(NAME, changed)
+
+    def test_mismatch_structural_diff(self, store, page):
+        """内容不一致时给出按路径定位的差异"""
+        changed = copy.deepcopy(page)
+        changed["data"]["listData"][7]["amount"] = -1
+        del changed["data"]["listData"][9]["shopName"]
+        with pytest.raises(AssertionError) as error:
+            store.assert_match(NAME, changed)
+        message = str(error.value)
+        assert "$.data.listData[7].amount: 期望" in message
+        assert "$.data.listData[9].shopName: 缺少字段" in message
+
+        # 忽略变化的路径后通过
+        store.assert_match(NAME, changed, ignore=["data.listData[*].amount", "data.listData[9].shopName"])
+
+    def test_missing_snapshot(self, store, page):
+        """快照不存在时提示使用更新模式"""
+        with pytest.raises(AssertionError, match="--snapshot-update"):
+            store.assert_match("report/not_recorded", page)
+
+    def test_bulk_update(self, store, page, tmp_path):
+        """更新模式下批量写入（未变化的快照不重写、不计数），索引只包含哈希"""
+        store.update = True
+        store.assert_match(NAME, page)
+        store.assert_match("report/second", {"code": "200"})
+        assert store.flush() == 1
+        index = json.loads((tmp_path / "snapshots" / INDEX_FILE).read_text(encoding="utf-8"))
+        assert sorted(index) == sorted([NAME, "report/second"])
+        assert store.load("report/second") == {"code": "200"}
+
+        store.assert_match(NAME, page)
+        assert store.flush() == 0
+
+    def test_similar_names_do_not_collide(self, store):
+        """特殊字符替换后相同的名称写入不同的文件"""
+        store.update = True
+        store.assert_match("report/a", {"value": 1})
+        store.assert_match("report_a", {"value": 2})
+        assert store.flush() == 2
+        assert store.load("report/a") == {"value": 1}
+        assert store.load("report_a") == {"value": 2}
+
+    def test_concurrent_flush_merges_index(self, tmp_path):
+        """多个存储（模拟并行 worker）同时写入时索引合并全部条目，不留下临时文件"""
+        snapshot_dir = str(tmp_path / "parallel")
+        stores = []
+        for worker in range(8):
+            store = SnapshotStore(snapshot_dir)
+            store.update = True
+            for i in range(20):
+                store.assert_match(f"w{worker}/case_{i}", {"worker": worker, "case": i})
+            stores.append(store)
+        barrier = threading.Barrier(len(stores))
+        results = []
+
+        def flush(store):
+            barrier.wait()
+            results.append(store.flush())
+
+        threads = [threading.Thread(target=flush, args=(store,)) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [20] * 8
+        reader = SnapshotStore(snapshot_dir)
+        assert len(reader.index) == 160
+        assert reader.load("w5/case_7") == {"worker": 5, "case": 7}
+        assert not [name for name in os.listdir(snapshot_dir) if name.endswith(".tmp")]
+
+    def test_structural_diff(self):
+        """列表长度、类型和多出字段"""
+        assert structural_diff({"a": [1, 2], "b": 1}, {"a": [1], "b": 1.0, "c": 0}) == [
+            "$.a: 元素个数 期望 2, 实际 1",
+            "$.b: 期望 1, 实际 1.0",
+            "$.c: 多出字段",
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,75 @@
+"""
+YAML加载器测试
+测试解析缓存、修改时间失效和编译缓存文件
+"""
+import os
+import pytest
+from core.utils.yaml_loader import YamlLoader
+
+
+@pytest.fixture
+def yaml_file(tmp_path, monkeypatch):
+    """临时测试数据文件 fixture（编译缓存写入临时目录）"""
+    compiled_dir = tmp_path / "compiled"
+    monkeypatch.setattr(
+        YamlLoader, "_get_compiled_path",
+        staticmethod(lambda file_path: str(compiled_dir / (os.path.basename(file_path) + ".pickle")))
+    )
+    path = tmp_path / "cases.yaml"
+    path.write_text("case_a:\n  pageNum: 1\n", encoding="utf-8")
+    YamlLoader.clear_cache()
+    yield path
+    YamlLoader.clear_cache()
+
+
+class TestYamlLoader:
+    """YAML加载器测试类"""
+
+    def test_parsed_data_is_cached(self, yaml_file):
+        """未修改的文件只解析一次，shared=True 时返回同一个缓存对象"""
+        first = YamlLoader.load(str(yaml_file), shared=True)
+        misses = YamlLoader.get_cache_stats()["misses"]
+        second = YamlLoader.load(str(yaml_file), shared=True)
+        assert first is second
+        assert first == {"case_a": {"pageNum": 1}}
+        assert YamlLoader.get_cache_stats()["misses"] == misses
+
+    def test_default_returns_copy(self, yaml_file):
+        """默认返回独立副本，修改返回值不影响缓存和其他调用方"""
+        first = YamlLoader.load(str(yaml_file))
+        first["case_a"]["pageNum"] = 99
+        first["case_b"] = {}
+        second = YamlLoader.load(str(yaml_file))
+        assert second == {"case_a": {"pageNum": 1}}
+        assert second is not YamlLoader.load(str(yaml_file), shared=True)
+
+    def test_cache_invalidated_when_file_changes(self, yaml_file):
+        """文件修改后重新解析"""
+        YamlLoader.load(str(yaml_file))
+        yaml_file.write_text("case_a:\n  pageNum: 2\n  pageSize: 10\n", encoding="utf-8")
+        assert YamlLoader.load(str(yaml_file)) == {"case_a": {"pageNum": 2, "pageSize": 10}}
+
+    def test_compiled_cache_rebuilt_only_on_change(self, yaml_file):
+        """编译缓存文件在源文件未变化时被复用，变化后重建"""
+        YamlLoader.load(str(yaml_file), compiled=True)
+        compiled_path = YamlLoader._get_compiled_path(str(yaml_file))
+        assert os.path.exists(compiled_path)
+
+        YamlLoader.clear_cache()
+        hits = YamlLoader.get_cache_stats()["compiled_hits"]
+        assert YamlLoader.load(str(yaml_file), compiled=True) == {"case_a": {"pageNum": 1}}
+        assert YamlLoader.get_cache_stats()["compiled_hits"] == hits + 1
+
+        yaml_file.write_text("case_a:\n  pageNum: 3\n  pageSize: 20\n", encoding="utf-8")
+        YamlLoader.clear_cache()
+        assert YamlLoader.load(str(yaml_file), compiled=True) == {"case_a": {"pageNum": 3, "pageSize": 20}}
+        assert YamlLoader.get_cache_stats()["compiled_hits"] == hits + 1
+
+    def test_missing_file_raises(self, tmp_path):
+        """文件不存在时抛出 FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            YamlLoader.load(str(tmp_path / "missing.yaml"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])